@@ -0,0 +1,72 @@
+"""enforce_unique_active_selections
+
+Revision ID: 07e122caf033
+Revises: 4990432a38b6
+Create Date: 2026-10-19 17:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '07e122caf033'
+down_revision: Union[str, None] = '4990432a38b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_FLAG_EXPRESSION = "CASE WHEN status = 'ACTIVE' THEN 1 END"
+
+
+def upgrade() -> None:
+    # 1. 取消历史上并发产生的重复生效记录（保留最早的一条），否则唯一索引无法创建
+    op.execute("""
+        UPDATE customer_selections cs
+        JOIN (
+            SELECT user_id, dish_id, date, MIN(id) AS keep_id
+            FROM customer_selections
+            WHERE status = 'active'
+            GROUP BY user_id, dish_id, date
+            HAVING COUNT(*) > 1
+        ) dup ON cs.user_id = dup.user_id AND cs.dish_id = dup.dish_id AND cs.date = dup.date
+        SET cs.status = 'cancelled'
+        WHERE cs.status = 'active' AND cs.id <> dup.keep_id
+    """)
+    op.execute("""
+        UPDATE chef_selections cs
+        JOIN (
+            SELECT chef_id, customer_selection_id, date, MIN(id) AS keep_id
+            FROM chef_selections
+            WHERE status = 'active'
+            GROUP BY chef_id, customer_selection_id, date
+            HAVING COUNT(*) > 1
+        ) dup ON cs.chef_id = dup.chef_id
+            AND cs.customer_selection_id = dup.customer_selection_id
+            AND cs.date = dup.date
+        SET cs.status = 'cancelled'
+        WHERE cs.status = 'active' AND cs.id <> dup.keep_id
+    """)
+
+    # 2. 添加生成列：生效中为 1，已取消为 NULL（唯一索引中 NULL 互不冲突）
+    op.add_column('customer_selections', sa.Column('active_flag', sa.Integer(), sa.Computed(ACTIVE_FLAG_EXPRESSION), nullable=True))
+    op.add_column('chef_selections', sa.Column('active_flag', sa.Integer(), sa.Computed(ACTIVE_FLAG_EXPRESSION), nullable=True))
+
+    # 3. 用唯一索引替换原先用于查重的普通索引
+    op.drop_index('idx_user_dish_date_status', table_name='customer_selections')
+    op.drop_index('idx_chef_customer_selection_status', table_name='chef_selections')
+    op.create_index('uq_user_dish_date_active', 'customer_selections', ['user_id', 'dish_id', 'date', 'active_flag'], unique=True)
+    op.create_index('uq_chef_customer_selection_active', 'chef_selections', ['chef_id', 'customer_selection_id', 'date', 'active_flag'], unique=True)
+
+
+def downgrade() -> None:
+    # 恢复普通查重索引
+    op.drop_index('uq_user_dish_date_active', table_name='customer_selections')
+    op.drop_index('uq_chef_customer_selection_active', table_name='chef_selections')
+    op.create_index('idx_user_dish_date_status', 'customer_selections', ['user_id', 'dish_id', 'date', 'status'])
+    op.create_index('idx_chef_customer_selection_status', 'chef_selections', ['chef_id', 'customer_selection_id', 'date', 'status'])
+
+    # 删除生成列
+    op.drop_column('chef_selections', 'active_flag')
+    op.drop_column('customer_selections', 'active_flag')
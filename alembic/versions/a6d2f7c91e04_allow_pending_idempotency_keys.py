@@ -0,0 +1,30 @@
+"""allow_pending_idempotency_keys
+
+Revision ID: a6d2f7c91e04
+Revises: f3b8c1d2a7e9
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2f7c91e04'
+down_revision: Union[str, None] = 'f3b8c1d2a7e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 处理中的请求先插入没有响应的记录占用幂等键，请求成功后再写入响应
+    op.alter_column('idempotency_keys', 'status_code', existing_type=sa.Integer(), nullable=True)
+    op.alter_column('idempotency_keys', 'response_body', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM idempotency_keys WHERE status_code IS NULL")
+    op.alter_column('idempotency_keys', 'response_body', existing_type=sa.Text(), nullable=False)
+    op.alter_column('idempotency_keys', 'status_code', existing_type=sa.Integer(), nullable=False)
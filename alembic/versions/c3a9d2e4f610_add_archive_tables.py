@@ -0,0 +1,83 @@
+"""add_archive_tables
+
+Revision ID: c3a9d2e4f610
+Revises: 5b1f0c7d9e21
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9d2e4f610'
+down_revision: Union[str, None] = '5b1f0c7d9e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 归档表保留原记录ID，枚举定义与热表一致，便于 INSERT ... SELECT 直接迁移
+    op.create_table('customer_selections_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('dish_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('status', sa.Enum('active', 'cancelled', name='selectionstatus'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['dish_id'], ['dishes.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_archive_user_date', 'customer_selections_archive', ['user_id', 'date'])
+
+    op.create_table('chef_selections_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('chef_id', sa.Integer(), nullable=False),
+        sa.Column('customer_selection_id', sa.Integer(), nullable=False),
+        sa.Column('dish_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('status', sa.Enum('active', 'cancelled', name='chefselectionstatus'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['dish_id'], ['dishes.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_archive_chef_date', 'chef_selections_archive', ['chef_id', 'date'])
+
+    op.create_table('daily_recommendations_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('dish_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_archive_date', 'daily_recommendations_archive', ['date'])
+
+    op.create_table('chef_customer_bindings_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('chef_id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('pending', 'approved', 'rejected', 'unbound', name='bindingstatus'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_archive_customer_chef', 'chef_customer_bindings_archive', ['customer_id', 'chef_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_archive_customer_chef', table_name='chef_customer_bindings_archive')
+    op.drop_table('chef_customer_bindings_archive')
+    op.drop_index('idx_archive_date', table_name='daily_recommendations_archive')
+    op.drop_table('daily_recommendations_archive')
+    op.drop_index('idx_archive_chef_date', table_name='chef_selections_archive')
+    op.drop_table('chef_selections_archive')
+    op.drop_index('idx_archive_user_date', table_name='customer_selections_archive')
+    op.drop_table('customer_selections_archive')
@@ -0,0 +1,88 @@
+"""partition_selection_tables_by_month
+
+Revision ID: d81e6b0a4c37
+Revises: c3a9d2e4f610
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81e6b0a4c37'
+down_revision: Union[str, None] = 'c3a9d2e4f610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONED_TABLES = ('customer_selections', 'chef_selections')
+
+# 分区表不支持外键，降级时按原样恢复
+FOREIGN_KEYS = {
+    'customer_selections': [
+        (['user_id'], 'users', ['id']),
+        (['dish_id'], 'dishes', ['id']),
+    ],
+    'chef_selections': [
+        (['chef_id'], 'users', ['id']),
+        (['customer_selection_id'], 'customer_selections', ['id']),
+        (['dish_id'], 'dishes', ['id']),
+    ],
+}
+
+MONTHS_AHEAD = 3
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    month_index = day.year * 12 + day.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    # 仅 MySQL 分区；SQLite 等其他数据库保持普通表，应用代码无需区分
+    bind = op.get_bind()
+    if bind.dialect.name != 'mysql':
+        return
+
+    inspector = sa.inspect(bind)
+
+    # 1. 删除外键（先删 chef_selections 对 customer_selections 的引用）
+    for table in ('chef_selections', 'customer_selections'):
+        for foreign_key in inspector.get_foreign_keys(table):
+            op.drop_constraint(foreign_key['name'], table, type_='foreignkey')
+
+    today = date.today()
+    for table in PARTITIONED_TABLES:
+        # 2. 分区键必须包含在主键中
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, date)")
+
+        # 3. 从已有数据的最早月份到未来 MONTHS_AHEAD 个月按月建分区
+        first_date = bind.execute(sa.text(f"SELECT MIN(date) FROM {table}")).scalar() or today
+        month = _month_start(first_date)
+        definitions = []
+        while month <= _month_start(today, MONTHS_AHEAD):
+            next_month = _month_start(month, 1)
+            definitions.append(
+                f"PARTITION p{month.year:04d}{month.month:02d} VALUES LESS THAN ('{next_month.isoformat()}')"
+            )
+            month = next_month
+        definitions.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+
+        op.execute(f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS(date) ({', '.join(definitions)})")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'mysql':
+        return
+
+    for table in PARTITIONED_TABLES:
+        op.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+
+    for table in PARTITIONED_TABLES:
+        for local_columns, referent_table, remote_columns in FOREIGN_KEYS[table]:
+            op.create_foreign_key(None, table, referent_table, local_columns, remote_columns)
@@ -0,0 +1,49 @@
+"""add_daily_stats_rollups
+
+Revision ID: e5c47a91b2d8
+Revises: d81e6b0a4c37
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c47a91b2d8'
+down_revision: Union[str, None] = 'd81e6b0a4c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('dish_daily_stats',
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('dish_id', sa.Integer(), nullable=False),
+        sa.Column('picks', sa.Integer(), nullable=False),
+        sa.Column('pick_cancellations', sa.Integer(), nullable=False),
+        sa.Column('claims', sa.Integer(), nullable=False),
+        sa.Column('claim_cancellations', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['dish_id'], ['dishes.id'], ),
+        sa.PrimaryKeyConstraint('date', 'dish_id')
+    )
+    op.create_index('idx_dish_date', 'dish_daily_stats', ['dish_id', 'date'])
+
+    op.create_table('chef_daily_stats',
+        sa.Column('chef_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('dish_id', sa.Integer(), nullable=False),
+        sa.Column('claims', sa.Integer(), nullable=False),
+        sa.Column('claim_cancellations', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['chef_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['dish_id'], ['dishes.id'], ),
+        sa.PrimaryKeyConstraint('chef_id', 'date', 'dish_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('chef_daily_stats')
+    op.drop_index('idx_dish_date', table_name='dish_daily_stats')
+    op.drop_table('dish_daily_stats')
@@ -0,0 +1,38 @@
+"""add_change_log
+
+Revision ID: f3b8c1d2a7e9
+Revises: e5c47a91b2d8
+Create Date: 2026-10-19 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8c1d2a7e9'
+down_revision: Union[str, None] = 'e5c47a91b2d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('change_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=32), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('op', sa.String(length=16), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_user_id', 'change_log', ['user_id', 'id'])
+    op.create_index('idx_created_at', 'change_log', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_created_at', table_name='change_log')
+    op.drop_index('idx_user_id', table_name='change_log')
+    op.drop_table('change_log')
@@ -15,6 +15,57 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8080
 
+    # Cache
+    PREP_BOARD_CACHE_SIZE: int = 1024  # 备菜看板缓存的厨师数上限
+    PREP_BOARD_CACHE_TTL_SECONDS: int = 60  # 备菜看板缓存过期时间（多进程部署时的兜底）
+
+    # Idempotency
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # 幂等键保留时间
+    IDEMPOTENCY_CACHE_SIZE: int = 4096  # 进程内幂等响应缓存条目上限
+    IDEMPOTENCY_PENDING_TIMEOUT_SECONDS: int = 60  # 处理中的幂等键超过该时间未完成（如进程崩溃）时允许重新占用
+
+    # Trending
+    TRENDING_BUCKET_SECONDS: int = 300  # 热门菜品计数的分桶粒度
+    TRENDING_RESYNC_SECONDS: int = 300  # 从数据库重建热门菜品计数的间隔
+
+    # Events
+    EVENT_QUEUE_SIZE: int = 100  # 每个实时连接积压事件的上限，超出后通知客户端重新拉取
+    SSE_KEEPALIVE_SECONDS: int = 15  # SSE 连接无事件时发送心跳注释的间隔
+
+    # Compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # 小于该字节数的响应不压缩
+    COMPRESSION_GZIP_LEVEL: int = 6  # gzip 压缩级别（1-9）
+    COMPRESSION_BROTLI_QUALITY: int = 5  # brotli 压缩质量（0-11，需安装 brotli）
+    COMPRESSION_CACHE_SIZE: int = 256  # 带 ETag 响应的压缩结果缓存条目上限
+
+    # Profiling
+    PROFILING_TOKEN: Optional[str] = None  # 请求头 X-Profile-Token 与之相同时采样该请求，为空则不接受请求头触发
+    PROFILING_SAMPLE_RATE: float = 0.0  # 随机采样比例，0 表示只由请求头触发
+    PROFILING_DIR: str = "profiles"  # 采样结果输出目录
+    PROFILING_INTERVAL_SECONDS: float = 0.005  # 采样间隔
+
+    # Slow query log
+    SLOW_QUERY_THRESHOLD_MS: float = 200  # 超过该耗时的 SQL 记入慢查询日志
+    SLOW_QUERY_LOG_SIZE: int = 200  # 进程内保留的最近慢查询条数
+    SLOW_QUERY_MAX_PER_MINUTE: int = 60  # 每分钟最多记录的慢查询条数，超出部分只计数
+    SLOW_QUERY_EXPLAIN: bool = True  # 是否在后台获取慢查询的执行计划
+
+    # Admin
+    ADMIN_TOKEN: Optional[str] = None  # 运维接口的 X-Admin-Token，为空时运维接口不可用
+
+    # Sync
+    SYNC_PAGE_SIZE: int = 500  # /api/sync 每次读取的变更记录数上限
+    CHANGE_LOG_RETENTION_DAYS: int = 30  # 变更日志保留天数，更早的游标需要全量同步
+    SYNC_COMMIT_LAG_SECONDS: int = 5  # 写入时间在该秒数内的变更不推进游标（并发事务可能乱序提交）
+
+    # Archive
+    ARCHIVE_HORIZON_DAYS: int = 90  # 早于该天数的选菜、推荐和已解绑关系迁移到归档表
+    ARCHIVE_BATCH_SIZE: int = 1000  # 归档任务每批迁移的记录数
+
+    # Partition（仅 MySQL）
+    PARTITION_MONTHS_AHEAD: int = 3  # 预先创建未来几个月的选菜表分区
+    PARTITION_RETENTION_MONTHS: int = 12  # 保留最近几个月的分区
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,15 +1,76 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .database import SessionLocal, engine
+from .middleware import CompressionMiddleware, IdempotencyMiddleware, MetricsMiddleware, ProfilingMiddleware
+from .routers import auth, dishes, customer_selections, chef_selections, bindings, binding_requests, analytics, sync, admin
+from .services import trending_service
+from .utils import metrics, profiler
+from .utils.event_hub import event_hub
+from .utils.slow_query import slow_query_log
+from .utils.serialization import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+def _rebuild_trending() -> None:
+    db = SessionLocal()
+    try:
+        trending_service.rebuild(db)
+    finally:
+        db.close()
+
+
+async def _resync_trending() -> None:
+    """定期从数据库重建热门菜品计数，合并其他进程的写入并修正漂移"""
+    while True:
+        await asyncio.sleep(settings.TRENDING_RESYNC_SECONDS)
+        try:
+            await run_in_threadpool(_rebuild_trending)
+        except Exception:
+            logger.exception("Failed to resync trending dishes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await event_hub.start()
+
+    try:
+        await run_in_threadpool(_rebuild_trending)
+    except Exception:
+        # 数据库暂不可用时不阻止启动，等待下次定期重建
+        logger.exception("Failed to rebuild trending dishes on startup")
+
+    resync_task = asyncio.create_task(_resync_trending())
+    try:
+        yield
+    finally:
+        resync_task.cancel()
+        await event_hub.stop()
 
-from .routers import auth, dishes, customer_selections, chef_selections, bindings, binding_requests
 
 app = FastAPI(
     title="Tiny Menu API",
     description="智能点餐系统后端API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# CORS配置
+# 幂等键：重试的创建请求直接重放首次响应
+app.add_middleware(IdempotencyMiddleware)
+
+# 响应压缩（位于幂等中间件外层，幂等缓存保存未压缩的响应，重放时按客户端的 Accept-Encoding 重新协商）
+app.add_middleware(CompressionMiddleware)
+
+# CORS配置（位于幂等和压缩中间件外层，重放的响应同样带上跨域头）
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # 生产环境应该指定具体域名
@@ -18,6 +79,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 按需采样分析（未配置令牌和采样率时不注册，没有任何开销）
+if settings.PROFILING_TOKEN or settings.PROFILING_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilingMiddleware)
+    profiler.instrument_engine(engine)
+
+# 请求指标（位于最外层，计入所有中间件的耗时）
+app.add_middleware(MetricsMiddleware)
+metrics.instrument_engine(engine)
+
+# 慢查询日志（在应用装配时注册；database 模块不能导入 app.utils，否则 models 与 utils.auth 循环导入）
+slow_query_log.install(engine)
+
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -43,6 +116,14 @@ async def health_check():
     }
 
 
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Prometheus 格式的进程内指标：请求数和耗时、每请求 SQL 条数和耗时、连接池、缓存命中率、bcrypt 耗时
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # 注册路由
 app.include_router(auth.router)
 app.include_router(dishes.router)
@@ -50,10 +131,12 @@ app.include_router(customer_selections.router)
 app.include_router(chef_selections.router)
 app.include_router(bindings.router)
 app.include_router(binding_requests.router)
+app.include_router(analytics.router)
+app.include_router(sync.router)
+app.include_router(admin.router)
 
 if __name__ == "__main__":
     import uvicorn
-    from .config import settings
 
     uvicorn.run(
         "app.main:app",
@@ -0,0 +1,15 @@
+"""
+中间件
+处理与具体业务无关的横切逻辑（幂等重放、响应压缩、请求指标、采样分析等）
+"""
+from .compression import CompressionMiddleware
+from .idempotency import IdempotencyMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+
+__all__ = [
+    "CompressionMiddleware",
+    "IdempotencyMiddleware",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+]
@@ -0,0 +1,242 @@
+"""
+响应压缩中间件（纯 ASGI 实现）
+按 Accept-Encoding 协商 br / gzip，小于阈值的响应不压缩；
+带 ETag 的响应体（如菜品列表）压缩结果按 (路径, ETag, 编码) 缓存，相同内容不重复压缩
+"""
+import gzip
+import zlib
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+from ..utils.cache import LRUCache
+from ..utils.metrics import registry as metrics_registry
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时只使用 gzip
+    brotli = None
+
+# 可压缩的内容类型（text/event-stream 需要逐条实时送达，不压缩）
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+# 超过该大小的响应不放入压缩缓存
+MAX_CACHED_BODY = 1024 * 1024
+
+
+def parse_accept_encoding(header: str) -> List[str]:
+    """解析 Accept-Encoding，返回 q 值大于 0 的编码（小写）"""
+    encodings = []
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            encodings.append(name.strip().lower())
+    return encodings
+
+
+class _StreamCompressor:
+    """流式响应的增量压缩器"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits=31 输出 gzip 格式
+
+    def compress(self, chunk: bytes) -> bytes:
+        """压缩一个分块并立即刷出，保证客户端能及时收到数据"""
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件
+    - minimum_size: 小于该字节数的响应不压缩（压缩收益抵不上 CPU 开销）
+    - gzip_level / brotli_quality: 压缩级别
+    - cache_size: 压缩结果缓存条目数，0 表示不缓存
+    已带 Content-Encoding、状态码为 204/304 或内容类型不可压缩的响应原样返回
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None,
+        cache_size: Optional[int] = None
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        self.gzip_level = settings.COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level
+        self.brotli_quality = settings.COMPRESSION_BROTLI_QUALITY if brotli_quality is None else brotli_quality
+        cache_size = settings.COMPRESSION_CACHE_SIZE if cache_size is None else cache_size
+        self.cache = LRUCache(maxsize=cache_size) if cache_size > 0 else None
+        if self.cache is not None:
+            metrics_registry.register_cache("compression", self.cache)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, self._vary_only(send))
+            return
+
+        responder = _CompressionResponder(self, scope, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def _vary_only(self, send: Send) -> Send:
+        """
+        客户端不接受压缩时原样返回，但本可以压缩的响应同样带 Vary: Accept-Encoding，
+        否则共享缓存可能把未压缩的版本返回给支持压缩的客户端（或反之）
+        """
+        async def send_with_vary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if self.compressible(headers, message["status"]):
+                    headers.add_vary_header("Accept-Encoding")
+            await send(message)
+
+        return send_with_vary
+
+    def compressible(self, headers: Headers, status_code: int) -> bool:
+        """响应是否会被压缩（只看响应头；未声明长度的响应按可压缩处理）"""
+        if status_code in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return False
+        content_length = headers.get("content-length")
+        return content_length is None or int(content_length) >= self.minimum_size
+
+    def _negotiate(self, accept_encoding: str) -> Optional[str]:
+        accepted = parse_accept_encoding(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+class _CompressionResponder:
+    """包装单个请求的 send：缓存响应头，根据第一个响应体分块决定是否压缩"""
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, encoding: str, send: Send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self._send = send
+        self._start_message: Optional[Message] = None
+        self._started = False
+        self._passthrough = False
+        self._buffered = False
+        self._chunks: List[bytes] = []
+        self._stream: Optional[_StreamCompressor] = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start_message = message
+            headers = MutableHeaders(raw=message["headers"])
+            self._passthrough = not self.middleware.compressible(headers, message["status"])
+            # 声明了 Content-Length 的响应即使分块送达（如经过 BaseHTTPMiddleware）也是定长的，先收齐再整体压缩
+            self._buffered = "content-length" in headers
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self._passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._buffered:
+            self._chunks.append(body)
+            if not more_body:
+                await self._send_complete(b"".join(self._chunks))
+            return
+
+        if not self._started:
+            if not more_body:
+                await self._send_complete(body)
+                return
+            # 流式响应：逐块压缩
+            self._stream = _StreamCompressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            headers = self._compressed_headers()
+            del headers["content-length"]
+            await self._flush_start()
+
+        chunk = self._stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self._stream.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _send_complete(self, body: bytes) -> None:
+        """非流式响应：整体压缩（小于阈值时原样返回）"""
+        if len(body) < self.middleware.minimum_size:
+            await self._flush_start()
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        headers = self._compressed_headers()
+        compressed = self._compress_cached(headers.get("etag"), body)
+        headers["content-length"] = str(len(compressed))
+        await self._flush_start()
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _compress_cached(self, etag: Optional[str], body: bytes) -> bytes:
+        cache = self.middleware.cache
+        if cache is None or etag is None or len(body) > MAX_CACHED_BODY:
+            return self.middleware.compress(self.encoding, body)
+
+        key: Tuple = (self.scope["path"], self.scope.get("query_string", b""), etag, self.encoding)
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = self.middleware.compress(self.encoding, body)
+            cache.set(key, compressed)
+        return compressed
+
+    def _compressed_headers(self) -> MutableHeaders:
+        """设置 Content-Encoding 和 Vary；强 ETag 改为弱 ETag（压缩后字节不同，但语义等价）"""
+        headers = MutableHeaders(raw=self._start_message["headers"])
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+        return headers
+
+    async def _flush_start(self) -> None:
+        if not self._started:
+            self._started = True
+            await self._send(self._start_message)
@@ -0,0 +1,176 @@
+"""
+幂等键中间件
+客户端在网络不稳定时会重试 POST 请求，携带相同 Idempotency-Key 的重试直接重放首次成功的响应，
+不会再次执行校验查询，也不会重复创建记录（首次请求执行前先在数据库中占用幂等键，多进程部署同样有效）
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError, jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Match
+
+from ..config import settings
+from ..database import SessionLocal
+from ..services import idempotency_service
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# 支持幂等键的创建接口
+IDEMPOTENT_PATHS = {
+    "/api/customer-selections",
+    "/api/chef-selections",
+    "/api/bindings/request",
+    "/api/binding-requests",
+    "/api/dishes",
+}
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """
+    幂等键中间件
+    - 只处理 IDEMPOTENT_PATHS 中带 Idempotency-Key 请求头的 POST 请求
+    - 执行前在数据库中占用幂等键，同一个键的请求仍在处理时（可能在其他进程中）返回 409
+    - 只保存 2xx 响应，失败或出错的请求释放幂等键，允许客户端用同一个键重试
+    - 同一个键用于不同请求体时返回 422
+    - 不经过路由直接返回的响应（重放、409、422）也标记所属路由，指标按路由统计而不是记为 <unmatched>
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if (
+            request.method != "POST"
+            or request.url.path not in IDEMPOTENT_PATHS
+            or not idempotency_key
+        ):
+            return await call_next(request)
+
+        if len(idempotency_key) > 255:
+            _resolve_route(request)
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": "Idempotency-Key is too long"}
+            )
+
+        # 未登录的请求交给路由返回 401，不做幂等处理
+        subject = _token_subject(request)
+        if subject is None:
+            return await call_next(request)
+
+        scope_key = hashlib.sha256(
+            f"{subject}:{request.method}:{request.url.path}:{idempotency_key}".encode()
+        ).hexdigest()
+        request_hash = hashlib.sha256(await request.body()).hexdigest()
+
+        stored = await run_in_threadpool(_reserve_key, scope_key, request_hash)
+        if stored is not None:
+            _resolve_route(request)
+            return _replay(stored, request_hash)
+
+        try:
+            response = await call_next(request)
+            if not 200 <= response.status_code < 300:
+                await run_in_threadpool(_release_key, scope_key)
+                return response
+
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        except BaseException:
+            await run_in_threadpool(_release_key, scope_key)
+            raise
+
+        await run_in_threadpool(
+            _complete_response, scope_key, request_hash, response.status_code, body.decode()
+        )
+        replayed = Response(content=body, status_code=response.status_code, background=response.background)
+        # 使用原始响应头，保留重复的响应头（如多个 Set-Cookie）
+        replayed.raw_headers = list(response.raw_headers)
+        return replayed
+
+
+def _resolve_route(request: Request) -> None:
+    """
+    为不经过路由的响应设置 scope["route"]
+    外层的 MetricsMiddleware 与本中间件共用同一个 scope，按其中的路由记录指标
+    """
+    route = _match_route(request.app.router.routes, request.scope)
+    if route is not None:
+        request.scope["route"] = route
+
+
+def _match_route(routes, scope) -> Optional[BaseRoute]:
+    """在路由表中查找完全匹配的路由，逐层进入 include_router 引入的子路由"""
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match != Match.FULL:
+            continue
+        # 新版 FastAPI 把 include_router 引入的路由包装为子路由（original_router），各子路由自带完整前缀
+        children = getattr(getattr(route, "original_router", route), "routes", None)
+        if children is None:
+            return route
+        return _match_route(children, scope)
+    return None
+
+
+def _token_subject(request: Request) -> Optional[str]:
+    """从 Bearer token 中解析用户名，无效时返回 None"""
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+def _replay(stored: idempotency_service.StoredResponse, request_hash: str) -> Response:
+    """重放已保存的响应"""
+    if stored.request_hash != request_hash:
+        return JSONResponse(
+            status_code=422,  # Unprocessable Content，兼容新旧 Starlette 的常量命名
+            content={"detail": "Idempotency-Key has already been used with a different request body"}
+        )
+
+    if stored.pending:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": "A request with this Idempotency-Key is still being processed"},
+            headers={"Retry-After": "1"}
+        )
+
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+def _reserve_key(scope_key: str, request_hash: str) -> Optional[idempotency_service.StoredResponse]:
+    db = SessionLocal()
+    try:
+        return idempotency_service.reserve_key(db, scope_key, request_hash)
+    finally:
+        db.close()
+
+
+def _complete_response(scope_key: str, request_hash: str, status_code: int, body: str) -> None:
+    db = SessionLocal()
+    try:
+        idempotency_service.complete_response(db, scope_key, request_hash, status_code, body)
+    finally:
+        db.close()
+
+
+def _release_key(scope_key: str) -> None:
+    db = SessionLocal()
+    try:
+        idempotency_service.release_key(db, scope_key)
+    finally:
+        db.close()
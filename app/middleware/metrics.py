@@ -0,0 +1,51 @@
+"""
+请求指标中间件（纯 ASGI 实现）
+按路由模板（如 /api/dishes/{dish_id}）统计请求数、耗时以及每个请求执行的 SQL 条数和耗时
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils import metrics
+
+# 未匹配到路由的请求（404 扫描等）统一归到一个标签下，避免标签基数无限增长
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """请求指标中间件，需注册在所有业务中间件外层以计入它们的耗时"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = metrics.RequestDBStats()
+        token = metrics.current_db_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.current_db_stats.reset(token)
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            status = str(status_code)
+
+            metrics.http_requests_total.inc(method, route_path, status)
+            metrics.http_request_duration_seconds.observe(elapsed, method, route_path, status)
+            metrics.http_request_db_queries.observe(stats.queries, method, route_path)
+            metrics.http_request_db_seconds.observe(stats.seconds, method, route_path)
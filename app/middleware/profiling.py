@@ -0,0 +1,99 @@
+"""
+请求采样分析中间件（纯 ASGI 实现）
+携带正确 X-Profile-Token 请求头的请求，或按 PROFILING_SAMPLE_RATE 随机抽中的请求会被采样，
+调用栈和数据库耗时写入 PROFILING_DIR；未抽中的请求只多一次随机数判断和进行中请求数的计数。
+有并发请求时，共享的事件循环和线程池线程上只记录当前请求的 SQL 执行部分（见 utils/profiler.py），
+完整的调用栈需要在没有其他请求时采样
+"""
+import hmac
+import random
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+from ..utils import metrics
+from ..utils import profiler as request_profiler
+from ..utils.profiler import RequestProfiler, current_profiler
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ProfilingMiddleware:
+    """
+    请求采样分析中间件
+    - token: 调试令牌，为空时不接受请求头触发
+    - sample_rate: 随机采样比例（0 表示只由请求头触发）
+    被采样的响应带 X-Profile-Id 响应头，对应 {directory}/{id}.folded 和 {id}.json
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        directory: Optional[str] = None,
+        interval: Optional[float] = None
+    ):
+        self.app = app
+        self.token = settings.PROFILING_TOKEN if token is None else token
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.directory = settings.PROFILING_DIR if directory is None else directory
+        self.interval = settings.PROFILING_INTERVAL_SECONDS if interval is None else interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_profiler.request_started()
+        try:
+            if self._should_profile(scope):
+                await self._profile(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            request_profiler.request_finished()
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{random.getrandbits(32):08x}"
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id
+            await send(message)
+
+        profiler = RequestProfiler(self.interval)
+        token = current_profiler.set(profiler)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            current_profiler.reset(token)
+            db_stats = metrics.current_db_stats.get()
+            route = scope.get("route")
+            summary = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status_code,
+                "db_queries": db_stats.queries if db_stats is not None else None,
+                "db_seconds": round(db_stats.seconds, 6) if db_stats is not None else None,
+            }
+            await run_in_threadpool(profiler.write, self.directory, profile_id, summary)
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.token:
+            header = Headers(scope=scope).get(PROFILE_HEADER)
+            if header and hmac.compare_digest(header.encode(), self.token.encode()):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
@@ -4,6 +4,15 @@ from .daily_recommendation import DailyRecommendation
 from .customer_selection import CustomerSelection
 from .chef_selection import ChefSelection
 from .chef_customer_binding import ChefCustomerBinding
+from .idempotency_key import IdempotencyKey
+from .change_log import ChangeLog
+from .daily_stats import DishDailyStats, ChefDailyStats
+from .archive import (
+    CustomerSelectionArchive,
+    ChefSelectionArchive,
+    DailyRecommendationArchive,
+    ChefCustomerBindingArchive,
+)
 
 __all__ = [
     "User",
@@ -12,4 +21,12 @@ __all__ = [
     "CustomerSelection",
     "ChefSelection",
     "ChefCustomerBinding",
+    "IdempotencyKey",
+    "ChangeLog",
+    "DishDailyStats",
+    "ChefDailyStats",
+    "CustomerSelectionArchive",
+    "ChefSelectionArchive",
+    "DailyRecommendationArchive",
+    "ChefCustomerBindingArchive",
 ]
@@ -0,0 +1,88 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index, Enum
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..database import Base
+from .customer_selection import SelectionStatus
+from .chef_selection import ChefSelectionStatus
+from .chef_customer_binding import BindingStatus
+
+
+class CustomerSelectionArchive(Base):
+    """
+    顾客选菜归档表
+    由归档任务从 customer_selections 迁移过来，保留原记录ID
+    """
+    __tablename__ = "customer_selections_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False)
+    dish_id = Column(Integer, ForeignKey("dishes.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    status = Column(Enum(SelectionStatus), nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # 关联
+    dish = relationship("Dish")
+
+    __table_args__ = (
+        Index('idx_archive_user_date', 'user_id', 'date'),  # 查询用户历史选菜
+    )
+
+
+class ChefSelectionArchive(Base):
+    """
+    厨师认领归档表
+    由归档任务从 chef_selections 迁移过来，保留原记录ID
+    """
+    __tablename__ = "chef_selections_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    chef_id = Column(Integer, nullable=False)
+    customer_selection_id = Column(Integer, nullable=False)  # 对应的顾客选择可能在热表或归档表中
+    dish_id = Column(Integer, ForeignKey("dishes.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    status = Column(Enum(ChefSelectionStatus), nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # 关联
+    dish = relationship("Dish")
+
+    __table_args__ = (
+        Index('idx_archive_chef_date', 'chef_id', 'date'),  # 查询厨师历史认领
+    )
+
+
+class DailyRecommendationArchive(Base):
+    """每日推荐归档表"""
+    __tablename__ = "daily_recommendations_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    date = Column(Date, nullable=False)
+    dish_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_archive_date', 'date'),  # 按日期查询历史推荐
+    )
+
+
+class ChefCustomerBindingArchive(Base):
+    """已解绑或已拒绝的绑定关系归档表"""
+    __tablename__ = "chef_customer_bindings_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    chef_id = Column(Integer, nullable=False)
+    customer_id = Column(Integer, nullable=False)
+    status = Column(Enum(BindingStatus), nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_archive_customer_chef', 'customer_id', 'chef_id'),  # 查询顾客历史绑定
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ChangeLog(Base):
+    """
+    变更日志（outbox）
+    菜品、绑定关系和选菜的写操作在同一事务内追加记录，/api/sync 按自增 id 增量读取
+    """
+    __tablename__ = "change_log"
+
+    id = Column(Integer, primary_key=True)  # 同步游标
+    entity_type = Column(String(32), nullable=False)  # dish / binding / customer_selection / chef_selection
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(16), nullable=False)  # upsert / delete
+    user_id = Column(Integer, nullable=True)  # 需要同步该变更的用户，NULL 表示所有用户（如菜品）
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_user_id', 'user_id', 'id'),  # 按用户（含 NULL 公共记录）读取游标之后的变更
+        Index('idx_created_at', 'created_at'),  # 压缩旧记录
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index, Enum
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index, Enum, Computed
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -12,6 +12,8 @@ class ChefSelectionStatus(str, enum.Enum):
 
 class ChefSelection(Base):
     __tablename__ = "chef_selections"
+    # MySQL 上按月 RANGE COLUMNS(date) 分区，主键为 (id, date)；分区表不支持外键，
+    # 下面的 ForeignKey 只用于 ORM 关联和 SQLite 建表（见 scripts/maintain_partitions.py）
 
     id = Column(Integer, primary_key=True)
     chef_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -21,6 +23,9 @@ class ChefSelection(Base):
     status = Column(Enum(ChefSelectionStatus), default=ChefSelectionStatus.ACTIVE, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # 生效中为 1、已取消为 NULL 的生成列，配合唯一索引保证同一顾客选择只被认领一次
+    # 比较值为 ORM 存储的枚举名，MySQL 的 ENUM 比较不区分大小写
+    active_flag = Column(Integer, Computed("CASE WHEN status = 'ACTIVE' THEN 1 END"))
 
     # 关联
     chef = relationship("User", foreign_keys=[chef_id])
@@ -29,5 +34,5 @@ class ChefSelection(Base):
 
     __table_args__ = (
         Index('idx_chef_date', 'chef_id', 'date'),  # 查询厨师今日选择
-        Index('idx_chef_customer_selection_status', 'chef_id', 'customer_selection_id', 'date', 'status'),  # 检查是否重复选择（加入状态）
+        Index('uq_chef_customer_selection_active', 'chef_id', 'customer_selection_id', 'date', 'active_flag', unique=True),  # 数据库保证不重复认领
     )
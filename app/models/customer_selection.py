@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index, Enum
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index, Enum, Computed
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -12,6 +12,8 @@ class SelectionStatus(str, enum.Enum):
 
 class CustomerSelection(Base):
     __tablename__ = "customer_selections"
+    # MySQL 上按月 RANGE COLUMNS(date) 分区，主键为 (id, date)；分区表不支持外键，
+    # 下面的 ForeignKey 只用于 ORM 关联和 SQLite 建表（见 scripts/maintain_partitions.py）
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -20,6 +22,9 @@ class CustomerSelection(Base):
     status = Column(Enum(SelectionStatus), default=SelectionStatus.ACTIVE, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # 生效中为 1、已取消为 NULL 的生成列，配合唯一索引保证同一天同一菜品只有一条生效选择
+    # 比较值为 ORM 存储的枚举名，MySQL 的 ENUM 比较不区分大小写
+    active_flag = Column(Integer, Computed("CASE WHEN status = 'ACTIVE' THEN 1 END"))
 
     # 关联
     user = relationship("User")
@@ -28,5 +33,5 @@ class CustomerSelection(Base):
     __table_args__ = (
         Index('idx_user_date', 'user_id', 'date'),  # 查询用户今日选菜
         Index('idx_date_user', 'date', 'user_id'),  # 按日期查询所有选菜
-        Index('idx_user_dish_date_status', 'user_id', 'dish_id', 'date', 'status'),  # 检查是否重复选择（加入状态）
+        Index('uq_user_dish_date_active', 'user_id', 'dish_id', 'date', 'active_flag', unique=True),  # 数据库保证不重复选择
     )
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index
+from ..database import Base
+
+
+class DishDailyStats(Base):
+    """
+    菜品每日统计（汇总表）
+    选菜和认领写入时在同一事务内增量更新，也可以由 scripts/rebuild_daily_stats.py 从明细重算
+    """
+    __tablename__ = "dish_daily_stats"
+
+    date = Column(Date, primary_key=True)
+    dish_id = Column(Integer, ForeignKey("dishes.id"), primary_key=True)
+    picks = Column(Integer, nullable=False, default=0)  # 顾客点菜次数（含之后取消的）
+    pick_cancellations = Column(Integer, nullable=False, default=0)  # 顾客取消次数
+    claims = Column(Integer, nullable=False, default=0)  # 厨师认领次数（含之后取消的）
+    claim_cancellations = Column(Integer, nullable=False, default=0)  # 厨师取消认领次数
+
+    __table_args__ = (
+        Index('idx_dish_date', 'dish_id', 'date'),  # 查询单个菜品的每日趋势
+    )
+
+
+class ChefDailyStats(Base):
+    """厨师每日每菜品认领统计（汇总表）"""
+    __tablename__ = "chef_daily_stats"
+
+    chef_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    dish_id = Column(Integer, ForeignKey("dishes.id"), primary_key=True)
+    claims = Column(Integer, nullable=False, default=0)  # 认领次数（含之后取消的）
+    claim_cancellations = Column(Integer, nullable=False, default=0)  # 取消认领次数
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    幂等键记录
+    保存带 Idempotency-Key 请求头的 POST 请求的响应，客户端重试时直接重放
+    请求处理前先插入 status_code 为空的记录占用幂等键，成功后写入响应，失败时删除
+    """
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True)
+    scope_key = Column(String(64), nullable=False)  # sha256(用户 + 方法 + 路径 + 幂等键)
+    request_hash = Column(String(64), nullable=False)  # 请求体 sha256，用于识别同一个键被用于不同请求
+    status_code = Column(Integer, nullable=True)  # 为空表示请求仍在处理
+    response_body = Column(Text, nullable=True)  # 响应 JSON 原文
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)  # 过期时间（UTC），处理中的记录过期后视为已放弃
+
+    __table_args__ = (
+        Index('uq_scope_key', 'scope_key', unique=True),  # 按幂等键查找已保存的响应
+        Index('idx_expires_at', 'expires_at'),  # 清理过期记录
+    )
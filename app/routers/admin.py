@@ -0,0 +1,47 @@
+"""
+运维路由
+需要 X-Admin-Token 请求头，只读取进程内的诊断数据
+"""
+from fastapi import APIRouter, Depends, Query, status
+
+from ..schemas.admin import SlowQueryLogResponse
+from ..utils.auth import require_admin_token
+from ..utils.slow_query import slow_query_log
+
+router = APIRouter(prefix="/api/admin", tags=["运维"], dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/slow-queries", response_model=SlowQueryLogResponse)
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="返回的记录数（新的在前）"),
+    min_duration_ms: float = Query(0, ge=0, description="只返回耗时不低于该值的记录")
+):
+    """
+    当前进程最近的慢查询
+
+    Args:
+        limit: 返回的记录数（默认50）
+        min_duration_ms: 最小耗时过滤（毫秒）
+
+    Returns:
+        SlowQueryLogResponse: 阈值、被限流丢弃的条数和慢查询记录（含执行计划）
+
+    Raises:
+        403: X-Admin-Token 无效或未配置 ADMIN_TOKEN
+    """
+    return {
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "dropped": slow_query_log.dropped,
+        "items": slow_query_log.entries(limit, min_duration_ms),
+    }
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries():
+    """
+    清空当前进程的慢查询日志
+
+    Raises:
+        403: X-Admin-Token 无效或未配置 ADMIN_TOKEN
+    """
+    slow_query_log.clear()
@@ -0,0 +1,95 @@
+"""
+统计路由
+只读取每日汇总表，不扫描选菜明细
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+
+from ..database import get_db
+from ..models.user import User
+from ..schemas.analytics import DishDailyStatsResponse, ChefDailyStatsResponse, DishRankingItem
+from ..utils.auth import get_current_user
+from ..services import analytics_service
+
+router = APIRouter(prefix="/api/analytics", tags=["数据统计"])
+
+
+@router.get("/dishes/top", response_model=List[DishRankingItem])
+def get_top_dishes(
+    from_date: Optional[date] = Query(None, alias="from", description="起始日期（包含），默认结束日期前29天"),
+    to_date: Optional[date] = Query(None, alias="to", description="结束日期（包含），默认今天"),
+    limit: int = Query(10, ge=1, le=100, description="返回的菜品数"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    时间段内最受欢迎的菜品（按扣除取消后的点菜次数排序）
+
+    Args:
+        from_date: 起始日期（可选）
+        to_date: 结束日期（可选）
+        limit: 返回的菜品数（默认10，最大100）
+        db: 数据库会话（依赖注入）
+        current_user: 当前登录用户（依赖注入）
+
+    Returns:
+        List[DishRankingItem]: 菜品排行
+
+    Raises:
+        400: 日期范围无效或超过366天
+    """
+    return analytics_service.get_top_dishes(db, from_date, to_date, limit)
+
+
+@router.get("/dishes/{dish_id}/daily", response_model=List[DishDailyStatsResponse])
+def get_dish_daily_stats(
+    dish_id: int,
+    from_date: Optional[date] = Query(None, alias="from", description="起始日期（包含），默认结束日期前29天"),
+    to_date: Optional[date] = Query(None, alias="to", description="结束日期（包含），默认今天"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    单个菜品的每日点菜、认领和取消次数
+
+    Args:
+        dish_id: 菜品ID
+        from_date: 起始日期（可选）
+        to_date: 结束日期（可选）
+        db: 数据库会话（依赖注入）
+        current_user: 当前登录用户（依赖注入）
+
+    Returns:
+        List[DishDailyStatsResponse]: 按日期升序的统计（没有数据的日期不返回）
+
+    Raises:
+        400: 日期范围无效或超过366天
+    """
+    return analytics_service.get_dish_daily_stats(db, dish_id, from_date, to_date)
+
+
+@router.get("/chefs/me/daily", response_model=List[ChefDailyStatsResponse])
+def get_my_chef_daily_stats(
+    from_date: Optional[date] = Query(None, alias="from", description="起始日期（包含），默认结束日期前29天"),
+    to_date: Optional[date] = Query(None, alias="to", description="结束日期（包含），默认今天"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    作为厨师身份查看自己每日每个菜品的认领次数
+
+    Args:
+        from_date: 起始日期（可选）
+        to_date: 结束日期（可选）
+        db: 数据库会话（依赖注入）
+        current_user: 当前登录用户（依赖注入）
+
+    Returns:
+        List[ChefDailyStatsResponse]: 按日期、菜品排序的统计
+
+    Raises:
+        400: 日期范围无效或超过366天
+    """
+    return analytics_service.get_chef_daily_stats(db, current_user, from_date, to_date)
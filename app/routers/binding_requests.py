@@ -11,6 +11,7 @@ from ..models.user import User
 from ..schemas.binding import BindingCreate, BindingUpdate, BindingResponse
 from ..utils.auth import get_current_user
 from ..services import binding_service
+from .bindings import binding_list_serializer
 
 router = APIRouter(prefix="/api/binding-requests", tags=["绑定请求"])
 
@@ -44,7 +45,9 @@ async def get_binding_requests(
             detail="You can only view your own binding requests"
         )
 
-    return binding_service.get_pending_bindings_for_chef(db, current_user)
+    return binding_list_serializer.response(
+        binding_service.get_pending_bindings_for_chef(db, current_user), validate=False
+    )
 
 
 @router.post("", response_model=BindingResponse, status_code=status.HTTP_201_CREATED)
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends, status
+import asyncio
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_db, SessionLocal
 from ..models.user import User
-from ..schemas.binding import BindingCreate, BindingUpdate, BindingResponse
-from ..utils.auth import get_current_user
+from ..schemas.binding import BindingCreate, BindingUpdate, BindingResponse, PendingBindingsResponse
+from ..utils.auth import get_current_user, get_current_user_id
+from ..utils.event_hub import event_hub, bindings_channel
+from ..utils.http_cache import check_not_modified
+from ..utils.serialization import JSONSerializer
 from ..services import binding_service
 
 router = APIRouter(prefix="/api/bindings", tags=["绑定关系"])
 
+# 服务层已构建好 BindingResponse，序列化时不再校验
+binding_list_serializer = JSONSerializer(List[BindingResponse])
+pending_bindings_serializer = JSONSerializer(PendingBindingsResponse)
+
 
 @router.post("/request", response_model=BindingResponse, status_code=status.HTTP_201_CREATED)
 async def request_binding(
@@ -52,7 +63,111 @@ async def get_pending_bindings(
     Returns:
         List[BindingResponse]: 待处理的绑定请求列表
     """
-    return binding_service.get_pending_bindings_for_chef(db, current_user)
+    return binding_list_serializer.response(
+        binding_service.get_pending_bindings_for_chef(db, current_user), validate=False
+    )
+
+
+def _load_pending(chef_id: int):
+    """用短会话查询待处理请求，等待期间不占用数据库连接"""
+    db = SessionLocal()
+    try:
+        return binding_service.get_pending_bindings_with_cursor(db, chef_id)
+    finally:
+        db.close()
+
+
+def _drain(queue: asyncio.Queue) -> None:
+    """合并已到达的多个事件，只需重新查询一次"""
+    while not queue.empty():
+        queue.get_nowait()
+
+
+@router.get(
+    "/pending/poll",
+    response_model=PendingBindingsResponse,
+    responses={204: {"description": "等待超时，待处理列表没有变化"}}
+)
+async def poll_pending_bindings(
+    since: Optional[str] = Query(None, description="上次返回的 cursor，为空时立即返回当前列表"),
+    timeout: int = Query(30, ge=1, le=60, description="最长等待秒数"),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """
+    长轮询待处理的绑定请求
+    列表与 since 一致时挂起等待，直到有新的绑定请求或请求被处理才重新查询并返回
+
+    Args:
+        since: 上次返回的游标（可选）
+        timeout: 最长等待秒数（默认30，最大60）
+        current_user_id: 当前登录用户ID（依赖注入，作为厨师身份）
+
+    Returns:
+        PendingBindingsResponse: 待处理的绑定请求列表和新游标；超时未变化时返回 204
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    # 先订阅再查询，查询之后发生的变化不会被漏掉
+    async with event_hub.subscribe(bindings_channel(current_user_id)) as queue:
+        items, cursor = await run_in_threadpool(_load_pending, current_user_id)
+        while cursor == since:
+            try:
+                await asyncio.wait_for(queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                return Response(status_code=status.HTTP_204_NO_CONTENT)
+            _drain(queue)
+            items, cursor = await run_in_threadpool(_load_pending, current_user_id)
+
+    return pending_bindings_serializer.response(
+        PendingBindingsResponse.model_construct(items=items, cursor=cursor), validate=False
+    )
+
+
+@router.get("/pending/stream")
+async def stream_pending_bindings(
+    request: Request,
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """
+    以 Server-Sent Events 推送待处理的绑定请求
+    连接建立时推送一次当前列表，之后仅在列表变化时推送（event: pending，id 为游标），
+    空闲时定期发送心跳注释；断线重连时浏览器会带上 Last-Event-ID，列表未变化则不重复推送
+
+    Args:
+        request: 请求对象（读取 Last-Event-ID）
+        current_user_id: 当前登录用户ID（依赖注入，作为厨师身份）
+
+    Returns:
+        StreamingResponse: text/event-stream
+    """
+    last_cursor = request.headers.get("last-event-id")
+
+    async def events():
+        sent_cursor = last_cursor
+        async with event_hub.subscribe(bindings_channel(current_user_id)) as queue:
+            while True:
+                items, cursor = await run_in_threadpool(_load_pending, current_user_id)
+                if cursor != sent_cursor:
+                    data = pending_bindings_serializer.dump(
+                        PendingBindingsResponse.model_construct(items=items, cursor=cursor), validate=False
+                    ).decode()
+                    yield f"id: {cursor}\nevent: pending\ndata: {data}\n\n"
+                    sent_cursor = cursor
+
+                while True:
+                    try:
+                        await asyncio.wait_for(queue.get(), settings.SSE_KEEPALIVE_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                _drain(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.put("/{binding_id}", response_model=BindingResponse)
@@ -84,14 +199,18 @@ async def update_binding_status(
 
 @router.get("/my-bindings", response_model=List[BindingResponse])
 async def get_my_bindings(
+    request: Request,
+    response: Response,
     as_chef: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    查询我的绑定关系
+    查询我的绑定关系（支持 If-None-Match，未变化时返回 304）
 
     Args:
+        request: 请求对象（读取 If-None-Match）
+        response: 响应对象（设置 ETag）
         as_chef: 是否作为厨师身份查询（默认False）
                 - true: 作为厨师身份，查看所有已同意的顾客绑定
                 - false: 作为顾客身份，查看自己绑定的所有厨师
@@ -101,7 +220,15 @@ async def get_my_bindings(
     Returns:
         List[BindingResponse]: 绑定关系列表
     """
-    return binding_service.get_my_bindings(db, current_user, as_chef)
+    not_modified = check_not_modified(
+        request, response, "bindings", current_user.id, as_chef,
+        *binding_service.get_my_bindings_validator(db, current_user, as_chef)
+    )
+    if not_modified:
+        return not_modified
+    return binding_list_serializer.response(
+        binding_service.get_my_bindings(db, current_user, as_chef), response, validate=False
+    )
 
 
 @router.delete("/{binding_id}", status_code=status.HTTP_204_NO_CONTENT)
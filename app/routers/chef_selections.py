@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 
 from ..database import get_db
 from ..models.user import User
-from ..schemas.selection import ChefSelectionCreate, ChefSelectionResponse
+from ..schemas.selection import ChefSelectionCreate, ChefSelectionResponse, PrepBoardResponse, ChefSelectionHistoryPage
 from ..utils.auth import get_current_user, require_role
+from ..utils.http_cache import check_not_modified
+from ..utils.serialization import JSONSerializer
 from ..services import selection_service
 
 router = APIRouter(prefix="/api/chef-selections", tags=["厨师选菜"])
 
+chef_selection_list_serializer = JSONSerializer(List[ChefSelectionResponse])
+
 
 @router.post("", response_model=ChefSelectionResponse, status_code=status.HTTP_201_CREATED)
 def create_chef_selection(
@@ -42,20 +47,81 @@ def create_chef_selection(
 
 @router.get("/my-selections", response_model=List[ChefSelectionResponse])
 def get_my_chef_selections(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("chef"))
 ):
     """
-    获取我的选菜记录（今日）
+    获取我的选菜记录（今日，支持 If-None-Match，未变化时返回 304）
 
     Args:
+        request: 请求对象（读取 If-None-Match）
+        response: 响应对象（设置 ETag）
         db: 数据库会话（依赖注入）
         current_user: 当前登录用户（依赖注入，需要chef角色）
 
     Returns:
         List[ChefSelectionResponse]: 今日的选菜记录列表
     """
-    return selection_service.get_my_chef_selections(db, current_user)
+    not_modified = check_not_modified(
+        request, response, "chef-selections", current_user.id,
+        *selection_service.get_my_chef_selections_validator(db, current_user)
+    )
+    if not_modified:
+        return not_modified
+    return chef_selection_list_serializer.response(
+        selection_service.get_my_chef_selections(db, current_user), response
+    )
+
+
+@router.get("/prep-board", response_model=PrepBoardResponse)
+def get_prep_board(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    备菜看板：按菜品汇总已绑定顾客今日的点菜份数（已认领/未认领）
+
+    Args:
+        db: 数据库会话（依赖注入）
+        current_user: 当前登录用户（依赖注入，作为厨师身份）
+
+    Returns:
+        PrepBoardResponse: 今日各菜品需要制作的份数统计
+    """
+    return selection_service.get_prep_board_for_chef(db, current_user)
+
+
+@router.get("/history", response_model=ChefSelectionHistoryPage)
+def get_chef_selection_history(
+    from_date: Optional[date] = Query(None, alias="from", description="起始日期（包含）"),
+    to_date: Optional[date] = Query(None, alias="to", description="结束日期（包含）"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(50, ge=1, le=200, description="每页记录数"),
+    include_archived: bool = Query(False, description="是否同时查询已归档的记录"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取我的认领历史（包含已取消的记录），按日期倒序分页
+
+    Args:
+        from_date: 起始日期（可选）
+        to_date: 结束日期（可选）
+        cursor: 分页游标（可选），为空时返回第一页
+        limit: 每页记录数（默认50，最大200）
+        include_archived: 是否同时查询已归档的记录（默认False）
+        db: 数据库会话（依赖注入）
+        current_user: 当前登录用户（依赖注入，作为厨师身份）
+
+    Returns:
+        ChefSelectionHistoryPage: 历史记录和下一页游标
+
+    Raises:
+        400: 游标无效或起始日期晚于结束日期
+    """
+    return selection_service.get_chef_selection_history(db, current_user, from_date, to_date, cursor, limit, include_archived)
 
 
 @router.delete("/{selection_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, status
+import asyncio
+from fastapi import APIRouter, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+from datetime import date
 
 from ..database import get_db
 from ..models.user import User
-from ..schemas.selection import CustomerSelectionCreate, CustomerSelectionResponse
-from ..utils.auth import get_current_user, require_role
+from ..schemas.selection import CustomerSelectionCreate, CustomerSelectionResponse, CustomerSelectionHistoryPage
+from ..utils.auth import get_current_user, get_user_id_from_token, require_role
+from ..utils.event_hub import event_hub, chef_channel
+from ..utils.http_cache import check_not_modified
+from ..utils.serialization import JSONSerializer
 from ..services import selection_service
 
 router = APIRouter(prefix="/api/customer-selections", tags=["客户选菜"])
 
+selection_list_serializer = JSONSerializer(List[CustomerSelectionResponse])
+
 
 @router.post("", response_model=CustomerSelectionResponse, status_code=status.HTTP_201_CREATED)
 def create_selection(
@@ -37,20 +45,63 @@ def create_selection(
 
 @router.get("/my-selections", response_model=List[CustomerSelectionResponse])
 def get_my_selections(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("customer"))
 ):
     """
-    获取我的选菜记录（今日）
+    获取我的选菜记录（今日，支持 If-None-Match，未变化时返回 304）
 
     Args:
+        request: 请求对象（读取 If-None-Match）
+        response: 响应对象（设置 ETag）
         db: 数据库会话（依赖注入）
         current_user: 当前登录用户（依赖注入，需要customer角色）
 
     Returns:
         List[CustomerSelectionResponse]: 今日的选菜记录列表
     """
-    return selection_service.get_my_customer_selections(db, current_user)
+    not_modified = check_not_modified(
+        request, response, "customer-selections", current_user.id,
+        *selection_service.get_my_customer_selections_validator(db, current_user)
+    )
+    if not_modified:
+        return not_modified
+    return selection_list_serializer.response(
+        selection_service.get_my_customer_selections(db, current_user), response
+    )
+
+
+@router.get("/history", response_model=CustomerSelectionHistoryPage)
+def get_my_selection_history(
+    from_date: Optional[date] = Query(None, alias="from", description="起始日期（包含）"),
+    to_date: Optional[date] = Query(None, alias="to", description="结束日期（包含）"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(50, ge=1, le=200, description="每页记录数"),
+    include_archived: bool = Query(False, description="是否同时查询已归档的记录"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取我的选菜历史（包含已取消的记录），按日期倒序分页
+
+    Args:
+        from_date: 起始日期（可选）
+        to_date: 结束日期（可选）
+        cursor: 分页游标（可选），为空时返回第一页
+        limit: 每页记录数（默认50，最大200）
+        include_archived: 是否同时查询已归档的记录（默认False）
+        db: 数据库会话（依赖注入）
+        current_user: 当前登录用户（依赖注入，作为顾客身份）
+
+    Returns:
+        CustomerSelectionHistoryPage: 历史记录和下一页游标
+
+    Raises:
+        400: 游标无效或起始日期晚于结束日期
+    """
+    return selection_service.get_customer_selection_history(db, current_user, from_date, to_date, cursor, limit, include_archived)
 
 
 @router.delete("/{selection_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -79,17 +130,73 @@ def delete_selection(
 
 @router.get("/all", response_model=List[CustomerSelectionResponse])
 def get_all_customer_selections(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("chef"))
 ):
     """
-    获取已绑定顾客的选菜（今日，仅厨师可见）
+    获取已绑定顾客的选菜（今日，仅厨师可见，支持 If-None-Match，未变化时返回 304）
 
     Args:
+        request: 请求对象（读取 If-None-Match）
+        response: 响应对象（设置 ETag）
         db: 数据库会话（依赖注入）
         current_user: 当前登录用户（依赖注入，需要chef角色）
 
     Returns:
         List[CustomerSelectionResponse]: 已绑定顾客的今日选菜记录列表
     """
-    return selection_service.get_all_customer_selections_for_chef(db, current_user)
+    not_modified = check_not_modified(
+        request, response, "bound-customer-selections", current_user.id,
+        *selection_service.get_all_customer_selections_for_chef_validator(db, current_user)
+    )
+    if not_modified:
+        return not_modified
+    return selection_list_serializer.response(
+        selection_service.get_all_customer_selections_for_chef(db, current_user), response
+    )
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """丢弃客户端发来的消息，直到连接断开"""
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/ws")
+async def customer_selections_feed(websocket: WebSocket, token: str = Query(...)):
+    """
+    已绑定顾客选菜的实时推送（厨师使用，替代轮询 /all）
+
+    连接地址: /api/customer-selections/ws?token=<JWT>
+    推送的消息:
+        {"type": "customer_selection.created", "selection": {...}}: 顾客新选了菜品
+        {"type": "customer_selection.cancelled", "selection": {...}}: 顾客取消了选择
+        {"type": "resync"}: 绑定关系变化或推送积压，客户端应重新调用 /all
+
+    token 无效时以 1008 关闭连接
+    """
+    user_id = await run_in_threadpool(get_user_id_from_token, token)
+    if user_id is None:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    async with event_hub.subscribe(chef_channel(user_id)) as queue:
+        disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+        try:
+            while True:
+                next_event = asyncio.create_task(queue.get())
+                await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    next_event.cancel()
+                    break
+                await websocket.send_json(next_event.result())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            disconnected.cancel()
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
 from ..database import get_db
 from ..models.user import User
-from ..schemas.dish import DishCreate, DishResponse, DishWithRecipe
+from ..schemas.dish import DishCreate, DishResponse, DishWithRecipe, TrendingDishesResponse
 from ..schemas.recommendation import DailyRecommendationResponse
 from ..utils.auth import get_current_user, require_role
-from ..services import dish_service
+from ..utils.http_cache import check_not_modified
+from ..utils.serialization import JSONSerializer
+from ..services import dish_service, trending_service
 
 router = APIRouter(prefix="/api/dishes", tags=["菜品管理"])
 
+dish_list_serializer = JSONSerializer(List[DishResponse])
+
 
 @router.post("", response_model=DishResponse, status_code=status.HTTP_201_CREATED)
 def create_dish(
@@ -34,15 +38,19 @@ def create_dish(
 
 @router.get("", response_model=List[DishResponse])
 def get_all_dishes(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    获取所有菜品列表
+    获取所有菜品列表（支持 If-None-Match，未变化时返回 304）
 
     Args:
+        request: 请求对象（读取 If-None-Match）
+        response: 响应对象（设置 ETag）
         skip: 跳过的记录数（用于分页，默认0）
         limit: 返回的最大记录数（用于分页，默认100）
         db: 数据库会话（依赖注入）
@@ -51,20 +59,49 @@ def get_all_dishes(
     Returns:
         List[DishResponse]: 菜品列表
     """
-    return dish_service.get_all_dishes(db, skip, limit)
+    not_modified = check_not_modified(
+        request, response, "dishes", skip, limit, *dish_service.get_all_dishes_validator(db)
+    )
+    if not_modified:
+        return not_modified
+    return dish_list_serializer.response(dish_service.get_all_dishes(db, skip, limit), response)
+
+
+@router.get("/trending", response_model=TrendingDishesResponse)
+def get_trending_dishes(
+    limit: int = Query(10, ge=1, le=50, description="每个时间窗口返回的菜品数"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    热门菜品：最近1小时、24小时、7天内点菜次数最多的菜品
+
+    Args:
+        limit: 每个时间窗口返回的菜品数（默认10，最大50）
+        db: 数据库会话（依赖注入）
+        current_user: 当前登录用户（依赖注入）
+
+    Returns:
+        TrendingDishesResponse: 各时间窗口的热门菜品排行
+    """
+    return trending_service.get_trending_dishes(db, limit)
 
 
 @router.get("/{dish_id}", response_model=DishWithRecipe)
 def get_dish_with_recipe(
     dish_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    获取菜品详情（包含菜谱）
+    获取菜品详情（包含菜谱，支持 If-None-Match，未变化时返回 304）
 
     Args:
         dish_id: 菜品ID
+        request: 请求对象（读取 If-None-Match）
+        response: 响应对象（设置 ETag）
         db: 数据库会话（依赖注入）
         current_user: 当前登录用户（依赖注入）
 
@@ -74,24 +111,38 @@ def get_dish_with_recipe(
     Raises:
         404: 菜品不存在
     """
+    validator = dish_service.get_dish_validator(db, dish_id)
+    if validator is not None:
+        not_modified = check_not_modified(request, response, "dish", *validator)
+        if not_modified:
+            return not_modified
     return dish_service.get_dish_by_id(db, dish_id)
 
 
 @router.get("/recommendations/today", response_model=List[DailyRecommendationResponse])
 def get_today_recommendations(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    获取今日推荐菜品
+    获取今日推荐菜品（支持 If-None-Match，未变化时返回 304）
 
     Args:
+        request: 请求对象（读取 If-None-Match）
+        response: 响应对象（设置 ETag）
         db: 数据库会话（依赖注入）
         current_user: 当前登录用户（依赖注入）
 
     Returns:
         List[DailyRecommendationResponse]: 今日推荐菜品列表（如果今日没有推荐会自动生成）
     """
+    validator = dish_service.get_today_recommendations_validator(db)
+    if validator is not None:
+        not_modified = check_not_modified(request, response, "recommendations", *validator)
+        if not_modified:
+            return not_modified
     return dish_service.get_today_recommendations(db)
 
 
@@ -0,0 +1,46 @@
+"""
+增量同步路由
+客户端保存上次返回的游标，回到前台时只拉取之后变化的菜品、绑定关系和选菜
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from ..database import get_db
+from ..models.user import User
+from ..schemas.sync import SyncResponse
+from ..utils.auth import get_current_user
+from ..services import sync_service
+
+router = APIRouter(prefix="/api/sync", tags=["数据同步"])
+
+
+@router.get("", response_model=SyncResponse)
+def sync_changes(
+    since: Optional[str] = Query(None, description="上次同步返回的 cursor，为空时返回 reset 和当前游标"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="本次最多读取的变更记录数，默认 SYNC_PAGE_SIZE"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    增量同步：返回游标之后与当前用户相关的变更
+
+    - 菜品：所有用户可见
+    - 绑定关系：作为厨师或顾客参与的绑定
+    - 顾客选菜：自己的选菜，以及（作为厨师）已绑定顾客的选菜
+    - 厨师认领：自己的认领
+    已取消或已删除的记录放在 deleted 中；reset 为 True 时需要全量拉取后从新游标开始同步
+
+    Args:
+        since: 上次同步返回的游标（可选）
+        limit: 本次最多读取的变更记录数（可选，最大1000），has_more 为 True 时继续同步
+        db: 数据库会话（依赖注入）
+        current_user: 当前登录用户（依赖注入）
+
+    Returns:
+        SyncResponse: 变更的实体和新游标
+
+    Raises:
+        400: 游标无效
+    """
+    return sync_service.get_changes(db, current_user, since, limit)
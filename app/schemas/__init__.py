@@ -1,9 +1,16 @@
 from .user import UserCreate, UserLogin, UserResponse, Token
 from .dish import DishCreate, DishResponse, DishWithRecipe
+from .dish import TrendingDish, TrendingDishesResponse
 from .selection import CustomerSelectionCreate, CustomerSelectionResponse
 from .selection import ChefSelectionCreate, ChefSelectionResponse
+from .selection import PrepBoardItem, PrepBoardResponse
+from .selection import CustomerSelectionHistoryItem, CustomerSelectionHistoryPage
+from .selection import ChefSelectionHistoryItem, ChefSelectionHistoryPage
 from .recommendation import DailyRecommendationResponse
-from .binding import BindingCreate, BindingUpdate, BindingResponse
+from .binding import BindingCreate, BindingUpdate, BindingResponse, PendingBindingsResponse
+from .sync import SyncDeletedItem, SyncResponse
+from .analytics import DishDailyStatsResponse, ChefDailyStatsResponse, DishRankingItem
+from .admin import SlowQueryEntry, SlowQueryLogResponse
 
 __all__ = [
     "UserCreate",
@@ -13,12 +20,28 @@ __all__ = [
     "DishCreate",
     "DishResponse",
     "DishWithRecipe",
+    "TrendingDish",
+    "TrendingDishesResponse",
     "CustomerSelectionCreate",
     "CustomerSelectionResponse",
     "ChefSelectionCreate",
     "ChefSelectionResponse",
+    "PrepBoardItem",
+    "PrepBoardResponse",
+    "CustomerSelectionHistoryItem",
+    "CustomerSelectionHistoryPage",
+    "ChefSelectionHistoryItem",
+    "ChefSelectionHistoryPage",
     "DailyRecommendationResponse",
     "BindingCreate",
     "BindingUpdate",
     "BindingResponse",
+    "PendingBindingsResponse",
+    "SyncDeletedItem",
+    "SyncResponse",
+    "DishDailyStatsResponse",
+    "ChefDailyStatsResponse",
+    "DishRankingItem",
+    "SlowQueryEntry",
+    "SlowQueryLogResponse",
 ]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, List, Optional
+
+
+class SlowQueryEntry(BaseModel):
+    """慢查询记录（参数已脱敏；plan 为空且 plan_error 为空表示执行计划仍在获取中）"""
+    id: int
+    occurred_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any = None
+    executemany: bool
+    origin: Optional[str] = None
+    plan: Optional[List[str]] = None
+    plan_error: Optional[str] = None
+
+
+class SlowQueryLogResponse(BaseModel):
+    """慢查询日志"""
+    threshold_ms: float
+    dropped: int  # 因超过每分钟上限未记录的条数
+    items: List[SlowQueryEntry]
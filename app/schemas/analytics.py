@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from datetime import date
+
+
+class DishDailyStatsResponse(BaseModel):
+    """菜品每日统计"""
+    date: date
+    dish_id: int
+    picks: int  # 顾客点菜次数（含之后取消的）
+    pick_cancellations: int  # 顾客取消次数
+    claims: int  # 厨师认领次数（含之后取消的）
+    claim_cancellations: int  # 厨师取消认领次数
+
+    class Config:
+        from_attributes = True
+
+
+class ChefDailyStatsResponse(BaseModel):
+    """厨师每日每菜品认领统计"""
+    date: date
+    dish_id: int
+    claims: int
+    claim_cancellations: int
+
+    class Config:
+        from_attributes = True
+
+
+class DishRankingItem(BaseModel):
+    """时间段内的菜品排行"""
+    dish_id: int
+    dish_name: str
+    picks: int  # 扣除取消后的有效点菜次数
+    claims: int  # 扣除取消后的有效认领次数
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class BindingCreate(BaseModel):
@@ -27,3 +27,9 @@ class BindingResponse(BaseModel):
     class Config:
         from_attributes = True
         populate_by_name = True
+
+
+class PendingBindingsResponse(BaseModel):
+    """待处理绑定请求列表及其游标（长轮询使用）"""
+    items: List[BindingResponse]
+    cursor: str  # 下次轮询时作为 since 传入
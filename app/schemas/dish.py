@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class DishBase(BaseModel):
@@ -39,3 +39,17 @@ class DishWithRecipe(DishResponse):
 
     class Config:
         from_attributes = True
+
+
+class TrendingDish(BaseModel):
+    """热门菜品"""
+    dish_id: int
+    dish_name: str
+    picks: int  # 时间窗口内的有效点菜次数
+
+
+class TrendingDishesResponse(BaseModel):
+    """各时间窗口的热门菜品排行"""
+    last_1h: List[TrendingDish]
+    last_24h: List[TrendingDish]
+    last_7d: List[TrendingDish]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 from .dish import DishResponse
 
 
@@ -36,3 +36,40 @@ class ChefSelectionResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PrepBoardItem(BaseModel):
+    """备菜看板中单个菜品的统计"""
+    dish_id: int
+    dish_name: str
+    total_count: int  # 已绑定顾客今日点该菜的份数
+    claimed_count: int  # 当前厨师已认领制作的份数
+    unclaimed_count: int  # 尚未认领的份数
+
+
+class PrepBoardResponse(BaseModel):
+    """厨师备菜看板（按菜品汇总今日需要制作的份数）"""
+    date: date
+    items: List[PrepBoardItem]
+
+
+class CustomerSelectionHistoryItem(CustomerSelectionResponse):
+    """顾客选菜历史记录（包含已取消的记录）"""
+    status: str  # active（生效中）或 cancelled（已取消）
+
+
+class CustomerSelectionHistoryPage(BaseModel):
+    """顾客选菜历史分页"""
+    items: List[CustomerSelectionHistoryItem]
+    next_cursor: Optional[str] = None  # 下一页游标，为空表示没有更多记录
+
+
+class ChefSelectionHistoryItem(ChefSelectionResponse):
+    """厨师认领历史记录（包含已取消的记录）"""
+    status: str  # active（生效中）或 cancelled（已取消）
+
+
+class ChefSelectionHistoryPage(BaseModel):
+    """厨师认领历史分页"""
+    items: List[ChefSelectionHistoryItem]
+    next_cursor: Optional[str] = None  # 下一页游标，为空表示没有更多记录
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List
+from .dish import DishResponse
+from .selection import CustomerSelectionResponse, ChefSelectionResponse
+from .binding import BindingResponse
+
+
+class SyncDeletedItem(BaseModel):
+    """已删除（或已取消、已归档）的实体"""
+    entity_type: str  # dish / binding / customer_selection / chef_selection
+    id: int
+
+
+class SyncResponse(BaseModel):
+    """增量同步结果"""
+    cursor: str  # 下次同步时作为 since 传入
+    reset: bool = False  # 为 True 时客户端需要全量拉取，之后从 cursor 开始增量同步
+    has_more: bool = False  # 为 True 时还有更多变更，应立即用新游标继续同步
+    dishes: List[DishResponse] = []
+    bindings: List[BindingResponse] = []
+    customer_selections: List[CustomerSelectionResponse] = []
+    chef_selections: List[ChefSelectionResponse] = []
+    deleted: List[SyncDeletedItem] = []
@@ -0,0 +1,215 @@
+"""
+统计服务层
+维护每日汇总表（菜品、厨师维度的点菜/认领/取消次数），统计接口只读汇总表，不扫描选菜明细
+"""
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from ..models.customer_selection import CustomerSelection, SelectionStatus
+from ..models.chef_selection import ChefSelection, ChefSelectionStatus
+from ..models.archive import CustomerSelectionArchive, ChefSelectionArchive
+from ..models.daily_stats import DishDailyStats, ChefDailyStats
+from ..models.dish import Dish
+from ..models.user import User
+from ..schemas.analytics import DishRankingItem
+
+# 统计接口单次查询的最大天数
+MAX_RANGE_DAYS = 366
+
+
+def record_pick(db: Session, dish_id: int, day: date) -> None:
+    """记录一次顾客点菜（与选菜写入处于同一事务，由调用方提交）"""
+    _increment(db, DishDailyStats, {"date": day, "dish_id": dish_id}, picks=1)
+
+
+def record_pick_cancellation(db: Session, dish_id: int, day: date) -> None:
+    """记录一次顾客取消点菜"""
+    _increment(db, DishDailyStats, {"date": day, "dish_id": dish_id}, pick_cancellations=1)
+
+
+def record_claim(db: Session, chef_id: int, dish_id: int, day: date) -> None:
+    """记录一次厨师认领"""
+    _increment(db, DishDailyStats, {"date": day, "dish_id": dish_id}, claims=1)
+    _increment(db, ChefDailyStats, {"chef_id": chef_id, "date": day, "dish_id": dish_id}, claims=1)
+
+
+def record_claim_cancellation(db: Session, chef_id: int, dish_id: int, day: date) -> None:
+    """记录一次厨师取消认领"""
+    _increment(db, DishDailyStats, {"date": day, "dish_id": dish_id}, claim_cancellations=1)
+    _increment(db, ChefDailyStats, {"chef_id": chef_id, "date": day, "dish_id": dish_id}, claim_cancellations=1)
+
+
+def _increment(db: Session, model, keys: Dict, **increments: int) -> None:
+    """按主键对汇总行做原子自增，行不存在时插入（upsert）"""
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(**keys, **increments)
+        stmt = stmt.on_duplicate_key_update({
+            column: table.c[column] + stmt.inserted[column] for column in increments
+        })
+        db.execute(stmt)
+        return
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(**keys, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: table.c[column] + stmt.excluded[column] for column in increments}
+        )
+        db.execute(stmt)
+        return
+
+    # 其他数据库：先更新，未命中再插入
+    conditions = [table.c[column] == value for column, value in keys.items()]
+    updated = db.execute(
+        update(table).where(*conditions).values({
+            column: table.c[column] + value for column, value in increments.items()
+        })
+    ).rowcount
+    if not updated:
+        db.execute(table.insert().values(**keys, **increments))
+
+
+def _validate_range(start_date: Optional[date], end_date: Optional[date]) -> Tuple[date, date]:
+    """默认统计最近 30 天，校验日期范围"""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=29)
+
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be later than 'to'"
+        )
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must not exceed {MAX_RANGE_DAYS} days"
+        )
+    return start_date, end_date
+
+
+def get_dish_daily_stats(
+    db: Session,
+    dish_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> List[DishDailyStats]:
+    """查询单个菜品的每日统计"""
+    start_date, end_date = _validate_range(start_date, end_date)
+    return db.query(DishDailyStats).filter(
+        DishDailyStats.dish_id == dish_id,
+        DishDailyStats.date >= start_date,
+        DishDailyStats.date <= end_date
+    ).order_by(DishDailyStats.date).all()
+
+
+def get_chef_daily_stats(
+    db: Session,
+    chef_user: User,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> List[ChefDailyStats]:
+    """查询厨师每日每菜品的认领统计"""
+    start_date, end_date = _validate_range(start_date, end_date)
+    return db.query(ChefDailyStats).filter(
+        ChefDailyStats.chef_id == chef_user.id,
+        ChefDailyStats.date >= start_date,
+        ChefDailyStats.date <= end_date
+    ).order_by(ChefDailyStats.date, ChefDailyStats.dish_id).all()
+
+
+def get_top_dishes(
+    db: Session,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 10
+) -> List[DishRankingItem]:
+    """时间段内有效点菜次数最多的菜品"""
+    start_date, end_date = _validate_range(start_date, end_date)
+
+    picks = func.sum(DishDailyStats.picks - DishDailyStats.pick_cancellations)
+    claims = func.sum(DishDailyStats.claims - DishDailyStats.claim_cancellations)
+    rows = db.query(
+        DishDailyStats.dish_id, Dish.name, picks, claims
+    ).join(
+        Dish, Dish.id == DishDailyStats.dish_id
+    ).filter(
+        DishDailyStats.date >= start_date,
+        DishDailyStats.date <= end_date
+    ).group_by(
+        DishDailyStats.dish_id, Dish.name
+    ).order_by(
+        picks.desc(), DishDailyStats.dish_id
+    ).limit(limit).all()
+
+    return [
+        DishRankingItem(dish_id=dish_id, dish_name=name, picks=pick_count, claims=claim_count)
+        for dish_id, name, pick_count, claim_count in rows
+    ]
+
+
+def rebuild_daily_stats(db: Session, start_date: date, end_date: date) -> int:
+    """
+    从选菜明细（热表和归档表）重算日期范围内的汇总行，返回写入的行数
+    用于补齐引入汇总表之前的历史数据，或修正增量更新期间的异常
+    注意：重算先汇总明细、再删除并重新插入汇总行，期间提交的增量更新会被覆盖丢失。
+    范围内包含仍有选菜写入的日期（通常是今天）时会与线上写入竞争，应只重算已经结束的日期
+    """
+    dish_stats = defaultdict(lambda: {"picks": 0, "pick_cancellations": 0, "claims": 0, "claim_cancellations": 0})
+    chef_stats = defaultdict(lambda: {"claims": 0, "claim_cancellations": 0})
+
+    for model in (CustomerSelection, CustomerSelectionArchive):
+        rows = db.execute(
+            select(
+                model.date, model.dish_id, func.count(),
+                func.sum(case((model.status == SelectionStatus.CANCELLED, 1), else_=0))
+            ).where(
+                model.date >= start_date, model.date <= end_date
+            ).group_by(model.date, model.dish_id)
+        )
+        for day, dish_id, total, cancelled in rows:
+            dish_stats[(day, dish_id)]["picks"] += total
+            dish_stats[(day, dish_id)]["pick_cancellations"] += cancelled or 0
+
+    for model in (ChefSelection, ChefSelectionArchive):
+        rows = db.execute(
+            select(
+                model.date, model.chef_id, model.dish_id, func.count(),
+                func.sum(case((model.status == ChefSelectionStatus.CANCELLED, 1), else_=0))
+            ).where(
+                model.date >= start_date, model.date <= end_date
+            ).group_by(model.date, model.chef_id, model.dish_id)
+        )
+        for day, chef_id, dish_id, total, cancelled in rows:
+            dish_stats[(day, dish_id)]["claims"] += total
+            dish_stats[(day, dish_id)]["claim_cancellations"] += cancelled or 0
+            chef_stats[(chef_id, day, dish_id)]["claims"] += total
+            chef_stats[(chef_id, day, dish_id)]["claim_cancellations"] += cancelled or 0
+
+    db.execute(delete(DishDailyStats).where(
+        DishDailyStats.date >= start_date, DishDailyStats.date <= end_date
+    ))
+    db.execute(delete(ChefDailyStats).where(
+        ChefDailyStats.date >= start_date, ChefDailyStats.date <= end_date
+    ))
+    if dish_stats:
+        db.execute(DishDailyStats.__table__.insert(), [
+            {"date": day, "dish_id": dish_id, **counts}
+            for (day, dish_id), counts in dish_stats.items()
+        ])
+    if chef_stats:
+        db.execute(ChefDailyStats.__table__.insert(), [
+            {"chef_id": chef_id, "date": day, "dish_id": dish_id, **counts}
+            for (chef_id, day, dish_id), counts in chef_stats.items()
+        ])
+    db.commit()
+
+    return len(dish_stats) + len(chef_stats)
@@ -0,0 +1,118 @@
+"""
+归档服务层
+把过期的选菜、推荐记录以及已取消/已解绑的记录分批迁移到归档表，保持热表和索引精简
+"""
+from sqlalchemy import and_, or_, delete, insert, select, func
+from sqlalchemy.orm import Session
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional
+
+from ..config import settings
+from ..models.customer_selection import CustomerSelection, SelectionStatus
+from ..models.chef_selection import ChefSelection, ChefSelectionStatus
+from ..models.daily_recommendation import DailyRecommendation
+from ..models.chef_customer_binding import ChefCustomerBinding, BindingStatus
+from ..models.archive import (
+    CustomerSelectionArchive,
+    ChefSelectionArchive,
+    DailyRecommendationArchive,
+    ChefCustomerBindingArchive,
+)
+
+
+def archive_old_rows(
+    db: Session,
+    horizon_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    today: Optional[date] = None
+) -> Dict[str, int]:
+    """
+    执行一次归档，返回每张表迁移的记录数
+    - 选菜和认领：早于保留期的记录，以及今天之前已取消的记录
+    - 每日推荐：早于保留期的记录
+    - 绑定关系：早于保留期的已解绑或已拒绝记录
+    顾客选择仍被热表中的厨师认领引用时暂不迁移，等认领记录归档后再迁移
+    """
+    horizon_days = settings.ARCHIVE_HORIZON_DAYS if horizon_days is None else horizon_days
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    today = today or date.today()
+    cutoff = today - timedelta(days=horizon_days)
+
+    moved = {}
+
+    # 先迁移厨师认领，释放对顾客选择的外键引用
+    moved["chef_selections"] = _move_rows(
+        db, ChefSelection, ChefSelectionArchive,
+        or_(
+            ChefSelection.date < cutoff,
+            and_(ChefSelection.date < today, ChefSelection.status == ChefSelectionStatus.CANCELLED)
+        ),
+        batch_size
+    )
+
+    still_referenced = select(ChefSelection.id).where(
+        ChefSelection.customer_selection_id == CustomerSelection.id
+    ).exists()
+    moved["customer_selections"] = _move_rows(
+        db, CustomerSelection, CustomerSelectionArchive,
+        and_(
+            or_(
+                CustomerSelection.date < cutoff,
+                and_(CustomerSelection.date < today, CustomerSelection.status == SelectionStatus.CANCELLED)
+            ),
+            ~still_referenced
+        ),
+        batch_size
+    )
+
+    moved["daily_recommendations"] = _move_rows(
+        db, DailyRecommendation, DailyRecommendationArchive,
+        DailyRecommendation.date < cutoff,
+        batch_size
+    )
+
+    cutoff_time = datetime.combine(cutoff, time.min)
+    moved["chef_customer_bindings"] = _move_rows(
+        db, ChefCustomerBinding, ChefCustomerBindingArchive,
+        and_(
+            ChefCustomerBinding.status.in_([BindingStatus.UNBOUND, BindingStatus.REJECTED]),
+            func.coalesce(ChefCustomerBinding.updated_at, ChefCustomerBinding.created_at) < cutoff_time
+        ),
+        batch_size
+    )
+
+    return moved
+
+
+def _move_rows(db: Session, model, archive_model, condition, batch_size: int) -> int:
+    """
+    按主键分批把满足条件的记录复制到归档表并从热表删除
+    每批在一个事务内完成，中途失败不会出现重复或丢失的记录
+    """
+    source = model.__table__
+    target = archive_model.__table__
+    # 只复制归档表中存在的普通列（跳过 active_flag 等生成列）
+    columns = [
+        column.name for column in source.columns
+        if column.name in target.columns and column.computed is None
+    ]
+
+    moved = 0
+    while True:
+        ids = [
+            row_id for (row_id,) in db.execute(
+                select(source.c.id).where(condition).order_by(source.c.id).limit(batch_size)
+            )
+        ]
+        if not ids:
+            return moved
+
+        db.execute(
+            insert(target).from_select(
+                columns,
+                select(*[source.c[name] for name in columns]).where(source.c.id.in_(ids))
+            )
+        )
+        db.execute(delete(source).where(source.c.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
@@ -2,13 +2,19 @@
 绑定服务层
 处理厨师-顾客绑定相关业务逻辑
 """
-from sqlalchemy.orm import Session
+import hashlib
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, aliased
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, Tuple
 
 from ..models.user import User
 from ..models.chef_customer_binding import ChefCustomerBinding, BindingStatus
 from ..schemas.binding import BindingResponse
+from ..utils.http_cache import collection_validator
+from ..utils.event_hub import event_hub, chef_channel, bindings_channel, RESYNC_EVENT
+from . import change_log_service
+from .selection_service import invalidate_prep_board
 
 
 def create_binding_request(db: Session, current_user: User, chef_username: str) -> BindingResponse:
@@ -52,9 +58,17 @@ def create_binding_request(db: Session, current_user: User, chef_username: str)
         status=BindingStatus.PENDING
     )
     db.add(new_binding)
+    db.flush()
+    change_log_service.record_change(
+        db, change_log_service.BINDING, new_binding.id, change_log_service.UPSERT,
+        [chef.id, current_user.id]
+    )
     db.commit()
     db.refresh(new_binding)
 
+    # 唤醒等待该厨师待处理请求的长轮询和 SSE 连接
+    event_hub.publish(bindings_channel(chef.id), {"type": "binding.requested", "id": new_binding.id})
+
     # 构建响应
     return _build_binding_response(db, new_binding, current_user, chef)
 
@@ -64,18 +78,33 @@ def get_pending_bindings_for_chef(db: Session, chef_user: User) -> List[BindingR
     查看待处理的绑定请求
     作为厨师身份查看发送给自己的绑定请求
     """
-    # 查询发送给当前用户的待处理绑定请求
-    bindings = db.query(ChefCustomerBinding).filter(
-        ChefCustomerBinding.chef_id == chef_user.id,
+    return get_pending_bindings_with_cursor(db, chef_user.id)[0]
+
+
+def get_pending_bindings_with_cursor(db: Session, chef_id: int) -> Tuple[List[BindingResponse], str]:
+    """
+    查询发送给厨师的待处理绑定请求（连同顾客、厨师信息一次 JOIN 查出），
+    并返回标识当前列表内容的游标，供长轮询和 SSE 判断列表是否变化
+    """
+    customer = aliased(User)
+    chef = aliased(User)
+    rows = db.query(ChefCustomerBinding, customer, chef).join(
+        customer, customer.id == ChefCustomerBinding.customer_id
+    ).join(
+        chef, chef.id == ChefCustomerBinding.chef_id
+    ).filter(
+        ChefCustomerBinding.chef_id == chef_id,
         ChefCustomerBinding.status == BindingStatus.PENDING
-    ).all()
+    ).order_by(ChefCustomerBinding.id).all()
+
+    items = [_build_binding_response(db, binding, customer, chef) for binding, customer, chef in rows]
+    return items, pending_cursor(binding.id for binding, _, _ in rows)
 
-    result = []
-    for binding in bindings:
-        customer = db.query(User).filter(User.id == binding.customer_id).first()
-        result.append(_build_binding_response(db, binding, customer, chef_user))
 
-    return result
+def pending_cursor(binding_ids) -> str:
+    """待处理列表的游标：请求ID集合的摘要（待处理请求只会新增或移出，内容本身不变）"""
+    digest = hashlib.sha1(",".join(str(binding_id) for binding_id in binding_ids).encode())
+    return digest.hexdigest()[:16]
 
 
 def update_binding_status(
@@ -87,26 +116,8 @@ def update_binding_status(
     """
     同意或拒绝绑定请求
     作为厨师身份处理发送给自己的绑定请求
+    使用带状态条件的单条 UPDATE 完成状态流转，并发重复审批时只有一个请求成功
     """
-    # 查找发送给当前用户的绑定请求
-    binding = db.query(ChefCustomerBinding).filter(
-        ChefCustomerBinding.id == binding_id,
-        ChefCustomerBinding.chef_id == chef_user.id
-    ).first()
-
-    if not binding:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Binding request not found"
-        )
-
-    # 检查状态是否为待处理
-    if binding.status != BindingStatus.PENDING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot update binding with status: {binding.status}"
-        )
-
     # 状态映射：accepted -> approved
     status_mapping = {
         "accepted": "approved",
@@ -116,19 +127,89 @@ def update_binding_status(
 
     mapped_status = status_mapping.get(new_status.lower())
     if not mapped_status:
+        # 保持原有的错误优先级：先报告绑定不存在或状态不对，再报告新状态无效
+        _raise_binding_update_error(db, binding_id, chef_user)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Status must be either 'accepted', 'approved' or 'rejected'"
         )
 
-    # 更新状态
-    binding.status = BindingStatus(mapped_status)
+    # 只更新发送给当前用户且仍为待处理的绑定请求
+    updated = db.query(ChefCustomerBinding).filter(
+        ChefCustomerBinding.id == binding_id,
+        ChefCustomerBinding.chef_id == chef_user.id,
+        ChefCustomerBinding.status == BindingStatus.PENDING
+    ).update(
+        {ChefCustomerBinding.status: BindingStatus(mapped_status)},
+        synchronize_session=False
+    )
+
+    if not updated:
+        db.rollback()
+        _raise_binding_update_error(db, binding_id, chef_user)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Binding request was modified concurrently"
+        )
+
+    binding, customer = db.query(ChefCustomerBinding, User).join(
+        User, User.id == ChefCustomerBinding.customer_id
+    ).filter(
+        ChefCustomerBinding.id == binding_id
+    ).populate_existing().one()
+    # 提交前构建响应，提交后对象过期不需要再次加载
+    response = _build_binding_response(db, binding, customer, chef_user)
+
+    change_log_service.record_change(
+        db, change_log_service.BINDING, binding_id, change_log_service.UPSERT,
+        [chef_user.id, customer.id]
+    )
     db.commit()
-    db.refresh(binding)
 
-    customer = db.query(User).filter(User.id == binding.customer_id).first()
+    invalidate_prep_board(chef_user.id)
+    # 绑定的顾客变化后，厨师的实时选菜列表需要整体重新拉取
+    event_hub.publish(chef_channel(chef_user.id), RESYNC_EVENT)
+    event_hub.publish(bindings_channel(chef_user.id), {"type": "binding.updated", "id": binding_id})
+
+    return response
 
-    return _build_binding_response(db, binding, customer, chef_user)
+
+def _raise_binding_update_error(db: Session, binding_id: int, chef_user: User) -> None:
+    """条件更新未命中时，查询绑定请求以确定返回 404 还是 400"""
+    binding_status = db.query(ChefCustomerBinding.status).filter(
+        ChefCustomerBinding.id == binding_id,
+        ChefCustomerBinding.chef_id == chef_user.id
+    ).scalar()
+
+    if binding_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Binding request not found"
+        )
+
+    # 检查状态是否为待处理
+    if binding_status != BindingStatus.PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot update binding with status: {binding_status}"
+        )
+
+
+def _my_bindings_criteria(current_user: User, as_chef: bool) -> tuple:
+    if as_chef:
+        return (
+            ChefCustomerBinding.chef_id == current_user.id,
+            ChefCustomerBinding.status == BindingStatus.APPROVED
+        )
+    return (ChefCustomerBinding.customer_id == current_user.id,)
+
+
+def get_my_bindings_validator(db: Session, current_user: User, as_chef: bool = False) -> Tuple:
+    """我的绑定关系的校验值（绑定状态会变化，因此包含 updated_at）"""
+    return collection_validator(
+        db, ChefCustomerBinding.id, *_my_bindings_criteria(current_user, as_chef),
+        updated_column=ChefCustomerBinding.updated_at
+    )
 
 
 def get_my_bindings(db: Session, current_user: User, as_chef: bool = False) -> List[BindingResponse]:
@@ -138,36 +219,69 @@ def get_my_bindings(db: Session, current_user: User, as_chef: bool = False) -> L
     - as_chef=false: 作为顾客身份，查看自己绑定的所有厨师
     """
     if as_chef:
-        # 作为厨师：查看所有已同意的顾客绑定
-        bindings = db.query(ChefCustomerBinding).filter(
-            ChefCustomerBinding.chef_id == current_user.id,
-            ChefCustomerBinding.status == BindingStatus.APPROVED
+        # 作为厨师：查看所有已同意的顾客绑定（一次 JOIN 查出顾客信息）
+        rows = db.query(ChefCustomerBinding, User).join(
+            User, User.id == ChefCustomerBinding.customer_id
+        ).filter(
+            *_my_bindings_criteria(current_user, as_chef)
         ).all()
 
-        result = []
-        for binding in bindings:
-            customer = db.query(User).filter(User.id == binding.customer_id).first()
-            result.append(_build_binding_response(db, binding, customer, current_user))
-    else:
-        # 作为顾客：查看自己绑定的所有厨师
-        bindings = db.query(ChefCustomerBinding).filter(
-            ChefCustomerBinding.customer_id == current_user.id
-        ).all()
+        return [_build_binding_response(db, binding, customer, current_user) for binding, customer in rows]
 
-        result = []
-        for binding in bindings:
-            chef = db.query(User).filter(User.id == binding.chef_id).first()
-            result.append(_build_binding_response(db, binding, current_user, chef))
+    # 作为顾客：查看自己绑定的所有厨师
+    rows = db.query(ChefCustomerBinding, User).join(
+        User, User.id == ChefCustomerBinding.chef_id
+    ).filter(
+        *_my_bindings_criteria(current_user, as_chef)
+    ).all()
 
-    return result
+    return [_build_binding_response(db, binding, current_user, chef) for binding, chef in rows]
 
 
 def delete_binding(db: Session, binding_id: int, current_user: User) -> None:
     """
     解除绑定关系（顾客或厨师都可以解除绑定，软删除）
+    使用带状态条件的单条 UPDATE，并发重复解绑时只有一个请求成功
     """
-    # 查找绑定关系
-    binding = db.query(ChefCustomerBinding).filter(
+    # 软删除：只有本人参与且已同意的绑定才修改状态为 unbound
+    updated = db.query(ChefCustomerBinding).filter(
+        ChefCustomerBinding.id == binding_id,
+        or_(
+            ChefCustomerBinding.chef_id == current_user.id,
+            ChefCustomerBinding.customer_id == current_user.id
+        ),
+        ChefCustomerBinding.status == BindingStatus.APPROVED
+    ).update(
+        {ChefCustomerBinding.status: BindingStatus.UNBOUND},
+        synchronize_session=False
+    )
+
+    if not updated:
+        db.rollback()
+        _raise_unbind_error(db, binding_id, current_user)
+
+    chef_id, customer_id = db.query(
+        ChefCustomerBinding.chef_id, ChefCustomerBinding.customer_id
+    ).filter(
+        ChefCustomerBinding.id == binding_id
+    ).one()
+    change_log_service.record_change(
+        db, change_log_service.BINDING, binding_id, change_log_service.UPSERT,
+        [chef_id, customer_id]
+    )
+    db.commit()
+
+    invalidate_prep_board(chef_id)
+    event_hub.publish(chef_channel(chef_id), RESYNC_EVENT)
+
+
+def _raise_unbind_error(db: Session, binding_id: int, current_user: User) -> None:
+    """条件更新未命中时，查询绑定关系以确定返回 404、403 还是 400"""
+    binding = db.query(
+        ChefCustomerBinding.chef_id,
+        ChefCustomerBinding.customer_id,
+        ChefCustomerBinding.status
+    ).filter(
         ChefCustomerBinding.id == binding_id
     ).first()
 
@@ -192,15 +306,10 @@ def delete_binding(db: Session, binding_id: int, current_user: User) -> None:
         )
 
     # 只有已同意的绑定才能解绑
-    if binding.status != BindingStatus.APPROVED:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot unbind binding with status: {binding.status}"
-        )
-
-    # 软删除：修改状态为 unbound
-    binding.status = BindingStatus.UNBOUND
-    db.commit()
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Cannot unbind binding with status: {binding.status}"
+    )
 
 
 def _build_binding_response(
@@ -209,8 +318,8 @@ def _build_binding_response(
     customer: User,
     chef: User
 ) -> BindingResponse:
-    """构建绑定响应对象"""
-    return BindingResponse(
+    """构建绑定响应对象（字段均已是目标类型，跳过校验直接构造）"""
+    return BindingResponse.model_construct(
         id=str(binding.id),
         customerId=str(binding.customer_id),
         customerName=customer.username,
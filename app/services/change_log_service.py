@@ -0,0 +1,84 @@
+"""
+变更日志服务层
+写操作在提交前调用 record_change，与业务数据处于同一事务；/api/sync 据此返回增量数据
+"""
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from ..config import settings
+from ..models.change_log import ChangeLog
+
+# 实体类型
+DISH = "dish"
+BINDING = "binding"
+CUSTOMER_SELECTION = "customer_selection"
+CHEF_SELECTION = "chef_selection"
+
+# 操作类型
+UPSERT = "upsert"
+DELETE = "delete"
+
+
+def record_change(
+    db: Session,
+    entity_type: str,
+    entity_id: int,
+    op: str,
+    user_ids: Optional[Iterable[int]] = None
+) -> None:
+    """
+    追加变更记录（由调用方提交）
+    user_ids 为需要同步该变更的用户，为 None 时所有用户可见
+    """
+    if user_ids is None:
+        rows = [{"entity_type": entity_type, "entity_id": entity_id, "op": op, "user_id": None}]
+    else:
+        rows = [
+            {"entity_type": entity_type, "entity_id": entity_id, "op": op, "user_id": user_id}
+            for user_id in set(user_ids)
+        ]
+    if rows:
+        db.execute(insert(ChangeLog), rows)
+
+
+def database_now(db: Session) -> datetime:
+    """
+    数据库的当前时间
+    created_at 由数据库的 now() 填写，使用会话时区（MySQL 上未必是 UTC），与它比较的截止时间也要取数据库时间
+    """
+    return db.execute(select(func.now())).scalar()
+
+
+def compact_change_log(
+    db: Session,
+    retention_days: Optional[int] = None,
+    batch_size: int = 1000
+) -> int:
+    """
+    分批删除早于保留期的变更记录，返回删除条数
+    始终保留最新一条记录，使 /api/sync 能通过最小 id 判断客户端游标是否已被压缩
+    """
+    retention_days = settings.CHANGE_LOG_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = database_now(db) - timedelta(days=retention_days)
+
+    max_id = db.query(func.max(ChangeLog.id)).scalar()
+    if max_id is None:
+        return 0
+
+    deleted = 0
+    while True:
+        expired_ids = [
+            record_id for (record_id,) in db.query(ChangeLog.id).filter(
+                ChangeLog.created_at < cutoff,
+                ChangeLog.id < max_id
+            ).order_by(ChangeLog.id).limit(batch_size).all()
+        ]
+        if not expired_ids:
+            return deleted
+
+        deleted += db.query(ChangeLog).filter(
+            ChangeLog.id.in_(expired_ids)
+        ).delete(synchronize_session=False)
+        db.commit()
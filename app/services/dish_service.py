@@ -2,30 +2,57 @@
 菜品服务层
 处理菜品管理和推荐相关业务逻辑
 """
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from datetime import date
 import random
 
 from ..models.dish import Dish
 from ..models.daily_recommendation import DailyRecommendation
 from ..schemas.dish import DishCreate
+from ..utils.http_cache import collection_validator
+from . import change_log_service
+
+# 列表接口（DishResponse）需要的列，只读列表直接查询这些列，不创建 ORM 对象
+DISH_LIST_COLUMNS = (
+    Dish.id,
+    Dish.name,
+    Dish.description,
+    Dish.cooking_time,
+    Dish.difficulty,
+    Dish.image_url,
+    Dish.category,
+    Dish.created_at,
+)
 
 
 def create_dish(db: Session, dish_data: DishCreate) -> Dish:
     """创建新菜品"""
     new_dish = Dish(**dish_data.model_dump())
     db.add(new_dish)
+    db.flush()
+    change_log_service.record_change(db, change_log_service.DISH, new_dish.id, change_log_service.UPSERT)
     db.commit()
     db.refresh(new_dish)
     return new_dish
 
 
-def get_all_dishes(db: Session, skip: int = 0, limit: int = 100) -> List[Dish]:
-    """获取所有菜品列表"""
-    dishes = db.query(Dish).offset(skip).limit(limit).all()
-    return dishes
+def get_all_dishes(db: Session, skip: int = 0, limit: int = 100) -> List[Dict]:
+    """获取所有菜品列表（Core 查询返回字典，省去 ORM 对象构建和变更跟踪）"""
+    rows = db.execute(select(*DISH_LIST_COLUMNS).offset(skip).limit(limit)).mappings()
+    return [dict(row) for row in rows]
+
+
+def get_all_dishes_validator(db: Session) -> Tuple:
+    """菜品列表的校验值（一条聚合查询，不加载菜品）"""
+    return collection_validator(db, Dish.id, updated_column=Dish.updated_at)
+
+
+def get_dish_validator(db: Session, dish_id: int) -> Optional[Tuple]:
+    """菜品详情的校验值，菜品不存在时返回 None"""
+    return db.query(Dish.id, Dish.created_at, Dish.updated_at).filter(Dish.id == dish_id).first()
 
 
 def get_dish_by_id(db: Session, dish_id: int) -> Dish:
@@ -55,6 +82,15 @@ def get_today_recommendations(db: Session) -> List[DailyRecommendation]:
     return recommendations
 
 
+def get_today_recommendations_validator(db: Session) -> Optional[Tuple]:
+    """今日推荐的校验值，今日尚未生成推荐时返回 None"""
+    today = date.today()
+    validator = collection_validator(db, DailyRecommendation.id, DailyRecommendation.date == today)
+    if not validator[0]:
+        return None
+    return (today, *validator)
+
+
 def generate_daily_recommendations(db: Session, target_date: date, count: int = 5) -> List[DailyRecommendation]:
     """生成每日推荐（模拟AI推荐）"""
     # 获取所有菜品
@@ -0,0 +1,131 @@
+"""
+幂等键服务层
+保存和查询带 Idempotency-Key 请求的响应，进程内 LRU 缓存在前，数据库表兜底
+请求执行前先在数据库中占用幂等键，不同进程处理的重试也不会重复执行
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from ..config import settings
+from ..models.idempotency_key import IdempotencyKey
+from ..utils.cache import LRUCache
+from ..utils.metrics import registry as metrics_registry
+
+
+class StoredResponse(NamedTuple):
+    """已保存的响应，status_code 为 None 表示首次请求仍在处理"""
+    request_hash: str
+    status_code: Optional[int]
+    body: Optional[str]
+
+    @property
+    def pending(self) -> bool:
+        return self.status_code is None
+
+
+# 幂等响应缓存：scope_key -> StoredResponse（只缓存已完成的响应）
+_response_cache = LRUCache(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS
+)
+metrics_registry.register_cache("idempotency", _response_cache)
+
+
+def get_stored_response(db: Session, scope_key: str) -> Optional[StoredResponse]:
+    """查询已保存的响应，先查进程内缓存，再查数据库（过期记录视为不存在）"""
+    stored = _response_cache.get(scope_key)
+    if stored is not None:
+        return stored
+
+    record = db.query(IdempotencyKey).filter(
+        IdempotencyKey.scope_key == scope_key
+    ).first()
+
+    if not record:
+        return None
+
+    if record.expires_at <= datetime.utcnow():
+        db.delete(record)
+        db.commit()
+        return None
+
+    stored = StoredResponse(record.request_hash, record.status_code, record.response_body)
+    if not stored.pending:
+        _response_cache.set(scope_key, stored)
+    return stored
+
+
+def reserve_key(db: Session, scope_key: str, request_hash: str) -> Optional[StoredResponse]:
+    """
+    占用幂等键：插入处理中的记录，返回 None 表示占用成功，调用方处理完请求后
+    调用 complete_response（成功）或 release_key（失败）
+    键已被占用时返回已有的记录，唯一索引保证多个进程同时重试时只有一个请求会执行
+    """
+    for _ in range(2):
+        stored = get_stored_response(db, scope_key)
+        if stored is not None:
+            return stored
+
+        db.add(IdempotencyKey(
+            scope_key=scope_key,
+            request_hash=request_hash,
+            expires_at=datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_PENDING_TIMEOUT_SECONDS)
+        ))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+
+    # 两次插入之间其他请求占用后又释放了该键，按仍在处理返回
+    return StoredResponse(request_hash, None, None)
+
+
+def complete_response(
+    db: Session,
+    scope_key: str,
+    request_hash: str,
+    status_code: int,
+    body: str
+) -> None:
+    """为已占用的幂等键写入成功的响应"""
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.scope_key == scope_key,
+        IdempotencyKey.status_code.is_(None)
+    ).update({
+        IdempotencyKey.status_code: status_code,
+        IdempotencyKey.response_body: body,
+        IdempotencyKey.expires_at: datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+    }, synchronize_session=False)
+    db.commit()
+
+    _response_cache.set(scope_key, StoredResponse(request_hash, status_code, body))
+
+
+def release_key(db: Session, scope_key: str) -> None:
+    """请求失败时删除处理中的记录，允许客户端用同一个键重试"""
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.scope_key == scope_key,
+        IdempotencyKey.status_code.is_(None)
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def purge_expired_keys(db: Session, batch_size: int = 1000) -> int:
+    """分批删除过期的幂等键记录，返回删除条数"""
+    deleted = 0
+    while True:
+        expired_ids = [
+            record_id for (record_id,) in db.query(IdempotencyKey.id).filter(
+                IdempotencyKey.expires_at <= datetime.utcnow()
+            ).limit(batch_size).all()
+        ]
+        if not expired_ids:
+            return deleted
+
+        deleted += db.query(IdempotencyKey).filter(
+            IdempotencyKey.id.in_(expired_ids)
+        ).delete(synchronize_session=False)
+        db.commit()
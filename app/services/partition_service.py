@@ -0,0 +1,128 @@
+"""
+分区维护服务层
+customer_selections 和 chef_selections 在 MySQL 上按月 RANGE COLUMNS(date) 分区：
+- 预先创建未来几个月的分区，避免数据落入兜底分区 p_future
+- 删除（可选先归档）超过保留期的分区
+其他数据库（如本地测试用的 SQLite）不分区，所有操作直接跳过
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional, Tuple
+
+from ..config import settings
+from . import archive_service
+
+PARTITIONED_TABLES = ("customer_selections", "chef_selections")
+FUTURE_PARTITION = "p_future"
+
+
+def is_partitioning_supported(db: Session) -> bool:
+    """只有 MySQL 使用分区表"""
+    return db.get_bind().dialect.name == "mysql"
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """返回 day 所在月份向后偏移 offset 个月的第一天"""
+    month_index = day.year * 12 + day.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """月份分区名，例如 p202610"""
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def list_partitions(db: Session, table: str) -> List[Tuple[str, Optional[date]]]:
+    """列出表的分区及其上界（兜底分区上界为 None），按上界升序"""
+    rows = db.execute(text("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """), {"table": table}).all()
+
+    partitions = []
+    for name, description in rows:
+        upper_bound = None
+        if description and description != "MAXVALUE":
+            upper_bound = date.fromisoformat(description.strip("'"))
+        partitions.append((name, upper_bound))
+    return partitions
+
+
+def ensure_future_partitions(
+    db: Session,
+    months_ahead: Optional[int] = None,
+    today: Optional[date] = None
+) -> List[str]:
+    """从兜底分区中拆出当前月到未来 months_ahead 个月的分区，返回新建的分区名"""
+    if not is_partitioning_supported(db):
+        return []
+
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    today = today or date.today()
+
+    created = []
+    for table in PARTITIONED_TABLES:
+        bounds = [bound for _, bound in list_partitions(db, table) if bound is not None]
+        highest_bound = max(bounds) if bounds else month_start(today)
+
+        new_months = []
+        month = highest_bound
+        while month <= month_start(today, months_ahead):
+            new_months.append(month)
+            month = month_start(month, 1)
+
+        if not new_months:
+            continue
+
+        definitions = ", ".join(
+            f"PARTITION {partition_name(month)} VALUES LESS THAN ('{month_start(month, 1).isoformat()}')"
+            for month in new_months
+        )
+        db.execute(text(
+            f"ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO "
+            f"({definitions}, PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE))"
+        ))
+        created.extend(f"{table}.{partition_name(month)}" for month in new_months)
+
+    return created
+
+
+def drop_expired_partitions(
+    db: Session,
+    retention_months: Optional[int] = None,
+    archive: bool = True,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    删除上界早于保留期的分区，返回删除的分区名
+    archive=True 时先通过归档任务把这些月份的数据迁移到归档表，分区清空后再删除；
+    仍有数据（例如被热表记录引用）的分区保留到下次执行
+    """
+    if not is_partitioning_supported(db):
+        return []
+
+    retention_months = settings.PARTITION_RETENTION_MONTHS if retention_months is None else retention_months
+    today = today or date.today()
+    cutoff = month_start(today, -retention_months)
+
+    if archive:
+        archive_service.archive_old_rows(db, horizon_days=(today - cutoff).days, today=today)
+
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        for name, upper_bound in list_partitions(db, table):
+            if upper_bound is None or upper_bound > cutoff:
+                continue
+
+            if archive:
+                remaining = db.execute(text(f"SELECT COUNT(*) FROM {table} PARTITION ({name})")).scalar()
+                if remaining:
+                    continue
+
+            db.execute(text(f"ALTER TABLE {table} DROP PARTITION {name}"))
+            dropped.append(f"{table}.{name}")
+
+    return dropped
@@ -2,16 +2,70 @@
 选菜服务层
 处理顾客选菜和厨师选择制作相关业务逻辑
 """
-from sqlalchemy.orm import Session
+import threading
+
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException, status
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from datetime import date
 
+from ..config import settings
 from ..models.customer_selection import CustomerSelection, SelectionStatus
 from ..models.chef_selection import ChefSelection, ChefSelectionStatus
 from ..models.dish import Dish
 from ..models.user import User
 from ..models.chef_customer_binding import ChefCustomerBinding, BindingStatus
+from ..models.archive import CustomerSelectionArchive, ChefSelectionArchive
+from ..schemas.selection import CustomerSelectionResponse, PrepBoardItem, PrepBoardResponse
+from ..schemas.selection import CustomerSelectionHistoryPage, ChefSelectionHistoryPage
+from ..utils.cache import LRUCache
+from ..utils.metrics import registry as metrics_registry
+from ..utils.event_hub import event_hub, chef_channel
+from ..utils.http_cache import collection_validator
+from ..utils.pagination import encode_cursor, decode_cursor
+from . import analytics_service, change_log_service, trending_service
+from .dish_service import DISH_LIST_COLUMNS
+
+# 备菜看板缓存：chef_id -> PrepBoardResponse
+_prep_board_cache = LRUCache(
+    maxsize=settings.PREP_BOARD_CACHE_SIZE,
+    ttl=settings.PREP_BOARD_CACHE_TTL_SECONDS
+)
+metrics_registry.register_cache("prep_board", _prep_board_cache)
+
+# 备菜看板版本号：chef_id -> 失效次数。查询前读取，写缓存时版本未变才写入，
+# 避免查询期间发生的失效被随后写入的旧看板覆盖
+_prep_board_generations: Dict[int, int] = {}
+_prep_board_lock = threading.Lock()
+
+
+def invalidate_prep_board(chef_id: int) -> None:
+    """使某个厨师的备菜看板缓存失效（选菜或绑定关系变化、事务提交后调用）"""
+    with _prep_board_lock:
+        _prep_board_generations[chef_id] = _prep_board_generations.get(chef_id, 0) + 1
+        _prep_board_cache.delete(chef_id)
+
+
+def _bound_chef_ids(db: Session, customer_id: int) -> List[int]:
+    """绑定了该顾客（已同意）的厨师ID"""
+    return [
+        chef_id for (chef_id,) in db.query(ChefCustomerBinding.chef_id).filter(
+            ChefCustomerBinding.customer_id == customer_id,
+            ChefCustomerBinding.status == BindingStatus.APPROVED
+        ).all()
+    ]
+
+
+def _notify_chefs(chef_ids: List[int], event_type: str, selection: dict) -> None:
+    """
+    顾客选菜变化（已提交）后通知绑定了该顾客的厨师：
+    使备菜看板缓存失效，并向厨师的实时频道推送事件
+    """
+    for chef_id in chef_ids:
+        invalidate_prep_board(chef_id)
+        event_hub.publish(chef_channel(chef_id), {"type": event_type, "selection": selection})
 
 
 def create_customer_selection(db: Session, current_user: User, dish_id: int) -> CustomerSelection:
@@ -24,92 +78,174 @@ def create_customer_selection(db: Session, current_user: User, dish_id: int) ->
             detail="Dish not found"
         )
 
-    today = date.today()
-
-    # 检查是否已经选择过该菜品（只检查生效中的）
-    existing_selection = db.query(CustomerSelection).filter(
-        CustomerSelection.user_id == current_user.id,
-        CustomerSelection.dish_id == dish_id,
-        CustomerSelection.date == today,
-        CustomerSelection.status == SelectionStatus.ACTIVE
-    ).first()
-
-    if existing_selection:
+    # 创建选择记录，重复选择由唯一索引 uq_user_dish_date_active 拦截
+    new_selection = CustomerSelection(
+        user_id=current_user.id,
+        dish_id=dish_id,
+        date=date.today()
+    )
+    db.add(new_selection)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You have already selected this dish today"
         )
 
-    # 创建选择记录
-    new_selection = CustomerSelection(
-        user_id=current_user.id,
-        dish_id=dish_id,
-        date=today
+    chef_ids = _bound_chef_ids(db, current_user.id)
+    analytics_service.record_pick(db, dish_id, new_selection.date)
+    change_log_service.record_change(
+        db, change_log_service.CUSTOMER_SELECTION, new_selection.id, change_log_service.UPSERT,
+        [current_user.id, *chef_ids]
     )
-    db.add(new_selection)
     db.commit()
     db.refresh(new_selection)
 
+    _notify_chefs(
+        chef_ids, "customer_selection.created",
+        CustomerSelectionResponse.model_validate(new_selection).model_dump(mode="json")
+    )
+    trending_service.record_pick(dish_id)
+
     return new_selection
 
 
-def get_my_customer_selections(db: Session, current_user: User) -> List[CustomerSelection]:
-    """获取我的选菜记录（今日，只返回生效中的）"""
-    today = date.today()
-    selections = db.query(CustomerSelection).filter(
+def _my_customer_selections_criteria(current_user: User, today: date) -> tuple:
+    return (
         CustomerSelection.user_id == current_user.id,
         CustomerSelection.date == today,
         CustomerSelection.status == SelectionStatus.ACTIVE
+    )
+
+
+def _select_customer_selection_rows(db: Session, criteria: tuple) -> List[Dict]:
+    """
+    只读列表的快速路径：一条 JOIN 查询取出选菜和菜品的列，直接组装成响应结构的字典，
+    不经过 ORM 对象构建、identity map 和变更跟踪
+    """
+    dish_columns = [column.label(f"dish_{column.key}") for column in DISH_LIST_COLUMNS]
+    rows = db.execute(
+        select(
+            CustomerSelection.id,
+            CustomerSelection.user_id,
+            CustomerSelection.dish_id,
+            CustomerSelection.date,
+            CustomerSelection.created_at,
+            *dish_columns
+        ).join(
+            Dish, Dish.id == CustomerSelection.dish_id
+        ).where(*criteria)
     ).all()
 
-    return selections
+    dish_keys = [column.key for column in DISH_LIST_COLUMNS]
+    return [
+        {
+            "id": row[0],
+            "user_id": row[1],
+            "dish_id": row[2],
+            "date": row[3],
+            "created_at": row[4],
+            "dish": dict(zip(dish_keys, row[5:])),
+        }
+        for row in rows
+    ]
+
+
+def get_my_customer_selections(db: Session, current_user: User) -> List[Dict]:
+    """获取我的选菜记录（今日，只返回生效中的）"""
+    return _select_customer_selection_rows(
+        db, _my_customer_selections_criteria(current_user, date.today())
+    )
+
+
+def get_my_customer_selections_validator(db: Session, current_user: User) -> Tuple:
+    """我的今日选菜的校验值"""
+    today = date.today()
+    return (today, *collection_validator(
+        db, CustomerSelection.id, *_my_customer_selections_criteria(current_user, today)
+    ))
 
 
 def delete_customer_selection(db: Session, current_user: User, selection_id: int) -> None:
-    """取消顾客选择（软删除，修改状态为 cancelled）"""
-    selection = db.query(CustomerSelection).filter(
+    """取消顾客选择（软删除，带状态条件的单条 UPDATE 修改状态为 cancelled）"""
+    updated = db.query(CustomerSelection).filter(
         CustomerSelection.id == selection_id,
-        CustomerSelection.user_id == current_user.id
-    ).first()
-
-    if not selection:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Selection not found"
-        )
+        CustomerSelection.user_id == current_user.id,
+        CustomerSelection.status == SelectionStatus.ACTIVE
+    ).update(
+        {CustomerSelection.status: SelectionStatus.CANCELLED},
+        synchronize_session=False
+    )
 
-    # 检查是否已经取消
-    if selection.status == SelectionStatus.CANCELLED:
+    if not updated:
+        db.rollback()
+        # 未命中时再区分记录不存在和已经取消
+        exists = db.query(CustomerSelection.id).filter(
+            CustomerSelection.id == selection_id,
+            CustomerSelection.user_id == current_user.id
+        ).first()
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Selection not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Selection already cancelled"
         )
 
-    # 软删除：修改状态为 cancelled
-    selection.status = SelectionStatus.CANCELLED
+    dish_id, selection_date, picked_at = db.query(
+        CustomerSelection.dish_id,
+        CustomerSelection.date,
+        trending_service.epoch_seconds(db, CustomerSelection.created_at)
+    ).filter(CustomerSelection.id == selection_id).one()
+    chef_ids = _bound_chef_ids(db, current_user.id)
+    analytics_service.record_pick_cancellation(db, dish_id, selection_date)
+    change_log_service.record_change(
+        db, change_log_service.CUSTOMER_SELECTION, selection_id, change_log_service.DELETE,
+        [current_user.id, *chef_ids]
+    )
     db.commit()
 
+    _notify_chefs(chef_ids, "customer_selection.cancelled", {
+        "id": selection_id,
+        "user_id": current_user.id,
+        "dish_id": dish_id,
+        "date": selection_date.isoformat()
+    })
+    trending_service.record_cancellation(dish_id, picked_at)
 
-def get_all_customer_selections_for_chef(db: Session, chef_user: User) -> List[CustomerSelection]:
-    """获取已绑定顾客的选菜（今日，仅厨师可见，只返回生效中的）"""
-    today = date.today()
 
-    # 获取所有已绑定的顾客ID
-    approved_bindings = db.query(ChefCustomerBinding).filter(
+def _bound_customer_selections_criteria(db: Session, chef_user: User, today: date) -> tuple:
+    # 通过 EXISTS 半连接过滤已绑定顾客，避免先取出全部顾客ID再拼接超长的 IN 列表
+    is_bound_customer = db.query(ChefCustomerBinding.id).filter(
         ChefCustomerBinding.chef_id == chef_user.id,
+        ChefCustomerBinding.customer_id == CustomerSelection.user_id,
         ChefCustomerBinding.status == BindingStatus.APPROVED
-    ).all()
-
-    bound_customer_ids = [binding.customer_id for binding in approved_bindings]
+    ).exists()
 
-    # 只返回已绑定顾客的选菜（只返回生效中的）
-    selections = db.query(CustomerSelection).filter(
+    return (
         CustomerSelection.date == today,
-        CustomerSelection.user_id.in_(bound_customer_ids),
-        CustomerSelection.status == SelectionStatus.ACTIVE
-    ).all()
+        CustomerSelection.status == SelectionStatus.ACTIVE,
+        is_bound_customer
+    )
+
+
+def get_all_customer_selections_for_chef(db: Session, chef_user: User) -> List[Dict]:
+    """获取已绑定顾客的选菜（今日，仅厨师可见，只返回生效中的）"""
+    return _select_customer_selection_rows(
+        db, _bound_customer_selections_criteria(db, chef_user, date.today())
+    )
 
-    return selections
+
+def get_all_customer_selections_for_chef_validator(db: Session, chef_user: User) -> Tuple:
+    """已绑定顾客今日选菜的校验值"""
+    today = date.today()
+    return (today, *collection_validator(
+        db, CustomerSelection.id, *_bound_customer_selections_criteria(db, chef_user, today)
+    ))
 
 
 def create_chef_selection(
@@ -137,68 +273,263 @@ def create_chef_selection(
             detail="Dish ID does not match customer selection"
         )
 
-    today = date.today()
-
-    # 检查是否已经选择过（只检查生效中的）
-    existing = db.query(ChefSelection).filter(
-        ChefSelection.chef_id == current_user.id,
-        ChefSelection.customer_selection_id == customer_selection_id,
-        ChefSelection.date == today,
-        ChefSelection.status == ChefSelectionStatus.ACTIVE
-    ).first()
-
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You have already selected this dish"
-        )
-
-    # 创建厨师选择记录
+    # 创建厨师选择记录，重复认领由唯一索引 uq_chef_customer_selection_active 拦截
     new_selection = ChefSelection(
         chef_id=current_user.id,
         customer_selection_id=customer_selection_id,
         dish_id=dish_id,
-        date=today
+        date=date.today()
     )
     db.add(new_selection)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already selected this dish"
+        )
+
+    analytics_service.record_claim(db, current_user.id, dish_id, new_selection.date)
+    change_log_service.record_change(
+        db, change_log_service.CHEF_SELECTION, new_selection.id, change_log_service.UPSERT,
+        [current_user.id]
+    )
     db.commit()
     db.refresh(new_selection)
 
+    invalidate_prep_board(current_user.id)
+
     return new_selection
 
 
-def get_my_chef_selections(db: Session, current_user: User) -> List[ChefSelection]:
-    """获取我的选菜记录（今日，只返回生效中的）"""
-    today = date.today()
-    selections = db.query(ChefSelection).filter(
+def _my_chef_selections_criteria(current_user: User, today: date) -> tuple:
+    return (
         ChefSelection.chef_id == current_user.id,
         ChefSelection.date == today,
         ChefSelection.status == ChefSelectionStatus.ACTIVE
+    )
+
+
+def get_my_chef_selections(db: Session, current_user: User) -> List[ChefSelection]:
+    """获取我的选菜记录（今日，只返回生效中的）"""
+    selections = db.query(ChefSelection).filter(
+        *_my_chef_selections_criteria(current_user, date.today())
     ).all()
 
     return selections
 
 
+def get_my_chef_selections_validator(db: Session, current_user: User) -> Tuple:
+    """我的今日认领的校验值"""
+    today = date.today()
+    return (today, *collection_validator(
+        db, ChefSelection.id, *_my_chef_selections_criteria(current_user, today)
+    ))
+
+
 def delete_chef_selection(db: Session, current_user: User, selection_id: int) -> None:
-    """取消厨师选择（软删除，修改状态为 cancelled）"""
-    selection = db.query(ChefSelection).filter(
+    """取消厨师选择（软删除，带状态条件的单条 UPDATE 修改状态为 cancelled）"""
+    updated = db.query(ChefSelection).filter(
         ChefSelection.id == selection_id,
-        ChefSelection.chef_id == current_user.id
-    ).first()
+        ChefSelection.chef_id == current_user.id,
+        ChefSelection.status == ChefSelectionStatus.ACTIVE
+    ).update(
+        {ChefSelection.status: ChefSelectionStatus.CANCELLED},
+        synchronize_session=False
+    )
 
-    if not selection:
+    if not updated:
+        db.rollback()
+        # 未命中时再区分记录不存在和已经取消
+        exists = db.query(ChefSelection.id).filter(
+            ChefSelection.id == selection_id,
+            ChefSelection.chef_id == current_user.id
+        ).first()
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Selection not found"
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Selection not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Selection already cancelled"
+        )
+
+    dish_id, selection_date = db.query(
+        ChefSelection.dish_id, ChefSelection.date
+    ).filter(ChefSelection.id == selection_id).one()
+    analytics_service.record_claim_cancellation(db, current_user.id, dish_id, selection_date)
+    change_log_service.record_change(
+        db, change_log_service.CHEF_SELECTION, selection_id, change_log_service.DELETE,
+        [current_user.id]
+    )
+    db.commit()
+
+    invalidate_prep_board(current_user.id)
+
+
+def get_prep_board_for_chef(db: Session, chef_user: User) -> PrepBoardResponse:
+    """
+    厨师备菜看板：按菜品汇总已绑定顾客今日的点菜份数，区分已认领和未认领
+    单条分组查询完成统计，结果按厨师缓存，直到相关选菜或绑定关系变化
+    """
+    today = date.today()
+
+    cached = _prep_board_cache.get(chef_user.id)
+    if cached is not None and cached.date == today:
+        return cached
+
+    generation = _prep_board_generations.get(chef_user.id, 0)
+
+    # 已绑定顾客今日生效中的选菜，左连接当前厨师生效中的认领记录
+    rows = db.query(
+        CustomerSelection.dish_id,
+        Dish.name,
+        func.count(func.distinct(CustomerSelection.id)),
+        func.count(func.distinct(ChefSelection.customer_selection_id))
+    ).join(
+        ChefCustomerBinding,
+        and_(
+            ChefCustomerBinding.customer_id == CustomerSelection.user_id,
+            ChefCustomerBinding.chef_id == chef_user.id,
+            ChefCustomerBinding.status == BindingStatus.APPROVED
         )
+    ).join(
+        Dish, Dish.id == CustomerSelection.dish_id
+    ).outerjoin(
+        ChefSelection,
+        and_(
+            ChefSelection.customer_selection_id == CustomerSelection.id,
+            ChefSelection.chef_id == chef_user.id,
+            ChefSelection.date == today,
+            ChefSelection.status == ChefSelectionStatus.ACTIVE
+        )
+    ).filter(
+        CustomerSelection.date == today,
+        CustomerSelection.status == SelectionStatus.ACTIVE
+    ).group_by(
+        CustomerSelection.dish_id, Dish.name
+    ).order_by(
+        CustomerSelection.dish_id
+    ).all()
+
+    board = PrepBoardResponse(
+        date=today,
+        items=[
+            PrepBoardItem(
+                dish_id=dish_id,
+                dish_name=dish_name,
+                total_count=total,
+                claimed_count=claimed,
+                unclaimed_count=total - claimed
+            )
+            for dish_id, dish_name, total, claimed in rows
+        ]
+    )
+    with _prep_board_lock:
+        # 查询期间看板被失效过，结果可能不含最新的变化，只返回不缓存
+        if _prep_board_generations.get(chef_user.id, 0) == generation:
+            _prep_board_cache.set(chef_user.id, board)
+
+    return board
 
-    # 检查是否已经取消
-    if selection.status == ChefSelectionStatus.CANCELLED:
+
+def get_customer_selection_history(
+    db: Session,
+    current_user: User,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    include_archived: bool = False
+) -> CustomerSelectionHistoryPage:
+    """
+    获取我的选菜历史（包含已取消的记录），按 (date, id) 倒序游标分页
+    include_archived=true 时同时读取归档表中的记录
+    """
+    sources = [(
+        db.query(CustomerSelection).filter(CustomerSelection.user_id == current_user.id),
+        CustomerSelection
+    )]
+    if include_archived:
+        sources.append((
+            db.query(CustomerSelectionArchive).filter(CustomerSelectionArchive.user_id == current_user.id),
+            CustomerSelectionArchive
+        ))
+
+    items, next_cursor = _paginate_history(sources, start_date, end_date, cursor, limit)
+    return CustomerSelectionHistoryPage(items=items, next_cursor=next_cursor)
+
+
+def get_chef_selection_history(
+    db: Session,
+    current_user: User,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    include_archived: bool = False
+) -> ChefSelectionHistoryPage:
+    """
+    获取我的认领历史（包含已取消的记录），按 (date, id) 倒序游标分页
+    include_archived=true 时同时读取归档表中的记录
+    """
+    sources = [(
+        db.query(ChefSelection).filter(ChefSelection.chef_id == current_user.id),
+        ChefSelection
+    )]
+    if include_archived:
+        sources.append((
+            db.query(ChefSelectionArchive).filter(ChefSelectionArchive.chef_id == current_user.id),
+            ChefSelectionArchive
+        ))
+
+    items, next_cursor = _paginate_history(sources, start_date, end_date, cursor, limit)
+    return ChefSelectionHistoryPage(items=items, next_cursor=next_cursor)
+
+
+def _paginate_history(sources, start_date, end_date, cursor, limit):
+    """
+    历史记录 keyset 分页
+    查询条件为 (owner, date) 前缀 + 游标位置，走 idx_user_date / idx_chef_date 索引，
+    翻页耗时与历史总量无关
+    sources 为 (query, model) 列表，热表和归档表各取一页后按 (date, id) 归并
+    """
+    if start_date and end_date and start_date > end_date:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Selection already cancelled"
+            detail="'from' must not be later than 'to'"
         )
 
-    # 软删除：修改状态为 cancelled
-    selection.status = ChefSelectionStatus.CANCELLED
-    db.commit()
+    cursor_position = decode_cursor(cursor) if cursor else None
+
+    rows = []
+    for query, model in sources:
+        if start_date:
+            query = query.filter(model.date >= start_date)
+        if end_date:
+            query = query.filter(model.date <= end_date)
+
+        if cursor_position:
+            cursor_date, cursor_id = cursor_position
+            # date <= cursor_date 作为索引范围条件，再排除同一天已返回的记录
+            query = query.filter(
+                model.date <= cursor_date,
+                or_(model.date < cursor_date, model.id < cursor_id)
+            )
+
+        rows.extend(query.options(
+            selectinload(model.dish)
+        ).order_by(
+            model.date.desc(), model.id.desc()
+        ).limit(limit + 1).all())
+
+    if len(sources) > 1:
+        rows.sort(key=lambda row: (row.date, row.id), reverse=True)
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].date, rows[-1].id)
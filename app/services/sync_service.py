@@ -0,0 +1,144 @@
+"""
+增量同步服务层
+读取当前用户游标之后的变更日志，合并同一实体的多次变更后批量加载实体的最新状态
+
+变更日志的自增 id 在插入时分配，并发事务可能不按 id 顺序提交（InnoDB 上较小的 id 可能在较大的 id 之后才可见），
+游标若直接推进到已读到的最大 id，会永久跳过仍未提交的较小 id。因此近期（SYNC_COMMIT_LAG_SECONDS 内）写入的记录
+照常返回，但游标只推进到第一条近期记录之前，下次同步时重新读取；客户端按实体合并，重复收到同一变更没有影响
+"""
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, aliased, selectinload
+from fastapi import HTTPException, status
+from datetime import timedelta
+from typing import Dict, List, Optional, Set
+
+from ..config import settings
+from ..models.change_log import ChangeLog
+from ..models.dish import Dish
+from ..models.user import User
+from ..models.chef_customer_binding import ChefCustomerBinding
+from ..models.customer_selection import CustomerSelection, SelectionStatus
+from ..models.chef_selection import ChefSelection, ChefSelectionStatus
+from ..schemas.dish import DishResponse
+from ..schemas.selection import CustomerSelectionResponse, ChefSelectionResponse
+from ..schemas.sync import SyncDeletedItem, SyncResponse
+from . import change_log_service
+from .binding_service import _build_binding_response
+
+
+def get_changes(db: Session, current_user: User, since: Optional[str], limit: Optional[int] = None) -> SyncResponse:
+    """
+    返回游标之后当前用户需要同步的实体
+    - since 为空或早于已压缩的记录时返回 reset=True，客户端应通过各列表接口全量拉取后从新游标开始同步
+    - 选菜被取消、实体被删除或归档时放入 deleted
+    - 近期写入的记录可能在之后的同步中再次返回（见模块说明）
+    """
+    limit = limit or settings.SYNC_PAGE_SIZE
+    since_id = _parse_cursor(since)
+    settled_before = change_log_service.database_now(db) - timedelta(seconds=settings.SYNC_COMMIT_LAG_SECONDS)
+
+    min_id = db.query(func.min(ChangeLog.id)).scalar()
+    if since_id is None or (min_id is not None and since_id < min_id - 1):
+        # 全量拉取之后从已稳定的最大 id 开始，近期的变更在下次同步时再读一遍
+        settled_id = db.query(func.max(ChangeLog.id)).filter(ChangeLog.created_at < settled_before).scalar()
+        return SyncResponse(cursor=str(settled_id or 0), reset=True)
+
+    entries = db.query(
+        ChangeLog.id, ChangeLog.entity_type, ChangeLog.entity_id, ChangeLog.op, ChangeLog.created_at
+    ).filter(
+        or_(ChangeLog.user_id == current_user.id, ChangeLog.user_id.is_(None)),
+        ChangeLog.id > since_id
+    ).order_by(ChangeLog.id).limit(limit + 1).all()
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return SyncResponse(cursor=str(since_id))
+
+    # 游标只推进到第一条近期记录之前：更早的空缺只能来自超过提交延迟仍未提交的事务
+    cursor = since_id
+    for entry in entries:
+        if entry.created_at is None or entry.created_at >= settled_before:
+            break
+        cursor = entry.id
+    if cursor != entries[-1].id:
+        # 剩余的记录都在提交延迟窗口内，继续翻页只会重复读取，等下次同步
+        has_more = False
+
+    # 同一实体只保留最后一次操作
+    latest_ops: Dict[str, Dict[int, str]] = {}
+    for _, entity_type, entity_id, op, _ in entries:
+        latest_ops.setdefault(entity_type, {})[entity_id] = op
+
+    response = SyncResponse(cursor=str(cursor), has_more=has_more)
+    deleted: List[SyncDeletedItem] = []
+
+    def upsert_ids(entity_type: str) -> Set[int]:
+        ops = latest_ops.get(entity_type, {})
+        for entity_id, op in ops.items():
+            if op == change_log_service.DELETE:
+                deleted.append(SyncDeletedItem(entity_type=entity_type, id=entity_id))
+        return {entity_id for entity_id, op in ops.items() if op == change_log_service.UPSERT}
+
+    def mark_missing(entity_type: str, requested: Set[int], found: Set[int]) -> None:
+        deleted.extend(SyncDeletedItem(entity_type=entity_type, id=entity_id) for entity_id in requested - found)
+
+    dish_ids = upsert_ids(change_log_service.DISH)
+    if dish_ids:
+        dishes = db.query(Dish).filter(Dish.id.in_(dish_ids)).all()
+        response.dishes = [DishResponse.model_validate(dish) for dish in dishes]
+        mark_missing(change_log_service.DISH, dish_ids, {dish.id for dish in dishes})
+
+    binding_ids = upsert_ids(change_log_service.BINDING)
+    if binding_ids:
+        customer = aliased(User)
+        chef = aliased(User)
+        rows = db.query(ChefCustomerBinding, customer, chef).join(
+            customer, customer.id == ChefCustomerBinding.customer_id
+        ).join(
+            chef, chef.id == ChefCustomerBinding.chef_id
+        ).filter(ChefCustomerBinding.id.in_(binding_ids)).all()
+        response.bindings = [
+            _build_binding_response(db, binding, customer, chef) for binding, customer, chef in rows
+        ]
+        mark_missing(change_log_service.BINDING, binding_ids, {binding.id for binding, _, _ in rows})
+
+    selection_ids = upsert_ids(change_log_service.CUSTOMER_SELECTION)
+    if selection_ids:
+        selections = db.query(CustomerSelection).options(
+            selectinload(CustomerSelection.dish)
+        ).filter(
+            CustomerSelection.id.in_(selection_ids),
+            CustomerSelection.status == SelectionStatus.ACTIVE
+        ).all()
+        response.customer_selections = [CustomerSelectionResponse.model_validate(s) for s in selections]
+        mark_missing(change_log_service.CUSTOMER_SELECTION, selection_ids, {s.id for s in selections})
+
+    chef_selection_ids = upsert_ids(change_log_service.CHEF_SELECTION)
+    if chef_selection_ids:
+        chef_selections = db.query(ChefSelection).options(
+            selectinload(ChefSelection.dish)
+        ).filter(
+            ChefSelection.id.in_(chef_selection_ids),
+            ChefSelection.status == ChefSelectionStatus.ACTIVE
+        ).all()
+        response.chef_selections = [ChefSelectionResponse.model_validate(s) for s in chef_selections]
+        mark_missing(change_log_service.CHEF_SELECTION, chef_selection_ids, {s.id for s in chef_selections})
+
+    response.deleted = deleted
+    return response
+
+
+def _parse_cursor(since: Optional[str]) -> Optional[int]:
+    if since is None:
+        return None
+    try:
+        since_id = int(since)
+    except ValueError:
+        since_id = -1
+    if since_id < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return since_id
@@ -0,0 +1,87 @@
+"""
+热门菜品服务层
+顾客点菜/取消时更新进程内的滑动窗口计数器，查询热门菜品时直接读取计数器，请求路径上不执行 GROUP BY；
+启动时以及每隔 TRENDING_RESYNC_SECONDS 用一条聚合查询从 customer_selections 重建，
+多进程部署时其他进程的写入在下次重建后可见
+"""
+import time
+from datetime import date, timedelta
+from sqlalchemy import cast, func, Integer
+from sqlalchemy.orm import Session
+from typing import Dict, List
+
+from ..config import settings
+from ..models.customer_selection import CustomerSelection, SelectionStatus
+from ..models.dish import Dish
+from ..schemas.dish import TrendingDish, TrendingDishesResponse
+from ..utils.sliding_window import SlidingWindowCounter
+
+WINDOWS = {
+    "last_1h": 3600,
+    "last_24h": 86400,
+    "last_7d": 7 * 86400,
+}
+
+_counter = SlidingWindowCounter(WINDOWS, bucket_seconds=settings.TRENDING_BUCKET_SECONDS)
+
+
+def epoch_seconds(db: Session, column):
+    """把时间列转换为 Unix 时间戳的 SQL 表达式（按方言区分）"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        return func.unix_timestamp(column)
+    if dialect == "sqlite":
+        return cast(func.strftime("%s", column), Integer)
+    return func.extract("epoch", column)
+
+
+def record_pick(dish_id: int) -> None:
+    """记录一次点菜（在选菜提交之后调用）"""
+    _counter.add(dish_id, 1)
+
+
+def record_cancellation(dish_id: int, picked_at: float) -> None:
+    """记录一次取消，从原点菜时间所在的分桶中扣除"""
+    _counter.add(dish_id, -1, timestamp=picked_at)
+
+
+def rebuild(db: Session) -> None:
+    """用一条按 (菜品, 分桶) 聚合的查询重建计数器"""
+    bucket_seconds = settings.TRENDING_BUCKET_SECONDS
+    since = time.time() - max(WINDOWS.values())
+    created_epoch = epoch_seconds(db, CustomerSelection.created_at)
+    bucket = func.floor(created_epoch / bucket_seconds)
+
+    rows = db.query(
+        CustomerSelection.dish_id, bucket, func.count()
+    ).filter(
+        CustomerSelection.date >= date.today() - timedelta(days=7),  # 走 idx_date_user 并裁剪分区
+        CustomerSelection.status == SelectionStatus.ACTIVE,
+        created_epoch >= since
+    ).group_by(
+        CustomerSelection.dish_id, bucket
+    ).all()
+
+    _counter.load(
+        (dish_id, int(bucket_index) * bucket_seconds, count)
+        for dish_id, bucket_index, count in rows
+    )
+
+
+def get_trending_dishes(db: Session, limit: int = 10) -> TrendingDishesResponse:
+    """各时间窗口内点菜次数最多的菜品"""
+    rankings: Dict[str, list] = {name: _counter.top(name, limit) for name in WINDOWS}
+
+    dish_ids = {dish_id for ranking in rankings.values() for dish_id, _ in ranking}
+    names = dict(
+        db.query(Dish.id, Dish.name).filter(Dish.id.in_(dish_ids)).all()
+    ) if dish_ids else {}
+
+    def build(ranking) -> List[TrendingDish]:
+        return [
+            TrendingDish(dish_id=dish_id, dish_name=names[dish_id], picks=picks)
+            for dish_id, picks in ranking
+            if dish_id in names
+        ]
+
+    return TrendingDishesResponse(**{name: build(ranking) for name, ranking in rankings.items()})
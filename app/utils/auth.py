@@ -1,14 +1,17 @@
 from datetime import datetime, timedelta
+import hmac
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..config import settings
-from ..database import get_db
+from ..database import get_db, SessionLocal
 from ..models.user import User
+from .metrics import password_hash_duration_seconds
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -16,12 +19,14 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码"""
-    return pwd_context.verify(plain_password, hashed_password)
+    with password_hash_duration_seconds.time("verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """生成密码哈希"""
-    return pwd_context.hash(password)
+    with password_hash_duration_seconds.time("hash"):
+        return pwd_context.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -36,37 +41,76 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    """获取当前用户"""
+    """获取当前用户（同步依赖，在线程池中查询数据库，不阻塞事件循环）"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    user = get_user_from_token(db, token)
+    if user is None:
+        raise credentials_exception
+    return user
+
+
+def get_user_from_token(db: Session, token: str) -> Optional[User]:
+    """解析JWT token并查询用户，token无效或用户不存在时返回None（供WebSocket等无法使用请求头的场景使用）"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        return None
 
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    return db.query(User).filter(User.username == username).first()
+
+
+def get_user_id_from_token(token: str) -> Optional[int]:
+    """用独立的短会话校验token并返回用户ID，避免长连接（WebSocket、SSE、长轮询）一直占用数据库连接"""
+    db = SessionLocal()
+    try:
+        user = get_user_from_token(db, token)
+        return user.id if user else None
+    finally:
+        db.close()
+
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """获取当前用户ID（供长连接接口使用，不持有请求级数据库会话）"""
+    user_id = await run_in_threadpool(get_user_id_from_token, token)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """运维接口鉴权：X-Admin-Token 请求头必须与 ADMIN_TOKEN 一致（未配置 ADMIN_TOKEN 时一律拒绝）"""
+    if (
+        not settings.ADMIN_TOKEN
+        or x_admin_token is None
+        or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode())
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
 
 
 def require_role(required_role: str):
-    """角色权限检查装饰器"""
+    """
+    角色依赖（保留接口兼容）
+    用户表已移除 role 字段，同一用户可以同时作为厨师和顾客，
+    厨师/顾客身份由绑定关系决定并在服务层校验，这里只要求已登录
+    """
     async def role_checker(current_user: User = Depends(get_current_user)):
-        if current_user.role != required_role:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Only {required_role} users can access this resource"
-            )
         return current_user
     return role_checker
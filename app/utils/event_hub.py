@@ -0,0 +1,134 @@
+"""
+进程内事件分发
+服务层在事务提交后发布事件，WebSocket / SSE 连接按频道（例如 "chef:1"）订阅。
+事件先交给广播后端：LocalBroadcastBackend 只在本进程内分发；
+多进程部署时可以换成基于 Redis Pub/Sub 等实现的后端，把事件转发给所有进程的 hub
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, Set
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# 订阅者队列溢出时放入的标记事件，客户端收到后应重新拉取完整列表
+RESYNC_EVENT = {"type": "resync"}
+
+
+def chef_channel(chef_id: int) -> str:
+    """厨师接收已绑定顾客选菜事件的频道"""
+    return f"chef:{chef_id}"
+
+
+def bindings_channel(chef_id: int) -> str:
+    """厨师接收待处理绑定请求变化的频道"""
+    return f"bindings:{chef_id}"
+
+
+class BroadcastBackend:
+    """
+    广播后端接口
+    - publish: 把事件发往所有进程（可能在工作线程中调用）
+    - start: 开始接收事件，收到的事件交给 deliver(channel, message)
+    - stop: 停止接收
+    """
+
+    async def start(self, deliver: Callable[[str, Dict[str, Any]], None]) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class LocalBroadcastBackend(BroadcastBackend):
+    """单进程后端：发布的事件直接交给本进程的 hub"""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[str, Dict[str, Any]], None]] = None
+
+    async def start(self, deliver: Callable[[str, Dict[str, Any]], None]) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        if self._deliver is not None:
+            self._deliver(channel, message)
+
+
+class EventHub:
+    """
+    按频道扇出事件
+    每个订阅者持有一个有界队列，消费过慢导致队列满时丢弃积压事件并放入 RESYNC_EVENT
+    """
+
+    def __init__(self, backend: Optional[BroadcastBackend] = None, queue_size: int = 100):
+        self.backend = backend or LocalBroadcastBackend()
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """在应用启动时调用，绑定事件循环并启动广播后端"""
+        self._loop = asyncio.get_running_loop()
+        await self.backend.start(self._deliver_threadsafe)
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+        self._loop = None
+
+    def set_backend(self, backend: BroadcastBackend) -> None:
+        """替换广播后端（需在 start 之前调用）"""
+        self.backend = backend
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """发布事件，可以在同步的服务层代码（线程池）中调用；hub 未启动时忽略"""
+        if self._loop is None:
+            return
+        try:
+            self.backend.publish(channel, message)
+        except Exception:
+            # 推送失败不影响已提交的业务操作，客户端可以通过查询接口补齐
+            logger.exception("Failed to publish event to %s", channel)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        """订阅频道，返回接收事件的队列，退出上下文时取消订阅"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def subscriber_count(self, channel: str) -> int:
+        return len(self._subscribers.get(channel, ()))
+
+    def _deliver_threadsafe(self, channel: str, message: Dict[str, Any]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._deliver, channel, message)
+
+    def _deliver(self, channel: str, message: Dict[str, Any]) -> None:
+        """在事件循环线程中把事件放入订阅者队列"""
+        for queue in list(self._subscribers.get(channel, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+
+
+event_hub = EventHub(queue_size=settings.EVENT_QUEUE_SIZE)
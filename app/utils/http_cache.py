@@ -0,0 +1,57 @@
+"""
+条件请求（ETag / If-None-Match）
+读接口先用一条聚合查询计算校验值，与客户端缓存的 ETag 一致时直接返回 304，
+不加载 ORM 对象也不序列化响应体
+"""
+import hashlib
+from fastapi import Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+
+# 允许客户端缓存，但每次使用前必须用 ETag 重新验证
+CACHE_CONTROL = "private, no-cache"
+
+
+def collection_validator(db: Session, id_column, *criteria, updated_column=None) -> Tuple:
+    """
+    计算一组记录的校验值：(count, max(id), sum(id)[, max(updated_column)])
+    - 记录只会新增或移出集合时，新增必然抬高 max(id)，移出必然改变 count
+    - sum(id) 用于识别同一时刻一进一出（例如解绑一位顾客、又同意另一位顾客）
+    - 记录本身会被修改时传入 updated_column
+    """
+    columns = [func.count(id_column), func.max(id_column), func.sum(id_column)]
+    if updated_column is not None:
+        columns.append(func.max(updated_column))
+    return tuple(db.query(*columns).filter(*criteria).one())
+
+
+def make_etag(*parts) -> str:
+    """由校验值生成强 ETag"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 是否包含当前 ETag（弱比较，忽略 W/ 前缀）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def check_not_modified(request: Request, response: Response, *validator) -> Optional[Response]:
+    """
+    校验条件请求
+    ETag 匹配时返回 304 响应（路由直接返回它）；否则在响应上设置 ETag 和 Cache-Control 并返回 None
+    """
+    etag = make_etag(*validator)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,288 @@
+"""
+进程内指标（Prometheus 文本格式）
+计数器和直方图都保存在当前进程内存中，由 /metrics 输出，不依赖外部服务；
+多进程部署时每个进程各自输出，由抓取端按实例聚合
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .cache import LRUCache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 默认分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PASSWORD_HASH_BUCKETS = (0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """单调递增计数器"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    固定分桶的直方图
+    每个标签组合只保存各桶计数、总和与样本数，observe 为一次二分查找加几次整数加法
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Tuple, list] = {}  # labels -> [各桶计数..., +Inf 计数, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        """统计代码块耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(state)) for labels, state in self._values.items())
+        for labels, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class GaugeCallback:
+    """抓取时才计算的指标（连接池状态、缓存命中率等），callback 返回 [(标签值元组, 数值)]"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[Tuple[Tuple, float]]],
+        labelnames: Iterable[str] = (),
+        metric_type: str = "gauge"
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+        self.metric_type = metric_type
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for labels, value in self.callback():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._caches: Dict[str, LRUCache] = {}
+        self._engines: List[Engine] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_cache(self, name: str, cache: LRUCache) -> None:
+        """登记需要输出命中率的 LRU 缓存（同名重复登记时以最后一次为准）"""
+        with self._lock:
+            self._caches[name] = cache
+
+    def caches(self) -> List[Tuple[str, LRUCache]]:
+        with self._lock:
+            return sorted(self._caches.items())
+
+    def register_engine(self, engine: Engine) -> None:
+        with self._lock:
+            self._engines.append(engine)
+
+    def engines(self) -> List[Engine]:
+        with self._lock:
+            return list(self._engines)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP 请求
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP 请求数（按路由模板、方法和状态码）", ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP 请求耗时", ("method", "route", "status")
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries", "单个请求执行的 SQL 条数", ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+http_request_db_seconds = registry.histogram(
+    "http_request_db_seconds", "单个请求在数据库上花费的时间", ("method", "route"), buckets=LATENCY_BUCKETS
+)
+
+# 数据库
+db_query_duration_seconds = registry.histogram(
+    "db_query_duration_seconds", "单条 SQL 执行耗时（按语句类型）", ("statement",), buckets=QUERY_BUCKETS
+)
+
+# 密码哈希
+password_hash_duration_seconds = registry.histogram(
+    "password_hash_duration_seconds", "bcrypt 哈希/校验耗时", ("operation",), buckets=PASSWORD_HASH_BUCKETS
+)
+
+
+class RequestDBStats:
+    """当前请求的 SQL 统计（存放在 contextvar 中，线程池里的同步路由共享同一个对象）"""
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+current_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("current_db_stats", default=None)
+
+
+def _statement_type(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[:1]
+    return keyword[0].upper() if keyword else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 开始时间放在本次执行的上下文上：语句出错时不会触发 after_cursor_execute，放在连接上会一直残留
+    if context is not None:
+        context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_query_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    db_query_duration_seconds.observe(elapsed, _statement_type(statement))
+
+    stats = current_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """为引擎注册 SQL 计时事件，并输出其连接池状态"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    registry.register_engine(engine)
+
+
+def _pool_stats():
+    for engine in registry.engines():
+        pool = engine.pool
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            getter = getattr(pool, name, None)
+            if getter is not None:
+                yield (engine.url.get_backend_name(), name), getter()
+
+
+def _cache_counts(attribute: str):
+    def collect():
+        for name, cache in registry.caches():
+            yield (name,), getattr(cache, attribute)
+    return collect
+
+
+def _cache_entries():
+    for name, cache in registry.caches():
+        yield (name,), len(cache)
+
+
+def _cache_hit_ratio():
+    for name, cache in registry.caches():
+        total = cache.hits + cache.misses
+        yield (name,), cache.hits / total if total else 0.0
+
+
+registry.register(GaugeCallback("db_pool_connections", "连接池状态（size/checkedin/checkedout/overflow）", _pool_stats, ("backend", "state")))
+registry.register(GaugeCallback("cache_hits_total", "进程内缓存命中次数", _cache_counts("hits"), ("cache",), "counter"))
+registry.register(GaugeCallback("cache_misses_total", "进程内缓存未命中次数", _cache_counts("misses"), ("cache",), "counter"))
+registry.register(GaugeCallback("cache_entries", "进程内缓存当前条目数", _cache_entries, ("cache",)))
+registry.register(GaugeCallback("cache_hit_ratio", "进程启动以来的缓存命中率", _cache_hit_ratio, ("cache",)))
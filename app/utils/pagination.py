@@ -0,0 +1,28 @@
+"""
+游标分页工具
+历史记录按 (date, id) 倒序做 keyset 分页，游标对客户端不透明
+"""
+import base64
+from datetime import date
+from typing import Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(cursor_date: date, cursor_id: int) -> str:
+    """把 (date, id) 编码为游标字符串"""
+    raw = f"{cursor_date.isoformat()}:{cursor_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """解析游标字符串，格式错误时返回 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_date, _, raw_id = base64.urlsafe_b64decode(padded).decode().partition(":")
+        return date.fromisoformat(raw_date), int(raw_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
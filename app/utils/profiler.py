@@ -0,0 +1,176 @@
+"""
+请求采样分析器
+后台线程按固定间隔读取 sys._current_frames()，只记录正在处理当前请求的线程，结果输出为折叠栈格式，
+可直接用 flamegraph.pl 或 speedscope 生成火焰图
+
+事件循环线程和线程池线程由所有并发请求共享，从栈上无法区分属于哪个请求：
+- 进程中只有这一个请求在处理时，记录事件循环线程和在当前请求上下文中执行过 SQL 的线程池线程
+- 有其他并发请求时，只记录正在执行当前请求 SQL 的线程（执行前后设置/清除线程标记），
+  其余样本只计入 skipped_samples，因此并发下的火焰图只包含数据库调用部分
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 执行 SQL 的 DBAPI 调用所在的函数，栈中出现它们的样本计为数据库时间
+DB_EXECUTE_FUNCTIONS = {"do_execute", "do_executemany", "do_execute_no_params"}
+
+# 栈中至少包含这些目录之一的样本才记录（过滤事件循环空转和空闲的线程池线程）
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_APP_DIR = os.path.join(_PROJECT_ROOT, "app") + os.sep
+_FRAMEWORK_DIRS = (os.sep + "starlette" + os.sep, os.sep + "fastapi" + os.sep)
+
+current_profiler: ContextVar[Optional["RequestProfiler"]] = ContextVar("current_profiler", default=None)
+
+# 线程 id -> 该线程正在为其执行 SQL 的请求的分析器（SQL 执行结束时清除）
+_db_threads: Dict[int, "RequestProfiler"] = {}
+
+# 正在处理的 HTTP 请求数（由 ProfilingMiddleware 在事件循环线程中维护）
+_requests_in_flight = 0
+
+
+def request_started() -> None:
+    global _requests_in_flight
+    _requests_in_flight += 1
+
+
+def request_finished() -> None:
+    global _requests_in_flight
+    _requests_in_flight -= 1
+
+
+def _frame_label(code) -> str:
+    """函数名 + 相对路径和定义行号（不带执行行号，同一函数的样本合并到一个火焰图节点）"""
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _is_relevant(filename: str) -> bool:
+    return filename.startswith(_APP_DIR) or any(path in filename for path in _FRAMEWORK_DIRS)
+
+
+class RequestProfiler:
+    """
+    单个请求的采样分析器
+    - interval: 采样间隔（秒）
+    start() 启动采样线程，stop() 停止并等待其退出，之后可调用 write() 输出结果
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.thread_ids = {threading.get_ident()}
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.db_samples = 0
+        self.skipped_samples = 0  # 有并发请求时无法归属到当前请求而丢弃的样本
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self.started_at
+        self._stop.set()
+        self._thread.join()
+
+    def add_current_thread(self) -> None:
+        self.thread_ids.add(threading.get_ident())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            exclusive = _requests_in_flight <= 1
+            for thread_id in list(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self._sample(frame, exclusive or _db_threads.get(thread_id) is self)
+
+    def _sample(self, frame, owned: bool) -> None:
+        labels = []
+        relevant = False
+        in_db = False
+        while frame is not None:
+            code = frame.f_code
+            if not relevant:
+                relevant = _is_relevant(code.co_filename)
+            if code.co_name in DB_EXECUTE_FUNCTIONS:
+                in_db = True
+            labels.append(_frame_label(code))
+            frame = frame.f_back
+
+        if not relevant:
+            return
+        if not owned:
+            self.skipped_samples += 1
+            return
+        labels.reverse()
+        self.stacks[";".join(labels)] += 1
+        self.samples += 1
+        if in_db:
+            self.db_samples += 1
+
+    def write(self, directory: str, name: str, summary: Dict) -> str:
+        """
+        写出 {name}.folded（折叠栈，每行“栈 次数”）和 {name}.json（请求信息与数据库耗时汇总）
+        返回折叠栈文件路径
+        """
+        os.makedirs(directory, exist_ok=True)
+        folded_path = os.path.join(directory, f"{name}.folded")
+        with open(folded_path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        summary = dict(summary)
+        summary.update({
+            "duration_seconds": round(self.duration, 6),
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+            "db_samples": self.db_samples,
+            "db_sample_ratio": round(self.db_samples / self.samples, 4) if self.samples else 0.0,
+            "skipped_samples": self.skipped_samples,
+        })
+        with open(os.path.join(directory, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return folded_path
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profiler = current_profiler.get()
+    if profiler is not None:
+        profiler.add_current_thread()
+        _db_threads[threading.get_ident()] = profiler
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _db_threads.pop(threading.get_ident(), None)
+
+
+def _handle_error(exception_context):
+    _db_threads.pop(threading.get_ident(), None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """在线程池中执行 SQL 的线程加入当前请求的采样范围，执行期间标记该线程属于当前请求"""
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
@@ -0,0 +1,66 @@
+"""
+执行计划解析
+把 SQLite 的 EXPLAIN QUERY PLAN 和 MySQL 的 EXPLAIN 输出统一为 PlanStep（访问的表、使用的索引、是否扫描），
+供索引分析、执行计划检查等运维脚本使用
+"""
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy.engine import Connection
+
+PRIMARY_KEY = "PRIMARY"
+
+_SQLITE_STEP = re.compile(
+    r"^(?P<op>SCAN|SEARCH) (?:TABLE )?(?P<table>\w+)"
+    r"(?: USING (?:(?:COVERING )?INDEX (?P<index>\w+)|(?P<pk>INTEGER PRIMARY KEY|PRIMARY KEY)))?"
+)
+_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?\s+AS\s+`?(\w+)`?", re.IGNORECASE)
+
+
+class PlanStep(NamedTuple):
+    """执行计划中访问一张表的一步"""
+    table: str  # 表名（已从别名还原）
+    index: Optional[str]  # 使用的索引，主键为 PRIMARY，未使用索引为 None
+    scan: bool  # 是否遍历整张表或整个索引（而不是按条件定位）
+    detail: str  # 原始计划内容
+
+    @property
+    def full_table_scan(self) -> bool:
+        return self.scan and self.index is None
+
+
+def table_aliases(statement: str) -> Dict[str, str]:
+    """语句中 `FROM/JOIN 表 AS 别名` 的别名映射"""
+    return {alias: table for table, alias in _ALIAS.findall(statement)}
+
+
+def parse_sqlite_step(detail: str, aliases: Optional[Dict[str, str]] = None) -> Optional[PlanStep]:
+    """解析一行 EXPLAIN QUERY PLAN；不访问表的行（临时 B 树、子查询等）返回 None"""
+    match = _SQLITE_STEP.match(detail)
+    if match is None:
+        return None
+    table = match.group("table")
+    index = match.group("index") or (PRIMARY_KEY if match.group("pk") else None)
+    return PlanStep((aliases or {}).get(table, table), index, match.group("op") == "SCAN", detail)
+
+
+def explain(conn: Connection, statement: str, parameters: Any = None) -> List[PlanStep]:
+    """获取语句的执行计划（参数为 DBAPI 格式，与语句的占位符风格一致）"""
+    aliases = table_aliases(statement)
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters or ()).fetchall()
+        return [step for step in (parse_sqlite_step(row[-1], aliases) for row in rows) if step is not None]
+
+    steps = []
+    for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters or ()).mappings():
+        table = row.get("table")
+        if not table or table.startswith("<"):  # <derived2>、<union1,2> 等
+            continue
+        access_type = row.get("type")
+        steps.append(PlanStep(
+            table=aliases.get(table, table),
+            index=row.get("key"),
+            scan=access_type in ("ALL", "index"),
+            detail=f"type={access_type} key={row.get('key')} rows={row.get('rows')} extra={row.get('Extra')}"
+        ))
+    return steps
@@ -0,0 +1,58 @@
+"""
+快速 JSON 序列化
+- ORJSONResponse: 用 orjson 编码的默认响应类
+- JSONSerializer: 启动时为响应类型构建一次 TypeAdapter，由 pydantic-core 直接输出 JSON 字节，
+  跳过 FastAPI 对 response_model 的二次校验、jsonable_encoder 和 json.dumps
+"""
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+
+class ORJSONResponse(JSONResponse):
+    """使用 orjson 编码的 JSON 响应"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class JSONSerializer:
+    """
+    某个响应类型的序列化器（在模块导入时创建，请求中复用）
+    路由仍声明 response_model 以生成 OpenAPI 文档，返回 serializer.response(...) 时 FastAPI 不再处理响应体
+    """
+
+    def __init__(self, response_type: Any):
+        self._adapter = TypeAdapter(response_type)
+
+    def dump(self, content: Any, validate: bool = True) -> bytes:
+        """
+        序列化为 JSON 字节
+        validate=True: content 为 ORM 对象等，先按 from_attributes 校验一次
+        validate=False: content 已是服务层构建好的响应模型，直接输出
+        """
+        if validate:
+            content = self._adapter.validate_python(content, from_attributes=True)
+        return self._adapter.dump_json(content)
+
+    def response(
+        self,
+        content: Any,
+        response: Optional[Response] = None,
+        status_code: int = 200,
+        validate: bool = True
+    ) -> Response:
+        """
+        构建 JSON 响应
+        response 为路由注入的 Response 时沿用其上设置的响应头（如 ETag）
+        """
+        headers: Optional[Mapping[str, str]] = dict(response.headers) if response is not None else None
+        return Response(
+            content=self.dump(content, validate=validate),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json"
+        )
@@ -0,0 +1,118 @@
+"""
+滑动窗口计数器
+按固定时长分桶计数，同时维护多个时间窗口内的累计值，查询 top-K 时不需要遍历所有分桶
+"""
+import heapq
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class SlidingWindowCounter:
+    """
+    多窗口滑动计数器
+    - windows: 窗口名 -> 窗口秒数，例如 {"1h": 3600, "24h": 86400}
+    - bucket_seconds: 分桶粒度，窗口边界按分桶对齐
+    每个窗口保存自己覆盖的分桶序号队列和累计值，分桶滑出窗口时从累计值中扣除
+    分桶计数始终非负，累计值等于窗口内分桶计数之和
+    """
+
+    def __init__(self, windows: Dict[str, int], bucket_seconds: int = 300):
+        self.bucket_seconds = bucket_seconds
+        self._window_buckets = {
+            name: max(1, seconds // bucket_seconds) for name, seconds in windows.items()
+        }
+        self._max_buckets = max(self._window_buckets.values())
+        self._buckets: Dict[int, Counter] = {}
+        self._window_queues = {name: deque() for name in windows}
+        self._totals = {name: Counter() for name in windows}
+        self._current = None
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, delta: int = 1, timestamp: Optional[float] = None) -> None:
+        """在 timestamp（默认当前时间）所在分桶上计数，超出最大窗口的旧记录忽略"""
+        now_index = self._bucket_index(time.time())
+        index = now_index if timestamp is None else min(self._bucket_index(timestamp), now_index)
+
+        with self._lock:
+            self._advance(now_index)
+            bucket = self._buckets.get(index)
+            if bucket is None:
+                return
+
+            # 分桶计数不减到负数：扣减没有记录过的计数（例如重建后才取消的选择）时，
+            # 负数会在分桶滑出窗口时被反向加回累计值，变成不存在的正计数
+            if delta < 0:
+                delta = max(delta, -bucket[key])
+                if delta == 0:
+                    return
+            bucket[key] += delta
+            if bucket[key] == 0:
+                del bucket[key]
+            for name, size in self._window_buckets.items():
+                if index > now_index - size:
+                    self._add_to_total(name, key, delta)
+
+    def top(self, window: str, k: int) -> List[Tuple[Hashable, int]]:
+        """窗口内计数最大的 k 个 key（只返回计数为正的）"""
+        with self._lock:
+            self._advance(self._bucket_index(time.time()))
+            return heapq.nlargest(k, self._totals[window].items(), key=lambda item: item[1])
+
+    def load(self, rows: Iterable[Tuple[Hashable, float, int]]) -> None:
+        """用 (key, timestamp, count) 记录重建所有分桶和累计值"""
+        now_index = self._bucket_index(time.time())
+        grouped: Dict[int, Counter] = {}
+        for key, timestamp, count in rows:
+            index = min(self._bucket_index(timestamp), now_index)
+            if index > now_index - self._max_buckets:
+                grouped.setdefault(index, Counter())[key] += count
+
+        with self._lock:
+            self._buckets = {}
+            self._window_queues = {name: deque() for name in self._window_buckets}
+            self._totals = {name: Counter() for name in self._window_buckets}
+            self._current = None
+
+            for index in range(now_index - self._max_buckets + 1, now_index + 1):
+                bucket = grouped.get(index, Counter())
+                self._buckets[index] = bucket
+                for name, size in self._window_buckets.items():
+                    if index > now_index - size:
+                        self._window_queues[name].append(index)
+                        for key, count in bucket.items():
+                            self._add_to_total(name, key, count)
+            self._current = now_index
+
+    def _bucket_index(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def _advance(self, now_index: int) -> None:
+        """补齐到 now_index 的分桶，并把滑出各窗口的分桶从累计值中扣除（调用方持有锁）"""
+        if self._current is None:
+            self._current = now_index - 1
+
+        # 长时间无写入时只需补齐最大窗口内的分桶
+        start = max(self._current + 1, now_index - self._max_buckets + 1)
+        for index in range(start, now_index + 1):
+            self._buckets[index] = Counter()
+            for queue in self._window_queues.values():
+                queue.append(index)
+        self._current = max(self._current, now_index)
+
+        # 按窗口从小到大处理，最大窗口弹出的分桶已不属于任何窗口，可以直接删除
+        for name, size in sorted(self._window_buckets.items(), key=lambda item: item[1]):
+            queue = self._window_queues[name]
+            while queue and queue[0] <= now_index - size:
+                index = queue.popleft()
+                for key, count in self._buckets.get(index, Counter()).items():
+                    self._add_to_total(name, key, -count)
+                if size == self._max_buckets:
+                    self._buckets.pop(index, None)
+
+    def _add_to_total(self, name: str, key: Hashable, delta: int) -> None:
+        totals = self._totals[name]
+        totals[key] += delta
+        if totals[key] <= 0:
+            del totals[key]
@@ -0,0 +1,205 @@
+"""
+慢查询日志
+执行时间超过阈值的 SQL 记入进程内环形缓冲区（参数脱敏，只保留类型和长度），
+并记录发起查询的服务层函数；执行计划在后台线程中用 EXPLAIN 获取，不阻塞请求。
+每分钟记录条数有上限，超出的只计数，避免数据库抖动时日志本身成为负担
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+from .cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# 带该执行选项为 False 的语句不记录（EXPLAIN 本身）
+EXECUTION_OPTION = "slow_query_log"
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_SERVICES_DIR = os.path.join(_APP_DIR, "services") + os.sep
+_IGNORED_FILES = (os.path.abspath(__file__), os.path.join(_APP_DIR, "database.py"))
+
+# 获取执行计划的语句类型。UPDATE / DELETE 也在其中：普通 EXPLAIN / EXPLAIN QUERY PLAN 只生成计划、不执行语句，
+# 不会重复写入；不要改用 EXPLAIN ANALYZE，它会真正执行被分析的语句
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """参数脱敏：只保留类型和长度；executemany 时只展示第一组参数和组数"""
+    if executemany:
+        parameter_sets = list(parameters or ())
+        return {
+            "parameter_sets": len(parameter_sets),
+            "first": redact_parameters(parameter_sets[0]) if parameter_sets else None,
+        }
+    if isinstance(parameters, dict):
+        return {key: _placeholder(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_placeholder(value) for value in parameters]
+    return _placeholder(parameters)
+
+
+def _placeholder(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def find_origin() -> Optional[str]:
+    """调用栈中最近的服务层函数（找不到时退而取最近的 app 内函数），格式为 文件:行号 函数名"""
+    fallback = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_SERVICES_DIR):
+            return _format_frame(frame)
+        if fallback is None and filename.startswith(_APP_DIR) and filename not in _IGNORED_FILES:
+            fallback = _format_frame(frame)
+        frame = frame.f_back
+    return fallback
+
+
+def _format_frame(frame) -> str:
+    filename = os.path.relpath(frame.f_code.co_filename, os.path.dirname(_APP_DIR.rstrip(os.sep)))
+    return f"{filename}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+class SlowQueryLog:
+    """
+    慢查询日志
+    - threshold_ms: 记录阈值（毫秒）
+    - size: 环形缓冲区保留的最近记录数
+    - max_per_minute: 每分钟最多记录的条数，超出部分计入 dropped
+    - explain: 是否在后台获取执行计划
+    """
+
+    def __init__(self, threshold_ms: float, size: int, max_per_minute: int, explain: bool = True):
+        self.threshold = threshold_ms / 1000
+        self.max_per_minute = max_per_minute
+        self.explain = explain
+        self.dropped = 0
+        self._entries: deque = deque(maxlen=size)
+        self._next_id = 1
+        self._window_start = 0.0
+        self._window_count = 0
+        self._lock = threading.Lock()
+        self._plan_cache = LRUCache(maxsize=256)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def install(self, engine: Engine) -> None:
+        """在引擎上注册计时事件"""
+        if not event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # 与 metrics 相同，开始时间放在执行上下文上，出错的语句不会在连接上残留
+        if context is not None:
+            context._slow_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_slow_query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        if elapsed < self.threshold:
+            return
+        if context is not None and context.execution_options.get(EXECUTION_OPTION, True) is False:
+            return
+        self.record(conn.engine, statement, parameters, executemany, elapsed)
+
+    def record(self, engine: Engine, statement: str, parameters: Any, executemany: bool, elapsed: float) -> None:
+        """记录一条慢查询（超过每分钟上限时丢弃）"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_start >= 60:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count >= self.max_per_minute:
+                self.dropped += 1
+                return
+            self._window_count += 1
+
+            entry = {
+                "id": self._next_id,
+                "occurred_at": datetime.utcnow(),
+                "duration_ms": round(elapsed * 1000, 3),
+                "statement": statement,
+                "parameters": redact_parameters(parameters, executemany),
+                "executemany": executemany,
+                "origin": find_origin(),
+                "plan": None,
+                "plan_error": None,
+            }
+            self._next_id += 1
+            self._entries.append(entry)
+
+        logger.warning(
+            "慢查询 %.1fms [%s]: %s", entry["duration_ms"], entry["origin"], " ".join(statement.split())
+        )
+        if self.explain and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            explain_parameters = parameters[0] if executemany and parameters else parameters
+            self._explain_async(engine, entry, statement, explain_parameters)
+
+    def _explain_async(self, engine: Engine, entry: Dict, statement: str, parameters: Any) -> None:
+        cached = self._plan_cache.get(statement)
+        if cached is not None:
+            entry["plan"] = cached
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+            executor = self._executor
+        executor.submit(self._explain, engine, entry, statement, parameters)
+
+    def _explain(self, engine: Engine, entry: Dict, statement: str, parameters: Any) -> None:
+        """在后台线程中用新连接获取执行计划（SQLite 为 EXPLAIN QUERY PLAN，其他数据库为 EXPLAIN）"""
+        dialect = engine.dialect.name
+        prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+        try:
+            with engine.connect() as conn:
+                conn = conn.execution_options(**{EXECUTION_OPTION: False})
+                rows = conn.exec_driver_sql(prefix + statement, parameters or ()).fetchall()
+        except Exception as exc:
+            with self._lock:
+                entry["plan_error"] = str(exc).splitlines()[0]
+            return
+
+        if dialect == "sqlite":
+            plan = [str(row[-1]) for row in rows]  # (id, parent, notused, detail)
+        else:
+            plan = [" | ".join("" if value is None else str(value) for value in row) for row in rows]
+        self._plan_cache.set(statement, plan)
+        with self._lock:
+            entry["plan"] = plan
+
+    def entries(self, limit: Optional[int] = None, min_duration_ms: float = 0) -> List[Dict]:
+        """最近的慢查询（新的在前）"""
+        with self._lock:
+            items = [dict(entry) for entry in reversed(self._entries) if entry["duration_ms"] >= min_duration_ms]
+        return items[:limit] if limit is not None else items
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.dropped = 0
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+    max_per_minute=settings.SLOW_QUERY_MAX_PER_MINUTE,
+    explain=settings.SLOW_QUERY_EXPLAIN
+)
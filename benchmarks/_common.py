@@ -0,0 +1,94 @@
+"""
+基准测试公共工具
+创建独立的 SQLite 数据库并建表，不依赖 .env 中的 MySQL 配置
+"""
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+# app.config 在导入时读取必填配置，基准测试使用占位值
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app import models  # noqa: E402,F401  注册所有模型
+
+
+def make_session(url: str = "sqlite://") -> Session:
+    """创建建好表的数据库会话（默认内存 SQLite）"""
+    if url == "sqlite://":
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    else:
+        engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def count_queries(session: Session) -> Dict[str, int]:
+    """统计会话所在引擎执行的 SQL 条数，返回可读取的计数字典"""
+    counter = {"queries": 0}
+
+    @event.listens_for(session.get_bind(), "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter["queries"] += 1
+
+    return counter
+
+
+def sample(func: Callable[[], object], repeat: int = 20, warmup: int = 2) -> List[float]:
+    """多次执行 func，返回排好序的每次耗时（毫秒）"""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return samples
+
+
+def timeit(func: Callable[[], object], repeat: int = 20, warmup: int = 2) -> Dict[str, float]:
+    """多次执行 func，返回耗时统计（毫秒）"""
+    samples = sample(func, repeat, warmup)
+    return {
+        "min_ms": samples[0],
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "max_ms": samples[-1],
+    }
+
+
+def measure_allocations(func: Callable[[], object]) -> Dict[str, int]:
+    """单次执行期间的内存分配总量和峰值（KB）"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+    return {"alloc_kb": allocated // 1024, "peak_kb": peak // 1024}
+
+
+def print_result(name: str, result: Dict[str, float]) -> None:
+    """打印一行基准结果"""
+    stats = "  ".join(
+        f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in result.items()
+    )
+    print(f"{name:<40} {stats}")
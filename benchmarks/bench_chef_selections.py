@@ -0,0 +1,90 @@
+"""
+厨师查看已绑定顾客选菜的基准测试
+对比旧的「先查绑定ID再 IN 列表」两步查询与现在的 EXISTS 半连接
+
+运行：python -m benchmarks.bench_chef_selections --customers 10000
+"""
+import argparse
+from datetime import date
+
+from ._common import make_session, count_queries, timeit, print_result
+
+from app.models import User, Dish, CustomerSelection, ChefCustomerBinding
+from app.models.chef_customer_binding import BindingStatus
+from app.models.customer_selection import SelectionStatus
+from app.services import selection_service
+
+
+def seed(db, customers: int, other_customers: int) -> User:
+    """创建一个绑定了 customers 个顾客的厨师，另有 other_customers 个未绑定顾客作为干扰数据"""
+    today = date.today()
+    total_users = 1 + customers + other_customers
+
+    db.execute(User.__table__.insert(), [
+        {"id": i, "username": f"user{i}", "hashed_password": "x"}
+        for i in range(1, total_users + 1)
+    ])
+    db.execute(Dish.__table__.insert(), [
+        {"id": i, "name": f"dish{i}", "recipe": "r", "ingredients": "i"}
+        for i in range(1, 51)
+    ])
+    db.execute(ChefCustomerBinding.__table__.insert(), [
+        {"chef_id": 1, "customer_id": i, "status": BindingStatus.APPROVED}
+        for i in range(2, customers + 2)
+    ])
+    db.execute(CustomerSelection.__table__.insert(), [
+        {"user_id": i, "dish_id": i % 50 + 1, "date": today, "status": SelectionStatus.ACTIVE}
+        for i in range(2, total_users + 1)
+    ])
+    db.commit()
+
+    return db.get(User, 1)
+
+
+def two_step_lookup(db, chef_user):
+    """旧实现：先加载全部已绑定的顾客ID，再用 IN 列表查询选菜"""
+    approved_bindings = db.query(ChefCustomerBinding).filter(
+        ChefCustomerBinding.chef_id == chef_user.id,
+        ChefCustomerBinding.status == BindingStatus.APPROVED
+    ).all()
+    bound_customer_ids = [binding.customer_id for binding in approved_bindings]
+
+    return db.query(CustomerSelection).filter(
+        CustomerSelection.date == date.today(),
+        CustomerSelection.user_id.in_(bound_customer_ids),
+        CustomerSelection.status == SelectionStatus.ACTIVE
+    ).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=10000, help="厨师绑定的顾客数")
+    parser.add_argument("--other-customers", type=int, default=10000, help="未绑定的干扰顾客数")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = make_session()
+    chef = seed(db, args.customers, args.other_customers)
+    counter = count_queries(db)
+
+    def run_old():
+        db.expunge_all()
+        return two_step_lookup(db, chef)
+
+    def run_new():
+        db.expunge_all()
+        return selection_service.get_all_customer_selections_for_chef(db, chef)
+
+    assert len(run_old()) == len(run_new()) == args.customers
+
+    for name, func in [("two-step IN list", run_old), ("EXISTS semi-join", run_new)]:
+        counter["queries"] = 0
+        func()
+        queries = counter["queries"]
+        result = timeit(func, repeat=args.repeat)
+        result["queries"] = queries
+        print_result(f"{name} ({args.customers} customers)", result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+只读列表接口的行加载基准测试
+对比 ORM 全量加载（Query + from_attributes 转换）与 Core select() 直接组装字典，
+输出每 1000 行的耗时和内存分配（tracemalloc 统计的分配总量和峰值）
+
+运行：python -m benchmarks.bench_row_hydration --rows 5000
+"""
+import argparse
+from datetime import date
+from typing import Dict, List
+
+from ._common import make_session, measure_allocations, timeit, print_result
+
+from sqlalchemy.orm import selectinload
+
+from app.models import User, Dish, CustomerSelection, ChefCustomerBinding
+from app.models.chef_customer_binding import BindingStatus
+from app.models.customer_selection import SelectionStatus
+from app.schemas.dish import DishResponse
+from app.schemas.selection import CustomerSelectionResponse
+from app.services import dish_service, selection_service
+from app.utils.serialization import JSONSerializer
+
+
+def seed(db, rows: int) -> User:
+    """rows 个菜品；一个厨师绑定 rows 个顾客，每个顾客今日选一道菜"""
+    today = date.today()
+    db.execute(User.__table__.insert(), [
+        {"id": i, "username": f"user{i}", "hashed_password": "x"}
+        for i in range(1, rows + 2)
+    ])
+    db.execute(Dish.__table__.insert(), [
+        {
+            "id": i, "name": f"dish{i}", "description": "家常菜", "recipe": "r", "ingredients": "i",
+            "cooking_time": 30, "difficulty": "easy", "category": "川菜"
+        }
+        for i in range(1, rows + 1)
+    ])
+    db.execute(ChefCustomerBinding.__table__.insert(), [
+        {"chef_id": 1, "customer_id": i, "status": BindingStatus.APPROVED}
+        for i in range(2, rows + 2)
+    ])
+    db.execute(CustomerSelection.__table__.insert(), [
+        {"user_id": i, "dish_id": i - 1, "date": today, "status": SelectionStatus.ACTIVE}
+        for i in range(2, rows + 2)
+    ])
+    db.commit()
+    return db.get(User, 1)
+
+
+def per_thousand(result: Dict, rows: int) -> Dict:
+    """把耗时和分配量换算为每 1000 行"""
+    scale = 1000 / rows
+    return {
+        key: (value * scale if isinstance(value, float) else int(value * scale))
+        for key, value in result.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000, help="列表行数")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = make_session()
+    chef = seed(db, args.rows)
+
+    dish_serializer = JSONSerializer(List[DishResponse])
+    selection_serializer = JSONSerializer(List[CustomerSelectionResponse])
+
+    def orm_dishes():
+        db.expunge_all()
+        return dish_serializer.dump(db.query(Dish).limit(args.rows).all())
+
+    def core_dishes():
+        return dish_serializer.dump(dish_service.get_all_dishes(db, 0, args.rows))
+
+    def orm_selections():
+        db.expunge_all()
+        selections = db.query(CustomerSelection).options(
+            selectinload(CustomerSelection.dish)
+        ).filter(
+            *selection_service._bound_customer_selections_criteria(db, chef, date.today())
+        ).all()
+        return selection_serializer.dump(selections)
+
+    def core_selections():
+        return selection_serializer.dump(selection_service.get_all_customer_selections_for_chef(db, chef))
+
+    assert orm_dishes() == core_dishes()
+    assert orm_selections() == core_selections()
+
+    for name, func in [
+        ("ORM dishes", orm_dishes),
+        ("Core dishes", core_dishes),
+        ("ORM bound selections", orm_selections),
+        ("Core bound selections", core_selections),
+    ]:
+        result = timeit(func, repeat=args.repeat)
+        result.update(measure_allocations(func))
+        print_result(f"{name} (per 1000 rows)", per_thousand(result, args.rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+列表接口序列化的基准测试
+同一批已加载的 ORM 对象分别通过三种方式返回，只比较序列化开销（不含数据库查询）：
+- default:    response_model + JSONResponse（FastAPI 校验 response_model、jsonable 化后 json.dumps）
+- orjson:     response_model + ORJSONResponse（同上，最后一步换成 orjson）
+- serializer: JSONSerializer 预建 TypeAdapter，pydantic-core 直接输出 JSON 字节
+
+运行：python -m benchmarks.bench_serialization --rows 1000
+"""
+import argparse
+import warnings
+from datetime import date
+from typing import List
+
+from ._common import make_session, timeit, print_result
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import selectinload
+
+from app.models import User, Dish, CustomerSelection
+from app.schemas.dish import DishResponse
+from app.schemas.selection import CustomerSelectionResponse
+from app.utils.serialization import JSONSerializer, ORJSONResponse
+
+
+def seed(db, rows: int) -> None:
+    """创建 rows 个菜品，以及 rows 条引用这些菜品的顾客选菜"""
+    db.execute(User.__table__.insert(), [
+        {"id": i, "username": f"user{i}", "hashed_password": "x"}
+        for i in range(1, rows + 1)
+    ])
+    db.execute(Dish.__table__.insert(), [
+        {
+            "id": i, "name": f"dish{i}", "description": "家常菜" * 5, "recipe": "r", "ingredients": "i",
+            "cooking_time": 30, "difficulty": "easy", "category": "川菜"
+        }
+        for i in range(1, rows + 1)
+    ])
+    db.execute(CustomerSelection.__table__.insert(), [
+        {"user_id": i, "dish_id": i, "date": date.today()}
+        for i in range(1, rows + 1)
+    ])
+    db.commit()
+
+
+def build_app(path: str, response_type, objects) -> FastAPI:
+    """同一份数据挂到三个路由上"""
+    app = FastAPI()
+    serializer = JSONSerializer(response_type)
+
+    @app.get(f"/default{path}", response_model=response_type, response_class=JSONResponse)
+    def default():
+        return objects
+
+    @app.get(f"/orjson{path}", response_model=response_type, response_class=ORJSONResponse)
+    def with_orjson():
+        return objects
+
+    @app.get(f"/serializer{path}", response_model=response_type)
+    def with_serializer():
+        return serializer.response(objects)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000, help="列表长度")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+    db = make_session()
+    seed(db, args.rows)
+    dishes = db.query(Dish).all()
+    selections = db.query(CustomerSelection).options(selectinload(CustomerSelection.dish)).all()
+
+    cases = [
+        ("/dishes", List[DishResponse], dishes),
+        ("/selections", List[CustomerSelectionResponse], selections),
+    ]
+    for path, response_type, objects in cases:
+        client = TestClient(build_app(path, response_type, objects))
+        bodies = {}
+        for variant in ("default", "orjson", "serializer"):
+            url = f"/{variant}{path}"
+            response = client.get(url)
+            bodies[variant] = response.json()
+
+            result = timeit(lambda: client.get(url), repeat=args.repeat)
+            result["bytes"] = len(response.content)
+            print_result(f"{variant:<10} {path} ({args.rows} rows)", result)
+
+        assert bodies["default"] == bodies["orjson"] == bodies["serializer"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,525 @@
+"""
+端到端压测：模拟午餐高峰的突发流量
+先向独立的 SQLite 文件写入厨师、顾客、绑定关系、菜品和最近几天的选菜历史，
+再按「平峰 → 高峰 → 平峰」的到达率回放登录、浏览菜单、点菜/取消、厨师轮询的混合请求，
+输出每个接口的吞吐量和 p50/p95/p99 延迟，以及服务端 /metrics 统计的每请求 SQL 条数。
+
+- 到达过程为非齐次泊松过程，每次到达是一组同时下单的顾客（--group-size），流量呈簇状
+- 请求按计划时间发出（开环），延迟从计划时间算起，包含在并发上限处的排队时间，
+  服务变慢时不会因为压测端等待而少发请求
+- 令牌用 SECRET_KEY 本地签发，不需要为每个虚拟用户走一次 bcrypt 登录；login 仍作为流量的一部分
+
+运行：
+  python -m benchmarks.load_test --duration 30 --peak-rate 150    # 进程内（httpx ASGITransport）
+  python -m benchmarks.load_test --uvicorn --workers 1            # 启动 uvicorn 子进程，经真实 HTTP 访问
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+# 压测使用独立的 SQLite 文件，避免误连 .env 中的数据库；必须在导入 app 之前设置
+DATABASE_PATH = os.path.join(tempfile.gettempdir(), "tiny-menu-load-test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+import httpx  # noqa: E402
+
+from app.database import Base, engine  # noqa: E402
+from app.models import User, Dish, CustomerSelection, ChefCustomerBinding  # noqa: E402
+from app.models.chef_customer_binding import BindingStatus  # noqa: E402
+from app.models.customer_selection import SelectionStatus  # noqa: E402
+from app.utils.auth import create_access_token, get_password_hash  # noqa: E402
+
+PASSWORD = "load-test-password"
+
+_DB_METRIC = re.compile(
+    r'^http_request_db_queries_(sum|count)\{method="(\w+)",route="([^"]*)"\} (\S+)$', re.MULTILINE
+)
+
+
+class VirtualUser:
+    """压测中的一个用户：令牌、今日已点的菜（dish_id -> selection_id）和各接口的 ETag"""
+
+    def __init__(self, user_id: int, username: str, is_chef: bool):
+        self.id = user_id
+        self.username = username
+        self.is_chef = is_chef
+        self.token = create_access_token(data={"sub": username, "user_id": user_id})
+        self.selections: Dict[int, int] = {}
+        self.etags: Dict[str, str] = {}
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class LoadState:
+    """压测过程中共享的数据：虚拟用户、菜品热度和请求结果"""
+
+    def __init__(self, chefs: List[VirtualUser], customers: List[VirtualUser], dish_ids: List[int], rng: random.Random):
+        self.chefs = chefs
+        self.customers = customers
+        self.dish_ids = dish_ids
+        self.dish_weights = zipf_weights(len(dish_ids))
+        self.rng = rng
+        self.holders: Dict[int, VirtualUser] = {}  # 今日有未取消选菜的顾客
+        self.samples: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[int, int]] = {}
+
+    def pick_dish(self, exclude) -> Optional[int]:
+        for _ in range(5):
+            dish_id = self.rng.choices(self.dish_ids, weights=self.dish_weights)[0]
+            if dish_id not in exclude:
+                return dish_id
+        return None
+
+    def record(self, name: str, status_code: int, elapsed: float) -> None:
+        self.samples.setdefault(name, []).append(elapsed)
+        counts = self.statuses.setdefault(name, {})
+        counts[status_code] = counts.get(status_code, 0) + 1
+
+
+class Operation(NamedTuple):
+    """一种请求：名称、方法和路由模板（用于对照服务端指标）、发起者、流量权重、执行函数"""
+    name: str
+    method: str
+    route: str
+    role: str  # chef / customer / any
+    weight: float
+    run: Callable[[httpx.AsyncClient, LoadState, VirtualUser], Awaitable[Optional[httpx.Response]]]  # None 表示未发出
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Zipf 分布权重：排名第 k 的菜品被点的概率正比于 1/k^s"""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+async def _conditional_get(client: httpx.AsyncClient, user: VirtualUser, url: str, **kwargs) -> httpx.Response:
+    """带 If-None-Match 的 GET，模拟客户端缓存"""
+    headers = user.headers
+    etag = user.etags.get(url)
+    if etag:
+        headers["If-None-Match"] = etag
+    response = await client.get(url, headers=headers, **kwargs)
+    if "etag" in response.headers:
+        user.etags[url] = response.headers["etag"]
+    return response
+
+
+async def op_login(client, state, user):
+    response = await client.post("/api/auth/login", json={"username": user.username, "password": PASSWORD})
+    if response.status_code == 200:
+        user.token = response.json()["token"]
+    return response
+
+
+async def op_browse_dishes(client, state, user):
+    return await _conditional_get(client, user, "/api/dishes", params={"skip": 0, "limit": 50})
+
+
+async def op_dish_detail(client, state, user):
+    dish_id = state.rng.choices(state.dish_ids, weights=state.dish_weights)[0]
+    return await _conditional_get(client, user, f"/api/dishes/{dish_id}")
+
+
+async def op_trending(client, state, user):
+    return await client.get("/api/dishes/trending", headers=user.headers)
+
+
+async def op_my_selections(client, state, user):
+    return await _conditional_get(client, user, "/api/customer-selections/my-selections")
+
+
+async def op_create_selection(client, state, user):
+    dish_id = state.pick_dish(user.selections)
+    if dish_id is None:
+        dish_id = state.rng.choice(state.dish_ids)
+    response = await client.post("/api/customer-selections", json={"dish_id": dish_id}, headers=user.headers)
+    if response.status_code == 201:
+        user.selections[dish_id] = response.json()["id"]
+        state.holders[user.id] = user
+    return response
+
+
+async def op_cancel_selection(client, state, user):
+    if not user.selections:  # 发出前已被同一用户的另一个取消请求取走
+        return None
+    dish_id, selection_id = user.selections.popitem()
+    if not user.selections:
+        state.holders.pop(user.id, None)
+    return await client.delete(f"/api/customer-selections/{selection_id}", headers=user.headers)
+
+
+async def op_chef_poll(client, state, user):
+    return await _conditional_get(client, user, "/api/customer-selections/all")
+
+
+async def op_prep_board(client, state, user):
+    return await client.get("/api/chef-selections/prep-board", headers=user.headers)
+
+
+# 午餐高峰的请求构成
+OPERATIONS = [
+    Operation("login", "POST", "/api/auth/login", "any", 2, op_login),
+    Operation("browse_dishes", "GET", "/api/dishes", "customer", 22, op_browse_dishes),
+    Operation("dish_detail", "GET", "/api/dishes/{dish_id}", "customer", 14, op_dish_detail),
+    Operation("trending", "GET", "/api/dishes/trending", "customer", 5, op_trending),
+    Operation("my_selections", "GET", "/api/customer-selections/my-selections", "customer", 8, op_my_selections),
+    Operation("create_selection", "POST", "/api/customer-selections", "customer", 16, op_create_selection),
+    Operation("cancel_selection", "DELETE", "/api/customer-selections/{selection_id}", "customer", 5, op_cancel_selection),
+    Operation("chef_poll", "GET", "/api/customer-selections/all", "chef", 18, op_chef_poll),
+    Operation("prep_board", "GET", "/api/chef-selections/prep-board", "chef", 10, op_prep_board),
+]
+OPERATIONS_BY_NAME = {op.name: op for op in OPERATIONS}
+
+
+def seed(chefs: int, customers: int, dishes: int, history_days: int, rng: random.Random) -> LoadState:
+    """重建压测数据库并批量写入数据，顾客按 Zipf 分布分给厨师（少数厨师绑定大量顾客）"""
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DATABASE_PATH + suffix):
+            os.remove(DATABASE_PATH + suffix)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")  # 读写并发时读请求不被写事务阻塞
+    Base.metadata.create_all(engine)
+
+    try:
+        hashed_password = get_password_hash(PASSWORD)
+    except Exception as exc:
+        print(f"警告：生成密码哈希失败（{exc}），login 请求将失败")
+        hashed_password = "!"
+
+    chef_ids = list(range(1, chefs + 1))
+    customer_ids = list(range(chefs + 1, chefs + customers + 1))
+    dish_ids = list(range(1, dishes + 1))
+    dish_weights = zipf_weights(dishes)
+    chef_weights = zipf_weights(chefs, exponent=0.8)
+    today = date.today()
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": user_id, "username": f"load_chef{user_id}", "hashed_password": hashed_password}
+            for user_id in chef_ids
+        ] + [
+            {"id": user_id, "username": f"load_customer{user_id}", "hashed_password": hashed_password}
+            for user_id in customer_ids
+        ])
+        conn.execute(Dish.__table__.insert(), [
+            {
+                "id": dish_id, "name": f"菜品{dish_id}", "description": "压测菜品",
+                "recipe": "步骤" * 20, "ingredients": "食材" * 10,
+                "cooking_time": rng.randint(5, 60), "difficulty": rng.choice(["easy", "medium", "hard"]),
+                "category": rng.choice(["川菜", "粤菜", "湘菜", "家常菜"])
+            }
+            for dish_id in dish_ids
+        ])
+        conn.execute(ChefCustomerBinding.__table__.insert(), [
+            {"chef_id": rng.choices(chef_ids, weights=chef_weights)[0], "customer_id": customer_id,
+             "status": BindingStatus.APPROVED}
+            for customer_id in customer_ids
+        ])
+        if history_days:
+            conn.execute(CustomerSelection.__table__.insert(), [
+                {"user_id": customer_id, "dish_id": rng.choices(dish_ids, weights=dish_weights)[0],
+                 "date": today - timedelta(days=day), "status": SelectionStatus.ACTIVE}
+                for day in range(1, history_days + 1)
+                for customer_id in customer_ids
+            ])
+
+    return LoadState(
+        chefs=[VirtualUser(user_id, f"load_chef{user_id}", True) for user_id in chef_ids],
+        customers=[VirtualUser(user_id, f"load_customer{user_id}", False) for user_id in customer_ids],
+        dish_ids=dish_ids,
+        rng=rng
+    )
+
+
+def arrival_rate(t: float, duration: float, base_rate: float, peak_rate: float) -> float:
+    """到达率：平峰 base_rate，中段以高斯曲线升到 peak_rate（12 点前后的高峰）"""
+    return base_rate + (peak_rate - base_rate) * math.exp(-0.5 * ((t - duration / 2) / (duration / 8)) ** 2)
+
+
+def build_schedule(
+    duration: float, base_rate: float, peak_rate: float, group_size: float, operations: List[Operation],
+    rng: random.Random
+) -> List[tuple]:
+    """
+    生成 (发出时间, 请求) 列表
+    到达过程用 thinning 方法生成非齐次泊松过程；每次到达是一组请求，组大小服从均值为 group_size 的几何分布
+    """
+    weights = [op.weight for op in operations]
+    arrival_peak = peak_rate / group_size
+    schedule = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(arrival_peak)
+        if t >= duration:
+            return schedule
+        if rng.random() * peak_rate > arrival_rate(t, duration, base_rate, peak_rate):
+            continue
+        size = 1
+        while rng.random() > 1 / group_size:
+            size += 1
+        for op in rng.choices(operations, weights=weights, k=size):
+            schedule.append((t, op))
+
+
+def pick_user(state: LoadState, op: Operation) -> tuple:
+    """为请求选择发起者；没有可取消的选菜时改为下单"""
+    if op.name == "cancel_selection":
+        if not state.holders:
+            op = OPERATIONS_BY_NAME["create_selection"]
+        else:
+            return op, state.rng.choice(list(state.holders.values()))
+    if op.role == "chef":
+        return op, state.rng.choice(state.chefs)
+    if op.role == "customer":
+        return op, state.rng.choice(state.customers)
+    return op, state.rng.choice(state.chefs + state.customers)
+
+
+async def _issue(client: httpx.AsyncClient, state: LoadState, op: Operation, user: VirtualUser,
+                 scheduled: float, semaphore: asyncio.Semaphore) -> None:
+    async with semaphore:
+        try:
+            response = await op.run(client, state, user)
+            if response is None:
+                return
+            status_code = response.status_code
+        except httpx.HTTPError:
+            status_code = 0
+    state.record(op.name, status_code, time.perf_counter() - scheduled)
+
+
+async def drive(client: httpx.AsyncClient, state: LoadState, schedule: List[tuple], concurrency: int) -> float:
+    """按计划时间发出请求（开环），返回实际耗时（秒）"""
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = []
+    start = time.perf_counter()
+    for offset, op in schedule:
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        op, user = pick_user(state, op)
+        tasks.append(asyncio.create_task(_issue(client, state, op, user, start + offset, semaphore)))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+async def warm_up(client: httpx.AsyncClient, state: LoadState, operations: List[Operation]) -> None:
+    """每种请求先发一次（不计入结果），避免首个请求的初始化开销影响延迟统计"""
+    for op in operations:
+        op, user = pick_user(state, op)
+        await op.run(client, state, user)
+    state.samples.clear()
+    state.statuses.clear()
+
+
+async def fetch_db_queries(client: httpx.AsyncClient) -> Dict[tuple, tuple]:
+    """读取服务端 /metrics 中每个路由的 SQL 条数累计值：(method, route) -> (sum, count)"""
+    response = await client.get("/metrics")
+    totals: Dict[tuple, list] = {}
+    for kind, method, route, value in _DB_METRIC.findall(response.text):
+        totals.setdefault((method, route), [0.0, 0.0])[0 if kind == "sum" else 1] = float(value)
+    return {key: tuple(value) for key, value in totals.items()}
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """最近秩百分位（samples 已排序）"""
+    return samples[min(len(samples) - 1, max(0, math.ceil(len(samples) * q) - 1))]
+
+
+def summarize(state: LoadState, elapsed: float, db_before: Dict, db_after: Dict, operations: List[Operation]) -> Dict:
+    """汇总每个接口的请求数、错误数、吞吐量、延迟百分位和每请求 SQL 条数"""
+    endpoints = {}
+    for op in operations:
+        samples = sorted(state.samples.get(op.name, []))
+        if not samples:
+            continue
+        statuses = state.statuses[op.name]
+        errors = sum(count for code, count in statuses.items() if code == 0 or code >= 500)
+        rejected = sum(count for code, count in statuses.items() if 400 <= code < 500)
+        queries = None
+        if (op.method, op.route) in db_after:
+            total_after, count_after = db_after[(op.method, op.route)]
+            total_before, count_before = db_before.get((op.method, op.route), (0.0, 0.0))
+            if count_after > count_before:
+                queries = round((total_after - total_before) / (count_after - count_before), 2)
+        endpoints[op.name] = {
+            "method": op.method,
+            "route": op.route,
+            "requests": len(samples),
+            "errors": errors,
+            "rejected": rejected,
+            "throughput_rps": round(len(samples) / elapsed, 2),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3),
+            "db_queries_per_request": queries,
+            "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        }
+
+    all_samples = sorted(sample for samples in state.samples.values() for sample in samples)
+    return {
+        "scenario": "lunch-rush",
+        "elapsed_s": round(elapsed, 3),
+        "requests": len(all_samples),
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "throughput_rps": round(len(all_samples) / elapsed, 2),
+        "p50_ms": round(percentile(all_samples, 0.50) * 1000, 3) if all_samples else None,
+        "p95_ms": round(percentile(all_samples, 0.95) * 1000, 3) if all_samples else None,
+        "p99_ms": round(percentile(all_samples, 0.99) * 1000, 3) if all_samples else None,
+        "endpoints": endpoints,
+    }
+
+
+def print_report(result: Dict) -> None:
+    print(f"\n共 {result['requests']} 个请求，耗时 {result['elapsed_s']:.1f}s，"
+          f"吞吐 {result['throughput_rps']:.1f} req/s，错误 {result['errors']}")
+    print(f"整体延迟 p50={result['p50_ms']}ms  p95={result['p95_ms']}ms  p99={result['p99_ms']}ms\n")
+    header = f"{'接口':<18}{'请求数':>8}{'错误':>6}{'4xx':>6}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'SQL/请求':>10}"
+    print(header)
+    print("-" * (len(header) + 4))
+    for name, endpoint in result["endpoints"].items():
+        queries = endpoint["db_queries_per_request"]
+        print(
+            f"{name:<18}{endpoint['requests']:>8}{endpoint['errors']:>6}{endpoint['rejected']:>6}"
+            f"{endpoint['throughput_rps']:>9.1f}{endpoint['p50_ms']:>10.1f}{endpoint['p95_ms']:>10.1f}"
+            f"{endpoint['p99_ms']:>10.1f}{'-' if queries is None else queries:>10}"
+        )
+
+
+async def _run_in_process(state: LoadState, schedule: List[tuple], operations: List[Operation], concurrency: int):
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            await warm_up(client, state, operations)
+            db_before = await fetch_db_queries(client)
+            elapsed = await drive(client, state, schedule, concurrency)
+            db_after = await fetch_db_queries(client)
+    return elapsed, db_before, db_after
+
+
+async def _run_over_http(state: LoadState, schedule: List[tuple], operations: List[Operation], concurrency: int,
+                         base_url: str, collect_db: bool):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await warm_up(client, state, operations)
+        db_before = await fetch_db_queries(client) if collect_db else {}
+        elapsed = await drive(client, state, schedule, concurrency)
+        db_after = await fetch_db_queries(client) if collect_db else {}
+    return elapsed, db_before, db_after
+
+
+def start_uvicorn(port: int, workers: int) -> subprocess.Popen:
+    """启动 uvicorn 子进程（继承本进程的 DATABASE_URL 和 SECRET_KEY），等待健康检查通过"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=dict(os.environ)
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn 启动失败，退出码 {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("等待 uvicorn 启动超时")
+
+
+def run(
+    duration: float = 30, base_rate: float = 30, peak_rate: float = 150, group_size: float = 3,
+    concurrency: int = 64, chefs: int = 20, customers: int = 500, dishes: int = 200, history_days: int = 7,
+    exclude: Optional[List[str]] = None, uvicorn: bool = False, workers: int = 1, port: int = 8765,
+    seed_value: int = 42
+) -> Dict:
+    """执行一次压测并返回汇总结果（供 benchmarks.runner 调用）"""
+    rng = random.Random(seed_value)
+    operations = [op for op in OPERATIONS if op.name not in (exclude or [])]
+    state = seed(chefs, customers, dishes, history_days, rng)
+    schedule = build_schedule(duration, base_rate, peak_rate, group_size, operations, rng)
+
+    if uvicorn:
+        engine.dispose()
+        process = start_uvicorn(port, workers)
+        try:
+            # 多个 worker 时 /metrics 只反映处理该请求的进程，不统计 SQL 条数
+            elapsed, db_before, db_after = asyncio.run(_run_over_http(
+                state, schedule, operations, concurrency, f"http://127.0.0.1:{port}", workers == 1
+            ))
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    else:
+        elapsed, db_before, db_after = asyncio.run(_run_in_process(state, schedule, operations, concurrency))
+
+    result = summarize(state, elapsed, db_before, db_after, operations)
+    result["mode"] = f"uvicorn x{workers}" if uvicorn else "in-process"
+    result["config"] = {
+        "duration": duration, "base_rate": base_rate, "peak_rate": peak_rate, "group_size": group_size,
+        "concurrency": concurrency, "chefs": chefs, "customers": customers, "dishes": dishes,
+        "history_days": history_days, "exclude": sorted(exclude or []), "seed": seed_value,
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="压测时长（秒）")
+    parser.add_argument("--base-rate", type=float, default=30, help="平峰请求速率（req/s）")
+    parser.add_argument("--peak-rate", type=float, default=150, help="高峰请求速率（req/s）")
+    parser.add_argument("--group-size", type=float, default=3, help="每次到达的平均请求数（>=1，越大越突发）")
+    parser.add_argument("--concurrency", type=int, default=64, help="同时在途的最大请求数")
+    parser.add_argument("--chefs", type=int, default=20)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--dishes", type=int, default=200)
+    parser.add_argument("--history-days", type=int, default=7, help="预置的历史选菜天数")
+    parser.add_argument("--exclude", action="append", choices=list(OPERATIONS_BY_NAME), default=[],
+                        help="不发送的请求类型（可重复）")
+    parser.add_argument("--uvicorn", action="store_true", help="启动 uvicorn 子进程，通过 HTTP 压测")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker 数")
+    parser.add_argument("--port", type=int, default=8765, help="uvicorn 监听端口")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子（数据和流量可复现）")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    if args.group_size < 1:
+        parser.error("--group-size 不能小于 1")
+    if args.peak_rate < args.base_rate:
+        parser.error("--peak-rate 不能小于 --base-rate")
+
+    print(f"压测数据库: {DATABASE_PATH}")
+    result = run(
+        duration=args.duration, base_rate=args.base_rate, peak_rate=args.peak_rate, group_size=args.group_size,
+        concurrency=args.concurrency, chefs=args.chefs, customers=args.customers, dishes=args.dishes,
+        history_days=args.history_days, exclude=args.exclude, uvicorn=args.uvicorn, workers=args.workers,
+        port=args.port, seed_value=args.seed
+    )
+    print_report(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+基准测试运行器与回归门禁
+运行服务层微基准和压测场景，把结果写入 benchmarks/results/ 下带版本号的 JSON 文件，
+并与基线（benchmarks/results/baseline.json）比较，任一指标超出容差时输出报告并以退出码 1 结束。
+
+比较的指标：
+- p95_ms: 微基准的单次调用 p95，压测场景中每个接口的 p95
+- queries: 微基准每次调用的 SQL 条数（必须完全一致），压测场景每请求的平均 SQL 条数
+- peak_kb / alloc_kb: 微基准单次调用的 tracemalloc 峰值和净分配量
+- error_rate: 压测场景的 5xx 比例
+微基准分多轮交替运行，p95 取各轮 p95 的中位数，噪声取各轮 p95 的 MAD（换算为标准差）；
+每轮还会运行一段固定的纯 Python 校准负载，比较延迟前按两次的校准耗时之比缩放基线，抵消机器整体快慢的差异。
+延迟的阈值 = 缩放后的基线 × (1 + 相对容差) + max(绝对容差, 3 × 噪声)
+
+运行：
+  python -m benchmarks.runner                         # 运行全部并与基线比较
+  python -m benchmarks.runner --only micro            # 只运行微基准
+  python -m benchmarks.runner --save-baseline         # 把本次结果保存为基线
+  python -m benchmarks.runner --compare benchmarks/results/<文件>.json   # 不运行，只比较已有结果
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from ._common import make_session, count_queries, measure_allocations, sample
+
+from app.models import User, Dish, CustomerSelection, ChefCustomerBinding
+from app.models.chef_customer_binding import BindingStatus
+from app.models.customer_selection import SelectionStatus
+from app.services import analytics_service, dish_service, selection_service, trending_service
+
+SCHEMA_VERSION = 1
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BASELINE_PATH = RESULTS_DIR / "baseline.json"
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+NOISE_SIGMAS = 3
+MAD_TO_SIGMA = 1.4826
+
+# 压测场景：回归门禁不包含 login（bcrypt 耗时由 rounds 决定且方差大，单独用 /metrics 的 password_hash 指标观察）
+LOAD_SCENARIOS = {
+    "lunch-rush": [
+        "--base-rate", "20", "--peak-rate", "100", "--customers", "300", "--dishes", "200",
+        "--concurrency", "32", "--exclude", "login",
+    ],
+}
+
+
+class Tolerance(NamedTuple):
+    """允许的退化幅度：相对值和绝对值（取两者之和作为余量）"""
+    relative: float
+    absolute: float
+
+
+# (类型, 指标) -> 默认容差；--latency-tolerance 等参数会覆盖相对容差
+TOLERANCES = {
+    ("micro", "p95_ms"): Tolerance(0.20, 0.05),
+    ("micro", "queries"): Tolerance(0.0, 0.0),
+    ("micro", "peak_kb"): Tolerance(0.10, 4),
+    ("micro", "alloc_kb"): Tolerance(0.10, 4),
+    ("load", "p95_ms"): Tolerance(0.30, 5.0),
+    ("load", "queries"): Tolerance(0.05, 0.1),
+    ("load", "error_rate"): Tolerance(0.0, 0.001),
+}
+
+
+class MicroCase(NamedTuple):
+    """一个服务层微基准：名称和被测函数（每次调用前后的状态需保持不变）"""
+    name: str
+    func: Callable[[], object]
+
+
+def seed(db, customers: int, dishes: int, history_days: int):
+    """一个厨师绑定 customers 个顾客，每个顾客今日点一道菜，另有 history_days 天的历史选菜"""
+    today = date.today()
+    db.execute(User.__table__.insert(), [
+        {"id": i, "username": f"user{i}", "hashed_password": "x"}
+        for i in range(1, customers + 2)
+    ])
+    db.execute(Dish.__table__.insert(), [
+        {
+            "id": i, "name": f"dish{i}", "description": "家常菜", "recipe": "r", "ingredients": "i",
+            "cooking_time": 30, "difficulty": "easy", "category": "川菜"
+        }
+        for i in range(1, dishes + 1)
+    ])
+    db.execute(ChefCustomerBinding.__table__.insert(), [
+        {"chef_id": 1, "customer_id": i, "status": BindingStatus.APPROVED}
+        for i in range(2, customers + 2)
+    ])
+    db.execute(CustomerSelection.__table__.insert(), [
+        {"user_id": i, "dish_id": (i + day) % dishes + 1, "date": today - timedelta(days=day),
+         "status": SelectionStatus.ACTIVE}
+        for day in range(history_days + 1)
+        for i in range(2, customers + 2)
+    ])
+    db.commit()
+    analytics_service.rebuild_daily_stats(db, today - timedelta(days=history_days), today)
+    db.commit()
+    return db.get(User, 1), db.get(User, 2)
+
+
+def micro_cases(db, chef: User, customer: User) -> List[MicroCase]:
+    """服务层微基准（读路径为主，外加一次点菜+取消的写路径）"""
+    free_dish_id = db.query(Dish.id).filter(
+        ~Dish.id.in_(db.query(CustomerSelection.dish_id).filter(
+            CustomerSelection.user_id == customer.id, CustomerSelection.date == date.today()
+        ))
+    ).order_by(Dish.id).first()[0]
+
+    def dish_detail():
+        db.expunge_all()
+        return dish_service.get_dish_by_id(db, 1)
+
+    def prep_board():
+        selection_service.invalidate_prep_board(chef.id)
+        return selection_service.get_prep_board_for_chef(db, chef)
+
+    def create_and_cancel():
+        selection = selection_service.create_customer_selection(db, customer, free_dish_id)
+        selection_service.delete_customer_selection(db, customer, selection.id)
+
+    return [
+        MicroCase("dishes.list", lambda: dish_service.get_all_dishes(db, 0, 100)),
+        MicroCase("dishes.detail", dish_detail),
+        MicroCase("dishes.trending", lambda: trending_service.get_trending_dishes(db, 10)),
+        MicroCase("selections.chef_bound_today", lambda: selection_service.get_all_customer_selections_for_chef(db, chef)),
+        MicroCase("selections.prep_board", prep_board),
+        MicroCase("selections.my_today", lambda: selection_service.get_my_customer_selections(db, customer)),
+        MicroCase("selections.history_page", lambda: selection_service.get_customer_selection_history(db, customer, limit=50)),
+        MicroCase("selections.create_cancel", create_and_cancel),
+        MicroCase("analytics.top_dishes", lambda: analytics_service.get_top_dishes(db)),
+    ]
+
+
+def _mad(samples: List[float]) -> float:
+    median = statistics.median(samples)
+    return statistics.median(abs(value - median) for value in samples)
+
+
+def _p95(samples: List[float]) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def calibration_workload() -> None:
+    """固定的纯 Python 负载（字典、字符串、JSON），耗时只随机器和解释器变化"""
+    rows = [{"id": i, "name": f"dish{i}", "tags": ["a", "b", str(i)]} for i in range(2000)]
+    json.loads(json.dumps(rows))
+    sorted(rows, key=lambda row: row["name"])
+
+
+def run_micro(rounds: int, repeat: int, customers: int, only: Optional[List[str]] = None) -> tuple:
+    """运行微基准，返回 ({micro/名称: 指标}, 校准耗时毫秒)"""
+    db = make_session()
+    chef, customer = seed(db, customers, dishes=200, history_days=30)
+    trending_service.rebuild(db)
+    counter = count_queries(db)
+    cases = [case for case in micro_cases(db, chef, customer) if not only or case.name in only]
+
+    # 各基准交替运行多轮，机器负载的短时波动会分散到所有基准上，而不是集中影响某一个
+    samples: Dict[str, List[float]] = {case.name: [] for case in cases}
+    round_p95: Dict[str, List[float]] = {case.name: [] for case in cases}
+    calibration: List[float] = []
+    for round_index in range(rounds):
+        calibration.extend(sample(calibration_workload, repeat=5, warmup=1 if round_index == 0 else 0))
+        for case in cases:
+            round_samples = sample(case.func, repeat=repeat, warmup=3 if round_index == 0 else 0)
+            samples[case.name].extend(round_samples)
+            round_p95[case.name].append(_p95(round_samples))
+
+    results = {}
+    for case in cases:
+        before = counter["queries"]
+        case.func()
+        queries = counter["queries"] - before
+        allocations = measure_allocations(case.func)
+        results[f"micro/{case.name}"] = result = {
+            "kind": "micro",
+            "samples": len(samples[case.name]),
+            "p50_ms": round(statistics.median(samples[case.name]), 4),
+            "p95_ms": round(statistics.median(round_p95[case.name]), 4),
+            "noise_ms": round(_mad(round_p95[case.name]), 4),
+            "queries": queries,
+            "peak_kb": allocations["peak_kb"],
+            "alloc_kb": allocations["alloc_kb"],
+        }
+        print(f"  {case.name:<32} p95={result['p95_ms']:.3f}ms  queries={queries}  peak={allocations['peak_kb']}KB")
+    return results, round(statistics.median(calibration), 4)
+
+
+def run_load(scenario: str, duration: float) -> Dict[str, Dict]:
+    """在子进程中运行压测场景（压测使用独立的 SQLite 文件，不能与微基准共用进程内的引擎配置）"""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "load.json")
+        command = [
+            sys.executable, "-m", "benchmarks.load_test", "--duration", str(duration), "--json", output,
+            *LOAD_SCENARIOS[scenario]
+        ]
+        completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            sys.stderr.write(completed.stdout + completed.stderr)
+            raise RuntimeError(f"压测场景 {scenario} 运行失败，退出码 {completed.returncode}")
+        with open(output, encoding="utf-8") as f:
+            load_result = json.load(f)
+
+    results = {}
+    for name, endpoint in load_result["endpoints"].items():
+        results[f"load/{scenario}/{name}"] = {
+            "kind": "load",
+            "requests": endpoint["requests"],
+            "p50_ms": endpoint["p50_ms"],
+            "p95_ms": endpoint["p95_ms"],
+            "p99_ms": endpoint["p99_ms"],
+            "queries": endpoint["db_queries_per_request"],
+            "error_rate": round(endpoint["errors"] / endpoint["requests"], 4),
+        }
+        print(f"  {scenario}/{name:<24} p95={endpoint['p95_ms']:.1f}ms  queries={endpoint['db_queries_per_request']}  "
+              f"errors={endpoint['errors']}")
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict:
+    """影响耗时的运行环境；与基线不同时延迟比较仅供参考"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(terse=True),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+class Finding(NamedTuple):
+    name: str
+    metric: str
+    expected: float  # 基线值（延迟为按校准耗时缩放后的值）
+    current: float
+    limit: float
+
+    def describe(self) -> str:
+        change = (self.current - self.expected) / self.expected * 100 if self.expected else float("inf")
+        return (f"  {self.name:<44} {self.metric:<10} {_format(self.expected):>10} -> {_format(self.current):<10}"
+                f" ({change:+.1f}%，阈值 {_format(self.limit)})")
+
+
+def _format(value: float) -> str:
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+def speed_scale(baseline: Dict, current: Dict) -> float:
+    """本次与基线的校准耗时之比（>1 表示本次机器更慢），缺少校准数据时为 1"""
+    if baseline.get("calibration_ms") and current.get("calibration_ms"):
+        return current["calibration_ms"] / baseline["calibration_ms"]
+    return 1.0
+
+
+def compare(baseline: Dict, current: Dict, tolerances: Dict) -> tuple:
+    """逐项比较，返回 (退化, 改善, 仅在一侧出现的基准名称)"""
+    regressions, improvements = [], []
+    base_benchmarks, current_benchmarks = baseline["benchmarks"], current["benchmarks"]
+    scale = speed_scale(baseline, current)
+
+    for name, result in current_benchmarks.items():
+        base = base_benchmarks.get(name)
+        if base is None:
+            continue
+        for (kind, metric), tolerance in tolerances.items():
+            if kind != result["kind"] or result.get(metric) is None or base.get(metric) is None:
+                continue
+            expected = base[metric]
+            margin = tolerance.absolute
+            if metric == "p95_ms":
+                expected *= scale
+                if "noise_ms" in result and "noise_ms" in base:
+                    noise = MAD_TO_SIGMA * max(result["noise_ms"], base["noise_ms"] * scale)
+                    margin = max(margin, NOISE_SIGMAS * noise)
+            limit = expected * (1 + tolerance.relative) + margin
+            finding = Finding(name, metric, round(expected, 4), result[metric], round(limit, 4))
+            if result[metric] > limit:
+                regressions.append(finding)
+            elif result[metric] < expected * (1 - tolerance.relative) - margin:
+                improvements.append(finding)
+
+    unmatched = sorted(set(base_benchmarks) ^ set(current_benchmarks))
+    return regressions, improvements, unmatched
+
+
+def print_report(baseline: Dict, current: Dict, regressions, improvements, unmatched) -> None:
+    print(f"\n与基线比较（基线 {baseline.get('git_commit') or '?'} @ {baseline['created_at']}，"
+          f"本次 {current.get('git_commit') or '?'}）")
+    if baseline["environment"] != current["environment"]:
+        print("注意：运行环境与基线不同，延迟比较仅供参考")
+        for key in sorted(current["environment"]):
+            if baseline["environment"].get(key) != current["environment"][key]:
+                print(f"  {key}: {baseline['environment'].get(key)} -> {current['environment'][key]}")
+    scale = speed_scale(baseline, current)
+    if scale != 1.0:
+        print(f"校准耗时 {baseline['calibration_ms']:.3f}ms -> {current['calibration_ms']:.3f}ms，"
+              f"基线延迟按 x{scale:.2f} 缩放后比较")
+    if unmatched:
+        print(f"只在一侧出现、未比较的基准：{', '.join(unmatched)}")
+    if improvements:
+        print(f"\n改善（{len(improvements)}）：")
+        for finding in improvements:
+            print(finding.describe())
+    if regressions:
+        print(f"\n退化（{len(regressions)}）：")
+        for finding in regressions:
+            print(finding.describe())
+        print("\n如果退化是预期内的（例如新增了必要的查询），用 --save-baseline 更新基线")
+    else:
+        print("\n没有超出容差的退化")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", choices=["micro", "load"], help="只运行一类基准")
+    parser.add_argument("--case", action="append", help="只运行指定的微基准（可重复）")
+    parser.add_argument("--rounds", type=int, default=5, help="微基准交替运行的轮数")
+    parser.add_argument("--repeat", type=int, default=20, help="每个微基准每轮的采样次数")
+    parser.add_argument("--customers", type=int, default=1000, help="微基准中厨师绑定的顾客数")
+    parser.add_argument("--load-duration", type=float, default=20, help="每个压测场景的时长（秒）")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="基线文件")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线（不做比较）")
+    parser.add_argument("--compare", help="不运行基准，比较已有的结果文件与基线")
+    parser.add_argument("--latency-tolerance", type=float, help="微基准 p95 的相对容差（默认 0.20）")
+    parser.add_argument("--load-latency-tolerance", type=float, help="压测 p95 的相对容差（默认 0.30）")
+    parser.add_argument("--alloc-tolerance", type=float, help="内存分配的相对容差（默认 0.10）")
+    args = parser.parse_args()
+
+    tolerances = dict(TOLERANCES)
+    for keys, value in [
+        ([("micro", "p95_ms")], args.latency_tolerance),
+        ([("load", "p95_ms")], args.load_latency_tolerance),
+        ([("micro", "peak_kb"), ("micro", "alloc_kb")], args.alloc_tolerance),
+    ]:
+        if value is not None:
+            for key in keys:
+                tolerances[key] = tolerances[key]._replace(relative=value)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        benchmarks = {}
+        calibration_ms = None
+        if args.only != "load":
+            print("服务层微基准：")
+            micro_results, calibration_ms = run_micro(args.rounds, args.repeat, args.customers, args.case)
+            benchmarks.update(micro_results)
+        if args.only != "micro":
+            for scenario in LOAD_SCENARIOS:
+                print(f"压测场景 {scenario}（{args.load_duration:g}s）：")
+                benchmarks.update(run_load(scenario, args.load_duration))
+
+        current = {
+            "schema_version": SCHEMA_VERSION,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "environment": environment(),
+            "calibration_ms": calibration_ms,
+            "config": {
+                "rounds": args.rounds, "repeat": args.repeat, "customers": args.customers,
+                "load_duration": args.load_duration
+            },
+            "benchmarks": benchmarks,
+        }
+        RESULTS_DIR.mkdir(exist_ok=True)
+        result_path = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{current['git_commit'] or 'nogit'}.json"
+        result_path.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n结果已写入 {result_path}")
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"已保存为基线 {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"基线 {args.baseline} 不存在，用 --save-baseline 保存一份")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("schema_version") != current.get("schema_version"):
+        print(f"基线格式版本 {baseline.get('schema_version')} 与本次 {current.get('schema_version')} 不同，"
+              f"请用 --save-baseline 重新生成")
+        sys.exit(1)
+
+    regressions, improvements, unmatched = compare(baseline, current, tolerances)
+    print_report(baseline, current, regressions, improvements, unmatched)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+归档过期数据
+把早于保留期的选菜、推荐以及已取消/已解绑的记录迁移到归档表
+建议通过 cron 每天低峰期执行：python scripts/archive_old_rows.py
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.services import archive_service  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="归档过期的选菜、推荐和绑定记录")
+    parser.add_argument("--horizon-days", type=int, default=settings.ARCHIVE_HORIZON_DAYS, help="热表保留的天数")
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE, help="每批迁移的记录数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        moved = archive_service.archive_old_rows(db, args.horizon_days, args.batch_size)
+    finally:
+        db.close()
+
+    for table, count in moved.items():
+        print(f"{table}: 归档 {count} 条")
+
+
+if __name__ == "__main__":
+    main()
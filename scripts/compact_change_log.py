@@ -0,0 +1,32 @@
+"""
+压缩变更日志：删除早于保留期的记录
+建议通过 cron 定期执行：python scripts/compact_change_log.py
+游标早于保留期的客户端下次同步时会收到 reset，需要全量拉取
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.database import SessionLocal  # noqa: E402
+from app.services import change_log_service  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="压缩变更日志")
+    parser.add_argument("--retention-days", type=int, default=None, help="保留天数，默认使用 CHANGE_LOG_RETENTION_DAYS")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批删除的记录数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        deleted = change_log_service.compact_change_log(db, args.retention_days, args.batch_size)
+    finally:
+        db.close()
+
+    print(f"已删除 {deleted} 条变更日志")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+索引分析：根据模型元数据和收集到的查询，报告冗余、未使用的索引，并建议缺失的索引
+
+    python scripts/index_advisor.py
+    python scripts/index_advisor.py --queries slow_queries.json
+    python scripts/index_advisor.py --queries queries.sql --emit-migration
+
+- 冗余：与另一个索引/唯一约束列完全相同，或是另一个索引的最左前缀（唯一索引除外，它承担约束）
+- 重叠：与另一个索引只共享首列，不能互相替代，仅作提示
+- 未使用：提供 --queries 时，没有出现在任何执行计划中的普通索引
+- 缺失：执行计划中的全表扫描，按 WHERE/JOIN 中该表的等值列、范围列给出建议索引
+
+--queries 可以是 GET /api/admin/slow-queries 返回的 JSON（或 SQL 字符串数组），
+也可以是纯文本 SQL（语句之间用分号或空行分隔）。默认在按模型建表的内存 SQLite 上执行 EXPLAIN，
+也可以用 --database-url 指向已有数据的库（统计信息更准确）
+
+「未使用」只相对于查询样本成立。只有 scripts/check_query_plans.py --dump-queries 导出的样本声明了覆盖的服务，
+引用某张表的服务模块全部被覆盖时，该表上未用到的索引才可以用 --drop-unused 删除；其他样本中的未使用索引仅供参考。
+生成迁移时不会删除外键依赖的索引（MySQL 要求外键列有以其开头的索引），也不会同时删除冗余索引和覆盖它的索引
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+# 只读取模型元数据，不需要 .env 中的配置
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "index-advisor")
+
+from sqlalchemy import MetaData, UniqueConstraint, create_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app import models  # noqa: E402,F401  注册所有模型
+from app.utils.query_plan import explain, table_aliases  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# 判断服务覆盖时扫描的模块（直接查询模型的代码）
+SERVICE_DIRS = ("app/services", "app/utils")
+
+
+class IndexInfo(NamedTuple):
+    """表上的一个索引（含主键和唯一约束隐含的索引）"""
+    table: str
+    name: Optional[str]
+    columns: Tuple[str, ...]
+    unique: bool
+    kind: str  # primary / unique / index
+
+    @property
+    def label(self) -> str:
+        if self.kind == "primary":
+            return f"{self.table} 主键({', '.join(self.columns)})"
+        if self.kind == "unique" and self.name is None:
+            return f"{self.table} 唯一约束({', '.join(self.columns)})"
+        return f"{self.table}.{self.name}({', '.join(self.columns)})"
+
+
+class Finding(NamedTuple):
+    index: IndexInfo
+    other: IndexInfo
+    reason: str
+
+
+class QuerySample(NamedTuple):
+    """查询样本：(语句, 参数) 列表，以及样本声明覆盖的服务模块（未声明时为 None）"""
+    statements: List[Tuple[str, Any]]
+    services: Optional[Set[str]]
+
+
+class Suggestion(NamedTuple):
+    table: str
+    columns: Tuple[str, ...]
+    statement: str
+
+    @property
+    def name(self) -> str:
+        return f"idx_{self.table}_{'_'.join(self.columns)}"[:64]
+
+
+def collect_indexes(metadata: MetaData) -> Dict[str, List[IndexInfo]]:
+    """按表收集主键、唯一约束和普通索引"""
+    result: Dict[str, List[IndexInfo]] = {}
+    for table in metadata.sorted_tables:
+        items = []
+        if table.primary_key.columns:
+            items.append(IndexInfo(table.name, None, tuple(c.name for c in table.primary_key.columns), True, "primary"))
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint):
+                items.append(IndexInfo(table.name, constraint.name, tuple(c.name for c in constraint.columns), True, "unique"))
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            items.append(IndexInfo(
+                table.name, index.name, tuple(c.name for c in index.columns), bool(index.unique),
+                "unique" if index.unique else "index"
+            ))
+        result[table.name] = items
+    return result
+
+
+def find_redundant(indexes: Dict[str, List[IndexInfo]]) -> List[Finding]:
+    """列完全相同或为另一个索引最左前缀的普通索引"""
+    findings = []
+    for items in indexes.values():
+        for index in items:
+            if index.kind != "index":
+                continue
+            for other in items:
+                if other is index:
+                    continue
+                if other.columns == index.columns:
+                    # 两个普通索引完全相同时只报告名字靠后的那个
+                    if other.kind != "index" or (other.name or "") < (index.name or ""):
+                        findings.append(Finding(index, other, "列完全相同"))
+                        break
+                elif other.columns[:len(index.columns)] == index.columns:
+                    findings.append(Finding(index, other, "是其最左前缀"))
+                    break
+    return findings
+
+
+def find_overlaps(indexes: Dict[str, List[IndexInfo]], redundant: Set[IndexInfo]) -> List[Finding]:
+    """只共享首列、不能互相替代的索引对"""
+    findings = []
+    for items in indexes.values():
+        candidates = [i for i in items if i.kind != "primary" and i not in redundant]
+        for position, index in enumerate(candidates):
+            for other in candidates[position + 1:]:
+                if index.columns[0] != other.columns[0]:
+                    continue
+                shorter, longer = sorted((index, other), key=lambda i: len(i.columns))
+                if longer.columns[:len(shorter.columns)] != shorter.columns:
+                    findings.append(Finding(index, other, f"只共享首列 {index.columns[0]}"))
+    return findings
+
+
+def load_queries(path: Path) -> QuerySample:
+    """
+    读取查询文件：慢查询 JSON、SQL 字符串数组、check_query_plans.py --dump-queries 导出的样本
+    或以分号/空行分隔的纯文本
+    """
+    text = path.read_text(encoding="utf-8")
+    services = None
+    if path.suffix == ".json":
+        data = json.loads(text)
+        if isinstance(data, dict):
+            if "services" in data:
+                services = set(data["services"])
+            data = data.get("items", [])
+        statements = [
+            (item["statement"], item.get("parameters")) if isinstance(item, dict) else (item, None)
+            for item in data
+        ]
+    else:
+        statements = [(statement, None) for statement in re.split(r";\s*\n|\n\s*\n", text)]
+    return QuerySample([(s.strip().rstrip(";"), p) for s, p in statements if s.strip()], services)
+
+
+_PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|%\(\w+\)s|%s|(?<!:):\w+|\?")
+
+
+def bind_parameters(statement: str, paramstyle: str, parameters: Any = None) -> Tuple[str, tuple]:
+    """
+    把语句中的占位符（? / %s / %(name)s / :name）统一为目标驱动的风格
+    样本中带有参数（列表按位置、字典按名字）时使用实际参数，否则全部绑定为 NULL
+    """
+    values: List[Any] = []
+
+    def replace(match):
+        token = match.group(0)
+        if token.startswith("'"):
+            return token
+        if isinstance(parameters, dict):
+            name = token[2:-2] if token.startswith("%(") else token[1:] if token.startswith(":") else None
+            values.append(parameters.get(name))
+        elif isinstance(parameters, list) and len(values) < len(parameters):
+            values.append(parameters[len(values)])
+        else:
+            values.append(None)
+        return "?" if paramstyle == "qmark" else "%s"
+
+    if paramstyle != "qmark":
+        # format 风格下字面量 % 需要转义
+        statement = re.sub(r"%(?!s|\()", "%%", statement)
+    return _PLACEHOLDER.sub(replace, statement), tuple(values)
+
+
+def analyze_queries(engine, statements: List[Tuple[str, Any]], indexes: Dict[str, List[IndexInfo]]):
+    """EXPLAIN 每条查询，返回 (用到的索引名集合, 缺失索引建议, 无法分析的语句)"""
+    used: Set[Tuple[str, str]] = set()
+    suggestions: Dict[Tuple[str, Tuple[str, ...]], Suggestion] = {}
+    failures: List[Tuple[str, str]] = []
+
+    with engine.connect() as conn:
+        for statement, sample_parameters in statements:
+            sql, parameters = bind_parameters(statement, engine.dialect.paramstyle, sample_parameters)
+            try:
+                steps = explain(conn, sql, parameters)
+            except Exception as exc:
+                failures.append((statement, str(exc).splitlines()[0]))
+                conn.rollback()
+                continue
+
+            for step in steps:
+                if step.table not in indexes:
+                    continue
+                if step.index is not None:
+                    used.add((step.table, step.index))
+                elif step.scan:
+                    columns = predicate_columns(statement, step.table)
+                    if columns and not _covered(columns, indexes[step.table]):
+                        suggestions.setdefault((step.table, columns), Suggestion(step.table, columns, statement))
+    return used, list(suggestions.values()), failures
+
+
+def predicate_columns(statement: str, table: str) -> Tuple[str, ...]:
+    """语句中某张表参与过滤/连接的列：等值列在前（按出现顺序），最后加一个范围列"""
+    names = [table] + [alias for alias, name in table_aliases(statement).items() if name == table]
+    pattern = re.compile(
+        r"\b(?:" + "|".join(map(re.escape, names)) + r")\.`?(\w+)`?\s*(=|IN\b|IS\b|>=|<=|>|<|BETWEEN\b)",
+        re.IGNORECASE
+    )
+    equality: List[str] = []
+    ranges: List[str] = []
+    for column, operator in pattern.findall(statement):
+        target = equality if operator.upper() in ("=", "IN", "IS") else ranges
+        if column not in equality and column not in ranges:
+            target.append(column)
+    return tuple(equality + ranges[:1])
+
+
+def _covered(columns: Tuple[str, ...], items: List[IndexInfo]) -> bool:
+    """已有索引以这些列为最左前缀（此时全表扫描另有原因，不重复建议）"""
+    return any(index.columns[:len(columns)] == columns for index in items)
+
+
+def foreign_key_columns(metadata: MetaData) -> Dict[str, List[Tuple[str, ...]]]:
+    """按表收集外键列"""
+    return {
+        table.name: [tuple(element.parent.name for element in fk.elements) for fk in table.foreign_key_constraints]
+        for table in metadata.sorted_tables
+    }
+
+
+def uncovered_services(metadata: MetaData, services: Optional[Set[str]]) -> Dict[str, List[str]]:
+    """每张表被哪些没有在样本中覆盖的服务模块查询（样本未声明覆盖的服务时视为全部未覆盖）"""
+    sources = {
+        path.stem: path.read_text(encoding="utf-8")
+        for directory in SERVICE_DIRS
+        for path in sorted((PROJECT_ROOT / directory).glob("*.py"))
+        if path.stem != "__init__"
+    }
+    result: Dict[str, List[str]] = {}
+    for mapper in Base.registry.mappers:
+        pattern = re.compile(rf"\b{mapper.class_.__name__}\b")
+        result[mapper.local_table.name] = [
+            module for module, source in sources.items()
+            if pattern.search(source) and (services is None or module not in services)
+        ]
+    return result
+
+
+def plan_drops(
+    indexes: Dict[str, List[IndexInfo]],
+    redundant: List[Finding],
+    unused: List[IndexInfo],
+    foreign_keys: Dict[str, List[Tuple[str, ...]]]
+) -> Tuple[List[IndexInfo], List[Tuple[IndexInfo, str]]]:
+    """
+    决定迁移中删除的索引，返回 (删除的索引, 保留的索引及原因)
+    - 删除后每个外键仍要有以外键列开头的索引，否则 MySQL 拒绝删除（错误 1553）
+    - 冗余索引只在覆盖它的索引保留时删除
+    """
+    drops: List[IndexInfo] = []
+    kept: List[Tuple[IndexInfo, str]] = []
+
+    def remaining(index: IndexInfo) -> List[IndexInfo]:
+        return [other for other in indexes[index.table] if other is not index and other not in drops]
+
+    def needed_by_foreign_key(index: IndexInfo) -> Optional[Tuple[str, ...]]:
+        for columns in foreign_keys.get(index.table, []):
+            if index.columns[:len(columns)] == columns and not any(
+                other.columns[:len(columns)] == columns for other in remaining(index)
+            ):
+                return columns
+        return None
+
+    for index in unused:
+        columns = needed_by_foreign_key(index)
+        if columns:
+            kept.append((index, f"外键({', '.join(columns)})需要以其开头的索引"))
+        else:
+            drops.append(index)
+
+    for finding in redundant:
+        index = finding.index
+        if not any(other.columns[:len(index.columns)] == index.columns for other in remaining(index)):
+            kept.append((index, "覆盖它的索引也将被删除"))
+        else:
+            drops.append(index)
+    return drops, kept
+
+
+def render_migration(drops: List[IndexInfo], creates: List[Suggestion], head: str) -> Tuple[str, str]:
+    """生成 Alembic 迁移，返回 (revision, 文件内容)"""
+    revision = uuid.uuid4().hex[:12]
+    upgrade, downgrade = [], []
+    for index in drops:
+        upgrade.append(f"    op.drop_index({index.name!r}, table_name={index.table!r})")
+        downgrade.insert(0, f"    op.create_index({index.name!r}, {index.table!r}, {list(index.columns)!r})")
+    for suggestion in creates:
+        upgrade.append(f"    op.create_index({suggestion.name!r}, {suggestion.table!r}, {list(suggestion.columns)!r})")
+        downgrade.insert(0, f"    op.drop_index({suggestion.name!r}, table_name={suggestion.table!r})")
+
+    content = f'''"""index_advisor
+
+Revision ID: {revision}
+Revises: {head}
+Create Date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")}
+
+由 scripts/index_advisor.py 生成：删除冗余索引、添加建议索引
+应用前请同步修改模型中的 Index 声明，否则下次 autogenerate 会重新生成这些索引
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = {revision!r}
+down_revision: Union[str, None] = {head!r}
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+{chr(10).join(upgrade) or "    pass"}
+
+
+def downgrade() -> None:
+{chr(10).join(downgrade) or "    pass"}
+'''
+    return revision, content
+
+
+def current_head() -> str:
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def make_engine(url: Optional[str]):
+    if url:
+        return create_engine(url)
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="索引分析：冗余/未使用/缺失索引")
+    parser.add_argument("--queries", type=Path, default=None, help="查询文件（慢查询 JSON 或纯文本 SQL）")
+    parser.add_argument("--database-url", default=None, help="执行 EXPLAIN 的数据库，默认按模型建表的内存 SQLite")
+    parser.add_argument("--emit-migration", action="store_true", help="生成删除冗余索引、添加建议索引的 Alembic 迁移")
+    parser.add_argument(
+        "--drop-unused", action="store_true",
+        help="生成迁移时同时删除未使用的索引（需要 --queries，且样本覆盖了查询该表的全部服务）"
+    )
+    args = parser.parse_args()
+
+    indexes = collect_indexes(Base.metadata)
+    redundant = find_redundant(indexes)
+    redundant_set = {finding.index for finding in redundant}
+
+    print("== 冗余索引 ==")
+    for finding in redundant:
+        print(f"  {finding.index.label} 与 {finding.other.label} {finding.reason}，可以删除")
+    if not redundant:
+        print("  无")
+
+    print("\n== 重叠索引（仅提示，不能互相替代）==")
+    overlaps = find_overlaps(indexes, redundant_set)
+    for finding in overlaps:
+        print(f"  {finding.index.label} 与 {finding.other.label} {finding.reason}")
+    if not overlaps:
+        print("  无")
+
+    if args.drop_unused and not args.queries:
+        parser.error("--drop-unused 需要 --queries")
+
+    unused: List[IndexInfo] = []
+    suggestions: List[Suggestion] = []
+    if args.queries:
+        sample = load_queries(args.queries)
+        used, suggestions, failures = analyze_queries(make_engine(args.database_url), sample.statements, indexes)
+        uncovered = uncovered_services(Base.metadata, sample.services)
+        candidates = [
+            index for items in indexes.values() for index in items
+            if index.kind == "index" and index not in redundant_set and (index.table, index.name) not in used
+        ]
+        # 引用该表的服务都在样本中覆盖时，没有用到的索引才算未使用
+        unused = [index for index in candidates if not uncovered.get(index.table)]
+
+        print(f"\n== 未使用的索引（{len(sample.statements)} 条查询中没有用到）==")
+        for index in candidates:
+            if index in unused:
+                print(f"  {index.label}")
+            else:
+                print(f"  {index.label}  （仅供参考：样本未覆盖 {', '.join(uncovered[index.table])}）")
+        if not candidates:
+            print("  无")
+
+        print("\n== 建议添加的索引 ==")
+        for suggestion in suggestions:
+            print(f"  {suggestion.table}({', '.join(suggestion.columns)})  <- {' '.join(suggestion.statement.split())[:120]}")
+        if not suggestions:
+            print("  无")
+
+        if failures:
+            print(f"\n== 无法分析的语句（{len(failures)} 条）==")
+            for statement, error in failures:
+                print(f"  {' '.join(statement.split())[:80]}: {error}")
+
+    if args.emit_migration:
+        drops, kept = plan_drops(
+            indexes, redundant, unused if args.drop_unused else [], foreign_key_columns(Base.metadata)
+        )
+        if kept:
+            print("\n== 迁移中保留的索引 ==")
+            for index, reason in kept:
+                print(f"  {index.label}：{reason}")
+        if not drops and not suggestions:
+            print("\n没有需要修改的索引，未生成迁移")
+            return
+        revision, content = render_migration(drops, suggestions, current_head())
+        path = PROJECT_ROOT / "alembic" / "versions" / f"{revision}_index_advisor.py"
+        path.write_text(content, encoding="utf-8")
+        print(f"\n已生成迁移 {path.relative_to(PROJECT_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
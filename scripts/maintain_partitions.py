@@ -0,0 +1,45 @@
+"""
+选菜表分区维护（仅 MySQL）
+预先创建未来月份的分区，并归档、删除超过保留期的分区
+建议通过 cron 每天执行：python scripts/maintain_partitions.py
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.services import partition_service  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="维护选菜表的按月分区")
+    parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD, help="预先创建未来几个月的分区")
+    parser.add_argument("--retention-months", type=int, default=settings.PARTITION_RETENTION_MONTHS, help="保留最近几个月的分区")
+    parser.add_argument("--no-archive", action="store_true", help="直接删除过期分区，不先迁移到归档表")
+    parser.add_argument("--skip-drop", action="store_true", help="只创建未来分区，不删除过期分区")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not partition_service.is_partitioning_supported(db):
+            print("当前数据库不支持分区，跳过")
+            return
+
+        for name in partition_service.ensure_future_partitions(db, args.months_ahead):
+            print(f"创建分区 {name}")
+
+        if not args.skip_drop:
+            dropped = partition_service.drop_expired_partitions(
+                db, args.retention_months, archive=not args.no_archive
+            )
+            for name in dropped:
+                print(f"删除分区 {name}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+清理过期的幂等键记录
+建议通过 cron 定期执行：python scripts/purge_idempotency_keys.py
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.database import SessionLocal  # noqa: E402
+from app.services import idempotency_service  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="清理过期的幂等键记录")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批删除的记录数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        deleted = idempotency_service.purge_expired_keys(db, args.batch_size)
+    finally:
+        db.close()
+
+    print(f"已删除 {deleted} 条过期幂等键记录")
+
+
+if __name__ == "__main__":
+    main()
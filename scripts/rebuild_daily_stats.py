@@ -0,0 +1,39 @@
+"""
+重算每日统计汇总表
+从选菜明细（热表和归档表）重算指定日期范围内的 dish_daily_stats 和 chef_daily_stats
+默认重算截至昨天的 7 天：python scripts/rebuild_daily_stats.py
+今天仍有选菜写入，重算会覆盖期间提交的增量更新，不建议把今天包含在范围内
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.database import SessionLocal  # noqa: E402
+from app.services import analytics_service  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从选菜明细重算每日统计汇总表")
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, default=None, help="起始日期（YYYY-MM-DD）")
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, default=None, help="结束日期（YYYY-MM-DD），默认昨天")
+    args = parser.parse_args()
+
+    end_date = args.end_date or date.today() - timedelta(days=1)
+    if end_date >= date.today():
+        print("警告：范围包含今天，重算期间写入的选菜统计可能丢失")
+    start_date = args.start_date or end_date - timedelta(days=6)
+
+    db = SessionLocal()
+    try:
+        written = analytics_service.rebuild_daily_stats(db, start_date, end_date)
+    finally:
+        db.close()
+
+    print(f"{start_date} ~ {end_date}: 写入 {written} 行汇总数据")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,10 +24,7 @@ def test_auth_and_binding():
     print("\n\n🧑‍🍳 测试 1: 注册厨师账户")
     chef_data = {
         "username": "chef_test",
-        "email": "chef@test.com",
-        "password": "password123",
-        "role": "chef",
-        "full_name": "测试厨师"
+        "password": "password123"
     }
     response = requests.post(f"{BASE_URL}/api/auth/register", json=chef_data)
     print_response("注册厨师", response)
@@ -36,10 +33,7 @@ def test_auth_and_binding():
     print("\n\n👤 测试 2: 注册顾客账户")
     customer_data = {
         "username": "customer_test",
-        "email": "customer@test.com",
-        "password": "password123",
-        "role": "customer",
-        "full_name": "测试顾客"
+        "password": "password123"
     }
     response = requests.post(f"{BASE_URL}/api/auth/register", json=customer_data)
     print_response("注册顾客", response)
@@ -61,7 +55,6 @@ def test_auth_and_binding():
         print(f"   - User ID: {chef_user['id']}")
         print(f"   - Username: {chef_user['username']}")
         print(f"   - Name: {chef_user['name']}")
-        print(f"   - Role: {chef_user['role']}")
     else:
         print("\n❌ 厨师登录失败！")
         return
@@ -83,7 +76,6 @@ def test_auth_and_binding():
         print(f"   - User ID: {customer_user['id']}")
         print(f"   - Username: {customer_user['username']}")
         print(f"   - Name: {customer_user['name']}")
-        print(f"   - Role: {customer_user['role']}")
     else:
         print("\n❌ 顾客登录失败！")
         return